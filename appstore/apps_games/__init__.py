@@ -1 +1,7 @@
-"""location of all the games and apps"""
+"""
+location of all the games and apps
+
+Every module in this package is one app. Importing a module must not cost anything: the app window is only created
+when the app class is constructed, and heavy dependencies (pytube, satisfactory_api_client, requests,
+CTkMessagebox) are imported inside the functions that use them.
+"""
@@ -1,35 +1,78 @@
-import dataclasses
+import argparse
+import calendar
 import hashlib
-import json as JSON
-from datetime import datetime, date
-from tkinter import messagebox
+import logging
+import os
+import sys
+import threading
+from datetime import date as Date, datetime
+from tkinter import filedialog, messagebox
 
 import customtkinter as ctk
 
-@dataclasses.dataclass()
-class Entry:
-    date: date
-    title: str
-    content: str
+from appstore.base import BaseApp
+from appstore.storage.archive import export_entries, import_entries
+from appstore.storage.diary import DateIndex, Entry, EntrySummary, SqliteDiaryStorage, open_storage
+from appstore.storage.sync import sync_folder
+from appstore.storage.writebehind import WriteBehindError, WriteBehindStorage
+from appstore.widgets import VirtualList
 
+logger = logging.getLogger("appstore.diary")
 
-class Diary:
+PAGE_SIZE = 100
+MONTHS = ["januari", "februari", "maart", "april", "mei", "juni", "juli", "augustus", "september", "oktober",
+          "november", "december"]
+WEEKDAYS = ["ma", "di", "wo", "do", "vr", "za", "zo"]
+
+
+class Diary(BaseApp):
+    title = "Dagboek"
     user_name: str
     logged_in: bool = False
-    entries: list[Entry] = []
-    user: JSON = None
-    app: ctk.CTk = ctk.CTk()
-
-    def __init__(self):
-        self.app.geometry("720x480")
-        self.app.title("Dagboek")
-        self.app.protocol("WM_DELETE_WINDOW", self.stop)
+    dates: DateIndex
+    pages: dict[int, list[EntrySummary]]
+    entry_list: VirtualList | None
+    storage: WriteBehindStorage
+
+    def build(self):
+        """Build the diary, starting at the login screen."""
+        self.dates = DateIndex()
+        self.pages = {}
+        self.entry_list = None
+        self.storage = WriteBehindStorage(open_storage())
         self.create_login_interface()
-        self.app.mainloop()
+
+    def mount(self, root):
+        """Show the diary, reopening the storage if the diary was closed before."""
+        if self.app is not None and self.storage.closed:
+            self.storage = WriteBehindStorage(open_storage())
+        super().mount(root)
+
+    def unmount(self):
+        """Hide the diary and close the storage, which writes the pending changes and stops the writer thread."""
+        super().unmount()
+        if self.app is not None:
+            try:
+                self.storage.close()
+            except WriteBehindError:
+                logger.exception("Closing the diary storage lost changes")
+
+    def flush_storage(self) -> bool:
+        """
+        Write the pending changes, telling the user when they could not be written.
+
+        :return: True if every change is written
+        """
+        try:
+            self.storage.flush()
+        except WriteBehindError as error:
+            messagebox.showerror("Fout", f"Wijzigingen konden niet worden opgeslagen: {error.__cause__ or error}")
+            return False
+        return True
 
     def create_login_interface(self):
         """Create the login interface using Tkinter."""
-        self.app.title("Inloggen")
+        self.root.title("Inloggen")
         center_frame = ctk.CTkFrame(self.app)
         ctk.CTkLabel(center_frame, text="Gebruikersnaam", font=("Arial", 18)).grid(row=0, column=0, padx=10, pady=10)
         self.username_entry = ctk.CTkEntry(center_frame, font=("Arial", 18))
@@ -59,59 +102,86 @@ class Diary:
 
     def show_entry_list(self):
         """Replace the login screen with a scrollable list of entries and action buttons."""
-        for widget in self.app.winfo_children():
-            widget.destroy()
+        if self.entry_list is None:
+            for widget in self.app.winfo_children():
+                widget.destroy()
 
-        self.app.title("Dagboekitems")
-        scroll_frame = ctk.CTkScrollableFrame(self.app, width=680, height=400)
-        scroll_frame.grid(row=0, column=0, padx=10, pady=5)
+            self.root.title("Dagboekitems")
+            self.entry_list = VirtualList(self.app, row_height=48, build_row=self.build_entry_row, bind_row=self.bind_entry_row, width=680, height=400)
+            self.entry_list.pack(fill="both", expand=True, padx=10, pady=5)
 
-        for idx, entry in enumerate(self.entries):
-            entry_label = ctk.CTkLabel(scroll_frame, text=f"{entry.date}: {entry.title}")
-            entry_label.grid(row=idx, column=0, padx=5, pady=5)
+            button_frame = ctk.CTkFrame(self.app)
+            add_button = ctk.CTkButton(button_frame, text="Nieuwe Invoer", command=self.add_new_day, font=("Arial", 18), width=100)
+            add_button.grid(row=1, column=0, padx=10, pady=5)
 
-            open_button = ctk.CTkButton(scroll_frame, text="Openen", command=lambda e=entry: self.view_day(e), width=100, font=("Arial", 18))
-            open_button.grid(row=idx, column=1, padx=5, pady=5)
+            search_button = ctk.CTkButton(button_frame, text="Zoeken", command=self.open_search, font=("Arial", 18), width=100)
+            search_button.grid(row=1, column=1, padx=5, pady=5)
+
+            calendar_button = ctk.CTkButton(button_frame, text="Kalender", command=self.open_calendar, font=("Arial", 18), width=100)
+            calendar_button.grid(row=1, column=2, padx=5, pady=5)
+
+            stop_button = ctk.CTkButton(button_frame, text="Stoppen", command=self.stop, font=("Arial", 18), width=100)
+            stop_button.grid(row=1, column=3, padx=5, pady=5)
+
+            export_button = ctk.CTkButton(button_frame, text="Exporteren", command=self.export_diary, font=("Arial", 18), width=100)
+            export_button.grid(row=2, column=0, padx=5, pady=5)
 
-            edit_button = ctk.CTkButton(scroll_frame, text="Bewerken", command=lambda e=entry: self.edit_day(e), width=100, font=("Arial", 18))
-            edit_button.grid(row=idx, column=2, padx=5, pady=5)
+            import_button = ctk.CTkButton(button_frame, text="Importeren", command=self.import_diary, font=("Arial", 18), width=100)
+            import_button.grid(row=2, column=1, padx=5, pady=5)
 
-            delete_button = ctk.CTkButton(scroll_frame, text="Verwijderen", command=lambda e=entry: self.delete_day(e), width=100, font=("Arial", 18))
-            delete_button.grid(row=idx, column=3, padx=5, pady=5)
+            sync_button = ctk.CTkButton(button_frame, text="Synchroniseren", command=self.sync_diary, font=("Arial", 18), width=100)
+            sync_button.grid(row=2, column=2, columnspan=2, padx=5, pady=5)
 
-        button_frame = ctk.CTkFrame(self.app)
-        add_button = ctk.CTkButton(button_frame, text="Nieuwe Invoer", command=self.add_new_day, font=("Arial", 18), width=100)
-        add_button.grid(row=1, column=0, padx=10, pady=5)
+            button_frame.pack(padx=10, pady=5)
 
-        stop_button = ctk.CTkButton(button_frame, text="Stoppen", command=self.stop, font=("Arial", 18), width=100)
-        stop_button.grid(row=1, column=1, padx=5, pady=5)
+        self.entry_list.set_count(len(self.dates))
 
-        button_frame.grid(row=1, column=0, padx=10, pady=5)
+    def build_entry_row(self, frame) -> dict:
+        """Create the widgets of one row of the entry list."""
+        frame.grid_columnconfigure(0, weight=1)
+        row = {"label": ctk.CTkLabel(frame, text="", anchor="w")}
+        row["label"].grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+
+        for column, (name, text) in enumerate([("open", "Openen"), ("edit", "Bewerken"), ("delete", "Verwijderen")], start=1):
+            row[name] = ctk.CTkButton(frame, text=text, width=100, font=("Arial", 18))
+            row[name].grid(row=0, column=column, padx=5, pady=5)
+
+        return row
+
+    def bind_entry_row(self, row: dict, index: int):
+        """Show the entry at a position in the date order in a row of the entry list."""
+        summary = self.get_summary(index)
+        row["label"].configure(text=f"{summary.date}: {summary.title}")
+        row["open"].configure(command=lambda s=summary: self.view_day(s))
+        row["edit"].configure(command=lambda s=summary: self.edit_day(s))
+        row["delete"].configure(command=lambda s=summary: self.delete_day(s))
+
+    def get_summary(self, index: int) -> EntrySummary:
+        """Get the summary of the entry at a position in the date order, loading its page if needed."""
+        page = index // PAGE_SIZE
+        if page not in self.pages:
+            self.pages[page] = self.storage.load_summaries(self.user_name, page * PAGE_SIZE, PAGE_SIZE)
+
+        return self.pages[page][index % PAGE_SIZE]
 
     def get_entries(self):
-        """Get the user's diary entries."""
+        """Load the date index of the user's diary entries; their titles are loaded page by page while scrolling."""
         if not self.logged_in:
             return
 
-        for entry in self.user.get("Diary", []):
-            try:
-                date_object = datetime.strptime(entry["Date"], "%d-%m-%Y").date()
-                new_entry = Entry(date=date_object, title=entry["Title"], content=entry["Content"])
-                self.entries.append(new_entry)
-            except (KeyError, ValueError) as e:
-                messagebox.showerror("Fout", f"Fout bij het verwerken van de invoer: {e}")
+        self.dates = self.storage.load_dates(self.user_name)
+        self.pages = {}
+        self.show_entry_list()
 
+    def entries_changed(self, position: int):
+        """Drop the loaded pages from the page of a changed position onwards and redraw the list."""
+        first_page = position // PAGE_SIZE
+        self.pages = {page: summaries for page, summaries in self.pages.items() if page < first_page}
         self.show_entry_list()
 
     def get_user_credentials(self) -> str | None:
-        """Get the user's diary entries."""
-        json = open("data/diary/diary.json", "r").read()
-        for user in JSON.loads(json):
-            if user["Username"] == self.user_name:
-                self.user = user
-                return user["PasswordHash"]
-
-        return None
+        """Get the user's password hash from the user index."""
+        return self.storage.get_password_hash(self.user_name)
 
     def hash_password(self, password: str) -> str:
         """Hash the user's password."""
@@ -157,20 +227,32 @@ class Diary:
             return
 
         new_entry = Entry(date=date, title=title, content=content.strip())
-        self.entries.append(new_entry)
-        self.show_entry_list()
-        self.save_entries()
+        self.storage.add_entry(self.user_name, new_entry)
+        self.entries_changed(self.dates.add(new_entry.date, new_entry.id))
         window.destroy()
 
-    def delete_day(self, entry: Entry):
+    def delete_day(self, summary: EntrySummary):
         """Delete the selected entry."""
-        self.entries.remove(entry)
-        self.save_entries()
+        self.storage.delete_entry(self.user_name, summary.id)
+        self.dates.remove(summary.date, summary.id)
         messagebox.showinfo("Invoer Verwijderd", "De dag is verwijderd.")
-        self.show_entry_list()
+        self.entries_changed(self.dates.position(summary.date))
 
-    def edit_day(self, entry: Entry):
+    def load_entry(self, summary: EntrySummary | Entry) -> Entry | None:
+        """Load the content of an entry from the storage."""
+        entry = self.storage.get_entry(self.user_name, summary.id)
+        if entry is None:
+            messagebox.showerror("Fout", "Deze invoer bestaat niet meer.")
+            self.get_entries()
+
+        return entry
+
+    def edit_day(self, summary: EntrySummary):
         """Open a window to edit the entry."""
+        entry = self.load_entry(summary)
+        if entry is None:
+            return
+
         edit_window = ctk.CTkToplevel(self.app, width=400, height=300)
         edit_window.title("Invoer Bewerken")
 
@@ -202,15 +284,18 @@ class Diary:
             messagebox.showerror("Fout", "Ongeldige datum.")
             return
 
-        self.entries.remove(old_entry)
-        updated_entry = Entry(date=date, title=title, content=content.strip())
-        self.entries.append(updated_entry)
-        self.save_entries()
-        self.show_entry_list()
+        updated_entry = Entry(date=date, title=title, content=content.strip(), id=old_entry.id)
+        self.storage.update_entry(self.user_name, updated_entry)
+        self.dates.remove(old_entry.date, old_entry.id)
+        self.dates.add(updated_entry.date, updated_entry.id)
+        self.entries_changed(self.dates.position(min(old_entry.date, updated_entry.date)))
         window.destroy()
 
-    def view_day(self, entry: Entry):
+    def view_day(self, summary: EntrySummary | Entry):
         """Open a window to view the entry."""
+        entry = self.load_entry(summary)
+        if entry is None:
+            return
 
         view_window = ctk.CTkToplevel(self.app)
         view_window.title(entry.title)
@@ -227,25 +312,234 @@ class Diary:
 
         view_window.attributes("-topmost", True)
 
-    def save_entries(self):
-        """Save the diary entries to a JSON file."""
-        entries_data = [{"Date": e.date.strftime("%d-%m-%Y"), "Title": e.title, "Content": e.content} for e in self.entries]
-        with open("data/diary/diary.json", "r+") as f:
-            json = JSON.loads(f.read())
-            for user in json:
-                if user["Username"] == self.user_name:
-                    user["Diary"] = entries_data
-                    break
+    def open_search(self):
+        """Open a window to search the entries."""
+        search_window = ctk.CTkToplevel(self.app)
+        search_window.title("Zoeken")
+
+        query_entry = ctk.CTkEntry(search_window, placeholder_text="Zoek in titel en inhoud", font=("Arial", 18), width=400)
+        query_entry.grid(row=0, column=0, padx=10, pady=10)
+
+        results_frame = ctk.CTkScrollableFrame(search_window, width=400, height=300)
+        results_frame.grid(row=1, column=0, padx=10, pady=5)
+
+        search_job = None
+
+        def schedule_search(event=None):
+            nonlocal search_job
+            if search_job is not None:
+                search_window.after_cancel(search_job)
+            search_job = search_window.after(150, lambda: self.show_search_results(query_entry.get(), results_frame))
+
+        query_entry.bind("<KeyRelease>", schedule_search)
+        query_entry.focus()
+        search_window.attributes("-topmost", True)
+
+    def show_search_results(self, query: str, results_frame):
+        """Show the entries that match the query."""
+        for widget in results_frame.winfo_children():
+            widget.destroy()
+
+        results = self.storage.search(self.user_name, query, limit=50)
+        if not results and query.strip():
+            ctk.CTkLabel(results_frame, text="Geen resultaten gevonden.").grid(row=0, column=0, padx=5, pady=5)
+
+        for idx, entry in enumerate(results):
+            ctk.CTkLabel(results_frame, text=f"{entry.date}: {entry.title}").grid(row=idx, column=0, padx=5, pady=5, sticky="w")
+            open_button = ctk.CTkButton(results_frame, text="Openen", command=lambda e=entry: self.view_day(e), width=100)
+            open_button.grid(row=idx, column=1, padx=5, pady=5)
+
+    def open_calendar(self):
+        """Open a month calendar, starting at the current month."""
+        calendar_window = ctk.CTkToplevel(self.app)
+        calendar_window.title("Kalender")
+        today = Date.today()
+        month = [today.year, today.month]
+
+        header = ctk.CTkFrame(calendar_window, fg_color="transparent")
+        header.grid(row=0, column=0, padx=10, pady=10)
+        month_label = ctk.CTkLabel(header, text="", font=("Arial", 18), width=250)
+        count_label = ctk.CTkLabel(calendar_window, text="")
+
+        days_frame = ctk.CTkFrame(calendar_window)
+        days_frame.grid(row=1, column=0, padx=10, pady=5)
+        for column, weekday in enumerate(WEEKDAYS):
+            ctk.CTkLabel(days_frame, text=weekday).grid(row=0, column=column, padx=2, pady=2)
+
+        day_buttons = []
+        for week in range(6):
+            for column in range(7):
+                button = ctk.CTkButton(days_frame, text="", width=50, height=40)
+                button.grid(row=week + 1, column=column, padx=2, pady=2)
+                day_buttons.append(button)
+
+        def show_month(step: int = 0):
+            year, number = divmod(month[0] * 12 + month[1] - 1 + step, 12)
+            month[0], month[1] = year, number + 1
+            first_weekday, days = calendar.monthrange(month[0], month[1])
+            start, end = Date(month[0], month[1], 1), Date(month[0], month[1], days)
+
+            by_day: dict[int, list[EntrySummary]] = {}
+            for summary in self.storage.load_range(self.user_name, start, end):
+                by_day.setdefault(summary.date.day, []).append(summary)
+
+            month_label.configure(text=f"{MONTHS[month[1] - 1]} {month[0]}")
+            count_label.configure(text=f"{len(self.dates.range(start, end))} invoer(en) deze maand")
+            for cell, button in enumerate(day_buttons):
+                day = cell - first_weekday + 1
+                if not 1 <= day <= days:
+                    button.configure(text="", state="disabled", fg_color="transparent")
+                elif day in by_day:
+                    button.configure(text=str(day), state="normal", fg_color=("#3B8ED0", "#1F6AA5"),
+                                     command=lambda d=day: self.open_calendar_day(by_day[d]))
+                else:
+                    button.configure(text=str(day), state="disabled", fg_color=("gray75", "gray30"))
+
+        ctk.CTkButton(header, text="<", width=40, command=lambda: show_month(-1)).grid(row=0, column=0)
+        month_label.grid(row=0, column=1)
+        ctk.CTkButton(header, text=">", width=40, command=lambda: show_month(1)).grid(row=0, column=2)
+        count_label.grid(row=2, column=0, padx=10, pady=5)
+
+        show_month()
+        calendar_window.attributes("-topmost", True)
+
+    def open_calendar_day(self, summaries: list[EntrySummary]):
+        """Scroll the entry list to a day of the calendar, and open the entry if it is the only one that day."""
+        self.entry_list.scroll_to(self.dates.position(summaries[0].date))
+        if len(summaries) == 1:
+            self.view_day(summaries[0])
+
+    def export_diary(self):
+        """Export the entries to an NDJSON archive chosen by the user."""
+        path = filedialog.asksaveasfilename(parent=self.app, title="Exporteren", defaultextension=".ndjson.gz",
+                                            filetypes=[("Gecomprimeerd archief", "*.ndjson.gz"), ("NDJSON", "*.ndjson")])
+        if not path:
+            return
+
+        if not self.flush_storage():
+            return
+        self.run_background_task("Exporteren", lambda storage, progress: export_entries(storage, self.user_name, path, progress),
+                                 lambda count: f"{count} invoer(en) geëxporteerd.")
+
+    def import_diary(self):
+        """Import the entries of an archive or an old diary.json file chosen by the user."""
+        path = filedialog.askopenfilename(parent=self.app, title="Importeren",
+                                          filetypes=[("Dagboekarchief", "*.ndjson *.ndjson.gz *.json"), ("Alle bestanden", "*")])
+        if not path:
+            return
+
+        if not self.flush_storage():
+            return
+        self.run_background_task("Importeren", lambda storage, progress: import_entries(storage, self.user_name, path, progress),
+                                 lambda result: f"{result.imported} invoer(en) geïmporteerd, {result.skipped} al aanwezig, {result.invalid} ongeldig.")
+
+    def sync_diary(self):
+        """Sync the entries with a copy in a folder chosen by the user."""
+        folder = filedialog.askdirectory(parent=self.app, title="Synchroniseren met map")
+        if not folder:
+            return
 
-            f.seek(0)
-            f.write(JSON.dumps(json, indent=4))
-            f.truncate()
+        if not self.flush_storage():
+            return
+        self.run_background_task("Synchroniseren", lambda storage, progress: sync_folder(storage, self.user_name, folder, progress),
+                                 lambda result: f"{result.pushed} naar de map gekopieerd, {result.pulled} uit de map gekopieerd, "
+                                                f"{result.deleted_remote + result.deleted_local} verwijderd, {result.conflicts} conflict(en).")
+
+    def run_background_task(self, title: str, task, describe):
+        """
+        Run an export, import or sync on a background thread with its own database connection, showing its progress.
+
+        :param title: The title of the progress window
+        :param task: Called with the storage and a progress callback; returns the result
+        :param describe: Turns the result into the message shown when the task is done
+        """
+        progress_window = ctk.CTkToplevel(self.app)
+        progress_window.title(title)
+        progress_bar = ctk.CTkProgressBar(progress_window, width=300)
+        progress_bar.set(0)
+        progress_bar.grid(row=0, column=0, padx=20, pady=20)
+        progress_window.attributes("-topmost", True)
+
+        state = {"done": 0, "total": 0, "result": None, "error": None, "finished": False}
+
+        def progress(done: int, total: int):
+            state["done"], state["total"] = done, total
+
+        def work():
+            storage = SqliteDiaryStorage(self.storage.reader.path)
+            try:
+                state["result"] = task(storage, progress)
+            except Exception as e:
+                state["error"] = e
+            finally:
+                storage.close()
+                state["finished"] = True
+
+        def poll():
+            if state["total"]:
+                progress_bar.set(state["done"] / state["total"])
+            if not state["finished"]:
+                progress_window.after(100, poll)
+                return
+
+            progress_window.destroy()
+            self.get_entries()
+            if state["error"] is not None:
+                messagebox.showerror("Fout", f"{title} is mislukt: {state['error']}")
+            else:
+                messagebox.showinfo(title, describe(state["result"]))
 
+        threading.Thread(target=work, name="diary-archive", daemon=True).start()
+        poll()
 
     def stop(self):
-        """Exit the application."""
-        self.app.quit()
-        exit()
+        """Write the pending changes and exit the application."""
+        if not self.flush_storage() and not messagebox.askyesno("Stoppen", "Toch stoppen zonder op te slaan?"):
+            return
+        self.close()
+
+
+def main():
+    """Open the diary, or export, import or sync the entries of a user without a window."""
+    parser = argparse.ArgumentParser(description="Diary; without a command the diary window is opened")
+    commands = parser.add_subparsers(dest="command")
+    export_parser = commands.add_parser("export", help="write the entries of a user to an NDJSON archive")
+    export_parser.add_argument("user", help="the user to export the entries of")
+    export_parser.add_argument("path", help="the archive to write; a .gz suffix compresses it")
+    import_parser = commands.add_parser("import", help="add the entries of an archive or old diary.json to a user")
+    import_parser.add_argument("user", help="the user to add the entries to")
+    import_parser.add_argument("path", help="an .ndjson or .ndjson.gz archive, or a diary.json file")
+    sync_parser = commands.add_parser("sync", help="sync the entries of a user with a copy in a folder")
+    sync_parser.add_argument("user", help="the user to sync the entries of")
+    sync_parser.add_argument("folder", help="the folder to keep the copy in, for example on a USB drive")
+    args = parser.parse_args()
+
+    if args.command is None:
+        Diary()
+        return
+
+    def progress(done: int, total: int):
+        print(f"\r{args.command}: {done * 100 // total if total else 100}%", end="", file=sys.stderr, flush=True)
+
+    # The commands run from the repository root, and use the data of the diary window in the appstore directory.
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "diary")
+    storage = open_storage(os.path.join(data_dir, "diary.db"), os.path.join(data_dir, "diary.json"))
+    try:
+        if args.command == "export":
+            count = export_entries(storage, args.user, args.path, progress)
+            print(f"\nExported {count} entries of {args.user} to {args.path}", file=sys.stderr)
+        elif args.command == "import":
+            result = import_entries(storage, args.user, args.path, progress)
+            print(f"\nImported {result.imported} entries into {args.user}: {result.skipped} already present, "
+                  f"{result.invalid} invalid", file=sys.stderr)
+        else:
+            result = sync_folder(storage, args.user, args.folder, progress)
+            print(f"\nSynced {args.user} with {args.folder}: {result.pushed} copied to the folder, {result.pulled} "
+                  f"copied from the folder, {result.deleted_remote} deleted from the folder, {result.deleted_local} "
+                  f"deleted locally, {result.conflicts} conflicts", file=sys.stderr)
+    finally:
+        storage.close()
+
 
 if __name__ == "__main__":
-    diary = Diary()
+    main()
@@ -3,6 +3,10 @@ import dataclasses
 import random
 import customtkinter
 
+from appstore.base import BaseApp
+from appstore.engines import numberguess
+from appstore.screens import Screen, ScreenManager
+
 @dataclasses.dataclass
 class Difficulty:
     """
@@ -23,37 +27,41 @@ class Difficulty:
 
 
 # https://www.youtube.com/watch?v=NI9LXzo0UY0 (video used making the gui)
-class Getalgoeroe:
+class Getalgoeroe(BaseApp):
     """This is the Getalgoeroe class. It is a dataclass that contains the game logic and UI methods."""
-    app: customtkinter.CTk = customtkinter.CTk()
+    title = "Getalgoeroe"
     number: int
     difficulty: str
     max_attempts: int
-    attempts: int = 0
+    attempts: int
+    screens: ScreenManager
 
-    def __init__(self):
-        """This is the constructor method for the Getalgoeroe class. It initializes the game."""
-        self.app.geometry("720x480")
-        self.app.title("Getalgoeroe")
+    def build(self) -> None:
+        """This method builds the game in the app frame and shows the welcome screen."""
         customtkinter.CTkLabel(self.app, text="Getalgoeroe", font=("Arial", 24)).pack(pady=10)
-        self.app.protocol("WM_DELETE_WINDOW", self.close)
+        self.screens = ScreenManager(self.app)
+        self.screens.add("welcome", self.build_welcome_screen)
+        self.screens.add("difficulty", self.build_difficulty_screen)
+        self.screens.add("game", self.build_game_screen)
+        self.screens.add("end", self.build_end_screen)
         self.show_welcome_screen()
-        self.app.mainloop()
 
     # Game Logic Methods
+    def get_level(self) -> numberguess.Level:
+        """
+        This method returns the range and number of attempts of the difficulty level.
+
+        :return: The level of the difficulty
+        """
+        return numberguess.LEVELS[[Difficulty.easy, Difficulty.medium, Difficulty.hard].index(self.difficulty)]
+
     def get_max_attempts(self) -> int:
         """
         This method returns the maximum number of attempts based on the difficulty level.
 
         :return: The maximum number of attempts based on the difficulty level
         """
-        match self.difficulty:
-            case Difficulty.easy:
-                return 5
-            case Difficulty.medium:
-                return 10
-            case Difficulty.hard:
-                return 15
+        return self.get_level().attempts
 
     def get_random_number(self) -> int:
         """
@@ -69,13 +77,7 @@ class Getalgoeroe:
 
         :return: The maximum number based on the difficulty level
         """
-        match self.difficulty:
-            case Difficulty.easy:
-                return 10
-            case Difficulty.medium:
-                return 25
-            case Difficulty.hard:
-                return 50
+        return self.get_level().max_number
 
     def check_guess(self, guess: str) -> None:
         """
@@ -85,59 +87,112 @@ class Getalgoeroe:
         :return: None
         """
         if not guess.isdigit():
-            self.remove_error_message()
             self.show_error("Ongeldige invoer. Voer een getal in.")
             return
         guess = int(guess)
         self.attempts += 1
 
-        if guess == self.number:
+        result = numberguess.hint(guess, self.number)
+        if result == numberguess.CORRECT:
             self.show_win()
         elif self.attempts == self.max_attempts:
             self.show_game_over()
         else:
+            self.show_hint(guess, result)
             self.start_game()
 
     # UI Methods
-    def show_welcome_screen(self) -> None:
+    def build_welcome_screen(self, screen: Screen) -> None:
         """
-        This method shows the welcome screen for the game.
+        This method builds the welcome screen for the game.
 
+        :param screen: The screen to build
         :return: None
         """
-        self.remove_old_elements()
-
-        welcome_message = customtkinter.CTkLabel(self.app, text="Welkom bij Getalgoeroe!", font=("Arial", 18))
+        welcome_message = customtkinter.CTkLabel(screen.frame, text="Welkom bij Getalgoeroe!", font=("Arial", 18))
         welcome_message.pack(pady=10)
 
-        button_frame = customtkinter.CTkFrame(self.app)
+        button_frame = customtkinter.CTkFrame(screen.frame)
         button_frame.pack()
 
         start_button = customtkinter.CTkButton(button_frame, text="Start", font=("Arial", 18), command=self.ask_difficulty)
         start_button.grid(row=0, column=0, padx=1)
 
-        quit_button = customtkinter.CTkButton(button_frame, text="Afsluiten", font=("Arial", 18), command=self.app.quit)
+        quit_button = customtkinter.CTkButton(button_frame, text="Afsluiten", font=("Arial", 18), command=self.close)
         quit_button.grid(row=0, column=1, padx=1)
 
-        self.app.update()
-
-    def ask_difficulty(self) -> None:
+    def build_difficulty_screen(self, screen: Screen) -> None:
         """
-        This method asks the user to choose a difficulty level and sets the difficulty attribute.
+        This method builds the screen that asks the user to choose a difficulty level.
 
+        :param screen: The screen to build
         :return: None
         """
-        self.remove_old_elements()
         possible_difficulties = [Difficulty.easy, Difficulty.medium, Difficulty.hard]
-        difficulty_message = customtkinter.CTkLabel(self.app, text="Kies een moeilijkheidsgraad:", font=("Arial", 18))
+        difficulty_message = customtkinter.CTkLabel(screen.frame, text="Kies een moeilijkheidsgraad:", font=("Arial", 18))
         difficulty_message.pack(pady=10)
 
         for difficulty in possible_difficulties:
-            difficulty_button = customtkinter.CTkButton(self.app, text=difficulty, font=("Arial", 18),
+            difficulty_button = customtkinter.CTkButton(screen.frame, text=difficulty, font=("Arial", 18),
                                                         command=lambda d=difficulty: self.set_difficulty(d))
             difficulty_button.pack(pady=5)
 
-        self.app.update()
+    def build_game_screen(self, screen: Screen) -> None:
+        """
+        This method builds the screen where the player guesses the number.
+
+        :param screen: The screen to build
+        :return: None
+        """
+        screen.add("difficulty", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 15))).pack()
+        screen.add("attempts", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 18))).pack(pady=5)
+        screen.add("hint", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 18))).pack()
+
+        guess_entry = screen.add("guess", customtkinter.CTkEntry(screen.frame, font=("Arial", 18)))
+        guess_entry.pack(pady=10)
+
+        guess_button = customtkinter.CTkButton(screen.frame, text="Raad", font=("Arial", 18),
+                                               command=lambda: self.check_guess(guess_entry.get()))
+        guess_button.pack()
+
+        screen.add("error", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 18), text_color="red")).pack()
+
+    def build_end_screen(self, screen: Screen) -> None:
+        """
+        This method builds the screen that is shown when the game is won or lost.
+
+        :param screen: The screen to build
+        :return: None
+        """
+        screen.add("result", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 18))).pack(pady=5)
+        screen.add("number", customtkinter.CTkLabel(screen.frame, text="", font=("Arial", 18))).pack(pady=5)
+
+        button_frame = customtkinter.CTkFrame(screen.frame)
+        button_frame.pack()
+
+        play_again_button = customtkinter.CTkButton(button_frame, text="Speel opnieuw", font=("Arial", 18),
+                                                    command=self.ask_difficulty)
+        play_again_button.grid(row=0, column=0, padx=1)
+
+        go_back_button = customtkinter.CTkButton(button_frame, text="Terug", font=("Arial", 18),
+                                                 command=self.show_welcome_screen)
+        go_back_button.grid(row=0, column=1, padx=1)
+
+    def show_welcome_screen(self) -> None:
+        """
+        This method shows the welcome screen for the game.
+
+        :return: None
+        """
+        self.screens.show("welcome")
+
+    def ask_difficulty(self) -> None:
+        """
+        This method asks the user to choose a difficulty level and sets the difficulty attribute.
+
+        :return: None
+        """
+        self.screens.show("difficulty")
 
     def set_difficulty(self, difficulty: str) -> None:
         """
@@ -150,6 +205,7 @@ class Getalgoeroe:
         self.max_attempts = self.get_max_attempts()
         self.number = self.get_random_number()
         self.attempts = 0
+        self.screens.get("game").set_text("hint", f"Raad een getal van 1 tot en met {self.get_max_number()}.")
         self.start_game()
 
     def start_game(self) -> None:
@@ -158,17 +214,10 @@ class Getalgoeroe:
 
         :return: None
         """
-        self.remove_old_elements()
+        screen = self.screens.show("game")
         self.show_attempts_left()
-
-        guess_entry = customtkinter.CTkEntry(self.app, font=("Arial", 18))
-        guess_entry.pack(pady=10)
-
-        guess_button = customtkinter.CTkButton(self.app, text="Raad", font=("Arial", 18),
-                                                command=lambda: self.check_guess(guess_entry.get()))
-        guess_button.pack()
-
-        self.app.update()
+        self.remove_error_message()
+        screen["guess"].delete(0, "end")
 
     def show_attempts_left(self) -> None:
         """
@@ -176,13 +225,23 @@ class Getalgoeroe:
 
         :return: None
         """
-        difficulty_text = f"Moeilijkheidsgraad: {self.difficulty}"
-        difficulty_message = customtkinter.CTkLabel(self.app, text=difficulty_text, font=("Arial", 15))
-        difficulty_message.pack()
+        screen = self.screens.get("game")
+        screen.set_text("difficulty", f"Moeilijkheidsgraad: {self.difficulty}")
+        screen.set_text("attempts", f"Je hebt nog {self.max_attempts - self.attempts} pogingen over.")
+
+    def show_hint(self, guess: int, result: str) -> None:
+        """
+        This method shows whether the number is higher or lower than the last guess.
 
-        attempts_text = f"Je hebt nog {self.max_attempts - self.attempts} pogingen over."
-        attempts_message = customtkinter.CTkLabel(self.app, text=attempts_text, font=("Arial", 18))
-        attempts_message.pack(pady=5)
+        :param guess: The last guess
+        :param result: The hint for the guess
+        :return: None
+        """
+        if result == numberguess.HIGHER:
+            text = f"Het getal is hoger dan {guess}."
+        else:
+            text = f"Het getal is lager dan {guess}."
+        self.screens.get("game").set_text("hint", text)
 
     def show_game_over(self) -> None:
         """
@@ -190,25 +249,9 @@ class Getalgoeroe:
 
         :return: None
         """
-        self.remove_old_elements()
-
-        lose_message = customtkinter.CTkLabel(self.app, text="Helaas! Je hebt geen pogingen meer over.", font=("Arial", 18), text_color="red")
-        lose_message.pack(pady=5)
-
-        number_message = customtkinter.CTkLabel(self.app, text=f"Het getal was: {self.number}", font=("Arial", 18))
-        number_message.pack(pady=5)
-
-        button_frame = customtkinter.CTkFrame(self.app)
-        button_frame.pack()
-
-        play_again_button = customtkinter.CTkButton(button_frame, text="Speel opnieuw", font=("Arial", 18), command=self.ask_difficulty)
-        play_again_button.grid(row=0, column=0, padx=1)
-
-        go_back_button = customtkinter.CTkButton(button_frame, text="Terug", font=("Arial", 18),
-                                                 command=self.show_welcome_screen)
-        go_back_button.grid(row=0, column=1, padx=1)
-
-        self.app.update()
+        screen = self.screens.show("end")
+        screen.set_text("result", "Helaas! Je hebt geen pogingen meer over.", text_color="red")
+        screen.set_text("number", f"Het getal was: {self.number}")
 
     def show_win(self) -> None:
         """
@@ -216,22 +259,9 @@ class Getalgoeroe:
 
         :return: None
         """
-        self.remove_old_elements()
-        win_message = customtkinter.CTkLabel(self.app, text="Gefeliciteerd! Je hebt het getal geraden.", font=("Arial", 18), text_color="green")
-        win_message.pack(pady=5)
-
-        button_frame = customtkinter.CTkFrame(self.app)
-        button_frame.pack()
-
-        play_again_button = customtkinter.CTkButton(button_frame, text="Speel opnieuw", font=("Arial", 18),
-                                                    command=self.ask_difficulty)
-        play_again_button.grid(row=0, column=0, padx=1)
-
-        go_back_button = customtkinter.CTkButton(button_frame, text="Terug", font=("Arial", 18),
-                                                 command=self.show_welcome_screen)
-        go_back_button.grid(row=0, column=1, padx=1)
-
-        self.app.update()
+        screen = self.screens.show("end")
+        screen.set_text("result", "Gefeliciteerd! Je hebt het getal geraden.", text_color="green")
+        screen.set_text("number", "")
 
     def show_error(self, message: str) -> None:
         """
@@ -240,34 +270,16 @@ class Getalgoeroe:
         :param message: The error message to display
         :return: None
         """
-        error_message = customtkinter.CTkLabel(self.app, text=message, font=("Arial", 18), text_color="red")
-        error_message.pack()
+        self.screens.get("game").set_text("error", message)
 
     # Utility Methods
-    def remove_old_elements(self) -> None:
-        """
-        This method removes old UI elements from the screen except the title.
-
-        :return: None
-        """
-        for widget in self.app.winfo_children():
-            if widget != self.app.winfo_children()[0]:
-                widget.destroy()
-
     def remove_error_message(self) -> None:
         """
         This method removes the error message from the screen.
 
         :return: None
         """
-        for widget in self.app.winfo_children():
-            if isinstance(widget, customtkinter.CTkLabel) and widget._text_color == "red":
-                widget.destroy()
-
-    def close(self):
-        """Close the app."""
-        self.app.quit()
-        exit()
+        self.screens.get("game").set_text("error", "")
 
 
 if __name__ == "__main__":
@@ -1,39 +1,113 @@
 """ HangMan game """
-import random
-from datetime import datetime
 
 from appstore.apps_games.getalgoeroe import Difficulty
-import json
 import customtkinter
 
+from appstore.base import BaseApp
+from appstore.engines import hangman as engine
+from appstore.engines.wordbank import load_word_bank
+from appstore.screens import Screen, ScreenManager
+from appstore.storage.leaderboard import Leaderboard
+from appstore.storage.scores import ScoreLog, ScoreRecord
 
-class HangMan:
+
+class HangMan(BaseApp):
     """HangMan game class"""
-    app: customtkinter.CTk = customtkinter.CTk()
+    title = "Hang Man"
     difficulty: str
     word: str
     user_name: str
 
     max_tries: int
-    tries: int = 1
-    guessed_letters: list = []
+    game: engine.HangmanGame
+
+    screens: ScreenManager
+    leaderboard: Leaderboard
 
-    def __init__(self):
-        self.app.geometry("720x480")
-        self.app.title("Hang Man")
+    def build(self):
+        """Build the game and show the welcome screen."""
         customtkinter.CTkLabel(self.app, text="Hang Man", font=("Arial", 24)).pack(pady=10)
+        self.leaderboard = Leaderboard(ScoreLog())
+        self.screens = ScreenManager(self.app)
+        self.screens.add("welcome", self.build_welcome_screen)
+        self.screens.add("difficulty", self.build_difficulty_screen)
+        self.screens.add("game", self.build_game_screen)
+        self.screens.add("end", self.build_end_screen)
+        self.screens.add("leaderboard", self.build_leaderboard_screen)
         self.show_welcome_screen()
-        self.app.protocol("WM_DELETE_WINDOW", self.close)
-        self.app.mainloop()
 
-    def show_welcome_screen(self):
-        """Show the welcome screen."""
-        self.remove_old_elements()
-        customtkinter.CTkLabel(self.app, text="Naam:", font=("arial", 15)).pack()
-        self.name_entry = customtkinter.CTkEntry(self.app, font=("Arial", 18), width=350)  # Create the entry widget
+    def build_welcome_screen(self, screen: Screen):
+        """Build the welcome screen."""
+        customtkinter.CTkLabel(screen.frame, text="Naam:", font=("arial", 15)).pack()
+        self.name_entry = customtkinter.CTkEntry(screen.frame, font=("Arial", 18), width=350)  # Create the entry widget
         self.name_entry.pack(pady=5)  # Then pack it separately
-        start_button = customtkinter.CTkButton(self.app, text="Start", command=self.save_user_name)
+        start_button = customtkinter.CTkButton(screen.frame, text="Start", command=self.save_user_name)
         start_button.pack()
+        customtkinter.CTkButton(screen.frame, text="Ranglijst", command=self.show_leaderboard).pack(pady=5)
+
+    def build_difficulty_screen(self, screen: Screen) -> None:
+        """
+        This method builds the screen that asks the user to choose a difficulty level.
+
+        :param screen: The screen to build
+        :return: None
+        """
+        possible_difficulties = [Difficulty.easy, Difficulty.medium, Difficulty.hard]
+        difficulty_message = customtkinter.CTkLabel(screen.frame, text="Kies een moeilijkheidsgraad:", font=("Arial", 18))
+        difficulty_message.pack(pady=10)
+
+        for difficulty in possible_difficulties:
+            difficulty_button = customtkinter.CTkButton(screen.frame, text=difficulty, font=("Arial", 18),
+                                                        command=lambda d=difficulty: self.set_difficulty(d))
+            difficulty_button.pack(pady=5)
+
+    def build_game_screen(self, screen: Screen):
+        """Build the screen where the player guesses letters."""
+        screen.add("feedback", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        screen.add("tries", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack(pady=5)
+        screen.add("word", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        customtkinter.CTkLabel(screen.frame, font=("Arial", 15), text="Raad een letter:").pack()
+        self.guessed_letter = customtkinter.CTkEntry(screen.frame, font=("Arial", 18), width=350)
+        self.guessed_letter.pack(pady=5)
+        customtkinter.CTkButton(screen.frame, text="Start", command=self.check_letter).pack()
+
+    def build_end_screen(self, screen: Screen):
+        """Build the screen that shows the word when the game is over."""
+        screen.add("result", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 20))).pack()
+        customtkinter.CTkButton(screen.frame, text="Terug", font=("Arial", 18), command=self.show_welcome_screen).pack()
+
+    def build_leaderboard_screen(self, screen: Screen):
+        """Build the screen with the best players and the statistics per difficulty level."""
+        customtkinter.CTkLabel(screen.frame, text="Ranglijst", font=("Arial", 20)).pack(pady=5)
+        screen.add("players", customtkinter.CTkLabel(screen.frame, text="", font=("Courier", 14),
+                                                     justify="left")).pack(pady=5)
+        customtkinter.CTkLabel(screen.frame, text="Per moeilijkheidsgraad", font=("Arial", 20)).pack(pady=5)
+        screen.add("difficulties", customtkinter.CTkLabel(screen.frame, text="", font=("Courier", 14),
+                                                          justify="left")).pack(pady=5)
+        customtkinter.CTkButton(screen.frame, text="Terug", font=("Arial", 18), command=self.show_welcome_screen).pack()
+
+    def show_leaderboard(self):
+        """Show the best players and the win rate and average tries per difficulty level."""
+        self.leaderboard.catch_up()
+        players = [f"{rank}. {name:<12} {totals.wins:>4} gewonnen  {totals.win_rate:>4.0%}  "
+                   f"gem. {totals.average_tries:.1f} pogingen"
+                   for rank, (name, totals) in enumerate(self.leaderboard.top_players(), start=1)]
+        difficulties = []
+        for difficulty in [Difficulty.easy, Difficulty.medium, Difficulty.hard]:
+            totals = self.leaderboard.difficulties.get(difficulty)
+            if totals is None:
+                difficulties.append(f"{difficulty:<10} nog niet gespeeld")
+            else:
+                difficulties.append(f"{difficulty:<10} {totals.games:>5} spellen  {totals.win_rate:>4.0%} gewonnen  "
+                                    f"gem. {totals.average_tries:.1f} pogingen")
+
+        screen = self.screens.show("leaderboard")
+        screen.set_text("players", "\n".join(players) or "Nog geen scores")
+        screen.set_text("difficulties", "\n".join(difficulties))
+
+    def show_welcome_screen(self):
+        """Show the welcome screen."""
+        self.screens.show("welcome")
 
     def save_user_name(self):
         """Save the user's name and ask for the difficulty level."""
@@ -41,26 +115,16 @@ class HangMan:
         self.ask_difficulty()
 
     def _get_max_tries(self):
-        """Set the maximum number of tries based on the difficulty level."""
-        match self.difficulty:
-            case Difficulty.easy:
-                self.max_tries = 20
-            case Difficulty.medium:
-                self.max_tries = 1
-            case Difficulty.hard:
-                self.max_tries = 10
+        """Set the maximum number of tries based on the difficulty level, calibrated on the words of its tier."""
+        self.max_tries = engine.MAX_TRIES[self._get_tier()]
+
+    def _get_tier(self) -> int:
+        """Return the word bank tier of the difficulty level."""
+        return [Difficulty.easy, Difficulty.medium, Difficulty.hard].index(self.difficulty)
 
     def get_random_word(self):
-        """Get a random word based on the difficulty level."""
-        json_file = open("data/hangMan/words.json", "r").read()
-        words = json.loads(json_file)
-        match self.difficulty:
-            case Difficulty.easy:
-                self.word = random.choice(words["easy"])
-            case Difficulty.medium:
-                self.word = random.choice(words["medium"])
-            case Difficulty.hard:
-                self.word = random.choice(words["hard"])
+        """Get a random word based on the difficulty level from the shared word bank."""
+        self.word = load_word_bank().sample(self._get_tier())
 
     def ask_difficulty(self) -> None:
         """
@@ -68,15 +132,7 @@ class HangMan:
 
         :return: None
         """
-        self.remove_old_elements()
-        possible_difficulties = [Difficulty.easy, Difficulty.medium, Difficulty.hard]
-        difficulty_message = customtkinter.CTkLabel(self.app, text="Kies een moeilijkheidsgraad:", font=("Arial", 18))
-        difficulty_message.pack(pady=10)
-
-        for difficulty in possible_difficulties:
-            difficulty_button = customtkinter.CTkButton(self.app, text=difficulty, font=("Arial", 18),
-                                                        command=lambda d=difficulty: self.set_difficulty(d))
-            difficulty_button.pack(pady=5)
+        self.screens.show("difficulty")
 
     def set_difficulty(self, difficulty: str) -> None:
         """
@@ -88,43 +144,38 @@ class HangMan:
         self.difficulty = difficulty
         self._get_max_tries()
         self.get_random_word()
-        self.tries = 1
-        self.remove_old_elements()
+        self.game = engine.HangmanGame(self.word, self.max_tries)
+        self.screens.get("game").set_text("feedback", "")
         self.start_game()
 
     def start_game(self):
         """Start the game."""
+        self.screens.show("game")
         self.display_status()
-        customtkinter.CTkLabel(self.app, font=("Arial", 15), text="Raad een letter:").pack()
-        self.guessed_letter = customtkinter.CTkEntry(self.app, font=("Arial", 18), width=350)
-        self.guessed_letter.pack(pady=5)
-        customtkinter.CTkButton(self.app, text="Start", command=self.check_letter).pack()
+        self.guessed_letter.delete(0, "end")
 
     def display_status(self):
         """Display the game status."""
-        customtkinter.CTkLabel(self.app, text=f"Poging: {self.tries}/{self.max_tries}", font=("arial", 15)).pack(pady=5)
-        display_word = ""
-        for letter in self.word:
-            if letter in self.guessed_letters:
-                display_word += letter + " "
-            else:
-                display_word += "_ "
-
-        customtkinter.CTkLabel(self.app, text=display_word, font=("arial", 15)).pack()
+        screen = self.screens.get("game")
+        screen.set_text("tries", f"Poging: {self.game.attempt}/{self.max_tries}")
+        screen.set_text("word", self.game.masked_word)
 
     def check_letter(self):
         """Check if the guessed letter is correct."""
-        letter = self.guessed_letter.get()
-        self.remove_old_elements()
-        if letter in self.word:
-            if letter not in self.guessed_letters:
-                customtkinter.CTkLabel(self.app, text="Goed geraden!", text_color="green", font=("arial", 15)).pack()
-                self.guessed_letters.append(letter)
-            else:
-                customtkinter.CTkLabel(self.app, text="Deze letter is al geraden!", text_color="orange", font=("arial", 15)).pack()
-        else:
-            customtkinter.CTkLabel(self.app, text="Fout geraden!", text_color="red", font=("arial", 15)).pack()
-            self.tries += 1
+        screen = self.screens.get("game")
+        try:
+            result = self.game.guess(self.guessed_letter.get())
+        except ValueError:
+            screen.set_text("feedback", "Voer één letter in!", text_color="orange")
+            result = None
+
+        match result:
+            case engine.CORRECT:
+                screen.set_text("feedback", "Goed geraden!", text_color="green")
+            case engine.REPEATED:
+                screen.set_text("feedback", "Deze letter is al geraden!", text_color="orange")
+            case engine.WRONG:
+                screen.set_text("feedback", "Fout geraden!", text_color="red")
 
         if not self.check_win_or_lose():
             self.start_game()
@@ -135,55 +186,20 @@ class HangMan:
 
         :return: True if the game is over, False otherwise
         """
-        # Check if all letters in the word are guessed
-        if all(letter in self.guessed_letters for letter in self.word):
-            self.remove_old_elements()
+        if self.game.won:
             self.save_score(True)
-            customtkinter.CTkLabel(self.app, text=f"Goed gedaan! Het woord was: {self.word}", text_color="green", font=("arial", 20)).pack()
-
-            customtkinter.CTkButton(self.app, text="Terug", font=("Arial", 18), command=self.show_welcome_screen).pack()
+            self.screens.show("end").set_text("result", f"Goed gedaan! Het woord was: {self.word}", text_color="green")
             return True
-        elif self.tries > self.max_tries:
-            self.tries -= 1
-            self.remove_old_elements()
-            customtkinter.CTkLabel(self.app, text=f"Helaas! Het woord was: {self.word}", text_color="red", font=("arial", 20)).pack()
+        elif self.game.lost:
+            self.screens.show("end").set_text("result", f"Helaas! Het woord was: {self.word}", text_color="red")
             self.save_score(False)
-
-            customtkinter.CTkButton(self.app, text="Terug", font=("Arial", 18), command=self.show_welcome_screen).pack()
-
-            # Return True to break the loop
             return True
         return False
 
     def save_score(self, guessed: bool):
-        """Save the score to a JSON file."""
-        with open("data/hangMan/scores.json", "r+") as file:
-            scores = json.loads(file.read())
-            score = {
-                "userName": self.user_name,
-                "guessed": guessed,
-                "timesGuessed": self.tries,
-                "dateTime": datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-            }
-            scores.append(score)
-
-            file.seek(0)
-            file.write(json.dumps(scores))
-
-    def remove_old_elements(self) -> None:
-        """
-        This method removes old UI elements from the screen except the title.
-
-        :return: None
-        """
-        for widget in self.app.winfo_children():
-            if widget != self.app.winfo_children()[0]:
-                widget.destroy()
-
-    def close(self):
-        """Close the app."""
-        self.app.destroy()
-        exit()
+        """Save the score to the score log and the leaderboard."""
+        self.leaderboard.save_score(ScoreRecord(user_name=self.user_name, guessed=guessed, tries=self.game.attempt,
+                                                difficulty=self.difficulty))
 
 
 if __name__ == "__main__":
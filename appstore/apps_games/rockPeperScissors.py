@@ -3,26 +3,31 @@ import random
 
 import customtkinter
 
+from appstore.base import BaseApp
+from appstore.screens import Screen, ScreenManager
 
-class RockPeperScissors:
+
+class RockPeperScissors(BaseApp):
     """This is the rock, paper, scissors class. It is a dataclass that contains the game logic and UI methods."""
-    app: customtkinter.CTk = customtkinter.CTk()
+    title = "Rock, Paper, Scissors"
     player_choice: str
     computer_choice: str
-    player_score: int = 0
-    computer_score: int = 0
+    player_score: int
+    computer_score: int
     max_rounds: int
-    rounds_played: int = 0
-    rounds_entry = None
+    rounds_played: int
+    rounds_entry: customtkinter.CTkEntry
+    screens: ScreenManager
 
-    def __init__(self):
-        """This is the constructor method for the rock, paper, scissors class. It initializes the game."""
-        self.app.geometry("720x480")
-        self.app.title("Rock, Paper, Scissors")
+    def build(self):
+        """This method builds the game in the app frame and shows the welcome screen."""
         customtkinter.CTkLabel(self.app, text="Rock, Paper, Scissors", font=("Arial", 24)).pack(pady=10)
-        self.app.protocol("WM_DELETE_WINDOW", self.close)
+        self.screens = ScreenManager(self.app)
+        self.screens.add("welcome", self.build_welcome_screen)
+        self.screens.add("choices", self.build_choices_screen)
+        self.screens.add("result", self.build_result_screen)
+        self.screens.add("game_over", self.build_game_over_screen)
         self.show_welcome_screen()
-        self.run()
 
     def get_winner(self) -> str:
         """
@@ -68,13 +73,12 @@ class RockPeperScissors:
         """
         return self.rounds_played >= self.max_rounds
 
-    def show_welcome_screen(self):
-        """Show the welcome screen."""
-        self.remove_old_elements()
-        customtkinter.CTkLabel(self.app, text="Hoeveel rondes wil je spelen?", font=("arial", 15)).pack()
-        self.rounds_entry = customtkinter.CTkEntry(self.app, font=("Arial", 18), width=350)
+    def build_welcome_screen(self, screen: Screen):
+        """Build the welcome screen."""
+        customtkinter.CTkLabel(screen.frame, text="Hoeveel rondes wil je spelen?", font=("arial", 15)).pack()
+        self.rounds_entry = customtkinter.CTkEntry(screen.frame, font=("Arial", 18), width=350)
         self.rounds_entry.pack(pady=5)
-        self.buttnonGroup = customtkinter.CTkFrame(self.app)
+        self.buttnonGroup = customtkinter.CTkFrame(screen.frame)
         start_button = customtkinter.CTkButton(self.buttnonGroup, text="Start", command=self.save_rounds)
         stop_button = customtkinter.CTkButton(self.buttnonGroup, text="Stop", command=self.close)
 
@@ -82,22 +86,45 @@ class RockPeperScissors:
         stop_button.pack(pady=5)
         self.buttnonGroup.pack()
 
+    def build_choices_screen(self, screen: Screen):
+        """Build the screen with the choices for the player."""
+        customtkinter.CTkLabel(screen.frame, text="Kies Rock, Paper of Scissors", font=("arial", 15)).pack()
+        rock_button = customtkinter.CTkButton(screen.frame, text="Rock", command=lambda: self.save_choice("Rock"))
+        rock_button.pack(pady=5)
+        paper_button = customtkinter.CTkButton(screen.frame, text="Paper", command=lambda: self.save_choice("Paper"))
+        paper_button.pack(pady=5)
+        scissors_button = customtkinter.CTkButton(screen.frame, text="Scissors", command=lambda: self.save_choice("Scissors"))
+        scissors_button.pack(pady=5)
+
+    def build_result_screen(self, screen: Screen):
+        """Build the screen with the result of a round."""
+        screen.add("player", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        screen.add("computer", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        screen.add("winner", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        customtkinter.CTkButton(screen.frame, text="Volgende ronde", command=self.show_choices).pack()
+
+    def build_game_over_screen(self, screen: Screen):
+        """Build the game over screen."""
+        customtkinter.CTkLabel(screen.frame, text="Game Over", font=("arial", 20)).pack()
+        screen.add("player_score", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        screen.add("computer_score", customtkinter.CTkLabel(screen.frame, text="", font=("arial", 15))).pack()
+        customtkinter.CTkButton(screen.frame, text="Opnieuw spelen", command=self.show_welcome_screen).pack()
+
+    def show_welcome_screen(self):
+        """Show the welcome screen."""
+        self.screens.show("welcome")
+
     def save_rounds(self):
         """Save the number of rounds entered by the player."""
         self.rounds_played = 0
+        self.player_score = 0
+        self.computer_score = 0
         self.max_rounds = int(self.rounds_entry.get())
         self.show_choices()
 
     def show_choices(self):
         """Show the choices for the player."""
-        self.remove_old_elements()
-        customtkinter.CTkLabel(self.app, text="Kies Rock, Paper of Scissors", font=("arial", 15)).pack()
-        rock_button = customtkinter.CTkButton(self.app, text="Rock", command=lambda: self.save_choice("Rock"))
-        rock_button.pack(pady=5)
-        paper_button = customtkinter.CTkButton(self.app, text="Paper", command=lambda: self.save_choice("Paper"))
-        paper_button.pack(pady=5)
-        scissors_button = customtkinter.CTkButton(self.app, text="Scissors", command=lambda: self.save_choice("Scissors"))
-        scissors_button.pack(pady=5)
+        self.screens.show("choices")
 
     def save_choice(self, choice: str):
         """Save the choice made by the player and start the round."""
@@ -107,39 +134,23 @@ class RockPeperScissors:
 
     def show_result(self):
         """Show the result of the round."""
-        self.remove_old_elements()
-        customtkinter.CTkLabel(self.app, text=f"Player: {self.player_choice}", font=("arial", 15)).pack()
-        customtkinter.CTkLabel(self.app, text=f"Computer: {self.computer_choice}", font=("arial", 15)).pack()
         winner = self.get_winner()
         self.update_scores(winner)
-        customtkinter.CTkLabel(self.app, text=f"Winner: {winner}", font=("arial", 15)).pack()
         self.rounds_played += 1
         if self.is_game_over():
             self.show_game_over()
-        else:
-            customtkinter.CTkButton(self.app, text="Volgende ronde", command=self.show_choices).pack()
+            return
+
+        screen = self.screens.show("result")
+        screen.set_text("player", f"Player: {self.player_choice}")
+        screen.set_text("computer", f"Computer: {self.computer_choice}")
+        screen.set_text("winner", f"Winner: {winner}")
 
     def show_game_over(self):
         """Show the game over screen."""
-        self.remove_old_elements()
-        customtkinter.CTkLabel(self.app, text="Game Over", font=("arial", 20)).pack()
-        customtkinter.CTkLabel(self.app, text=f"Player Score: {self.player_score}", font=("arial", 15)).pack()
-        customtkinter.CTkLabel(self.app, text=f"Computer Score: {self.computer_score}", font=("arial", 15)).pack()
-        customtkinter.CTkButton(self.app, text="Opnieuw spelen", command=self.show_welcome_screen).pack()
-
-    def remove_old_elements(self):
-        """Remove old elements from the screen."""
-        for widget in self.app.winfo_children():
-            widget.destroy()
-
-    def run(self):
-        """Run the rock, paper, scissors game."""
-        self.app.mainloop()
-
-    def close(self):
-        """Close the app."""
-        self.app.destroy()
-        exit()
+        screen = self.screens.show("game_over")
+        screen.set_text("player_score", f"Player Score: {self.player_score}")
+        screen.set_text("computer_score", f"Computer Score: {self.computer_score}")
 
 
 if __name__ == "__main__":
@@ -1,26 +1,31 @@
+from typing import TYPE_CHECKING
+
 import customtkinter
-import requests
-from CTkMessagebox import CTkMessagebox
-from satisfactory_api_client import SatisfactoryAPI, APIError
-from satisfactory_api_client.data import MinimumPrivilegeLevel
 
-from appstore.views import ServerSettingsWindow, DownloadSaveGameWindow
+from appstore.base import BaseApp
+
+if TYPE_CHECKING:
+    from satisfactory_api_client import SatisfactoryAPI
+
 # using my onw satisfactory api client SDK to interact with a satisfactory dedicated server https://pypi.org/project/satisfactory-api-client/
 
 
-class SatisfactoryApiInterface:
+def show_message(title: str, message: str, icon: str = "cancel", sound: bool = True) -> None:
+    """Show a message box. CTkMessagebox is imported on first use, so listing the app in the store does not load it."""
+    from CTkMessagebox import CTkMessagebox
+
+    CTkMessagebox(title=title, message=message, icon=icon, sound=sound)
 
-    app: customtkinter.CTk
-    api: SatisfactoryAPI
 
-    def __init__(self):
-        self.app = customtkinter.CTk()
-        self.app.geometry("720x480")
-        self.app.title("Satisfactory API Interface")
+class SatisfactoryApiInterface(BaseApp):
+
+    title = "Satisfactory API Interface"
+    api: "SatisfactoryAPI"
+
+    def build(self):
+        """Build the interface and show the login form."""
         customtkinter.CTkLabel(self.app, text="Satisfactory API Interface", font=("Arial", 24)).pack(pady=10)
-        self.app.protocol("WM_DELETE_WINDOW", self.close)
         self.show_welcome_screen()
-        self.app.mainloop()
 
     def show_welcome_screen(self):
         """Show the welcome screen with login form."""
@@ -65,7 +70,7 @@ class SatisfactoryApiInterface:
         server_data = self.get_server_data()
 
         if server_data is None:
-            CTkMessagebox(title="Error", message="Failed to connect to the server", icon="cancel", sound=True)
+            show_message("Error", "Failed to connect to the server")
             self.show_welcome_screen()
             return
 
@@ -144,12 +149,16 @@ class SatisfactoryApiInterface:
 
     def login(self):
         """Login to the satisfactory server using the provided details."""
+        import requests
+        from satisfactory_api_client import SatisfactoryAPI
+        from satisfactory_api_client.data import MinimumPrivilegeLevel
+
         host = self.host_entry.get()
         port = int(self.port_entry.get())
         privilege = self.privilege_entry.get()
         password = self.password_entry.get()
         if not host or not port:
-            CTkMessagebox(title="Error", message="Please enter the host and port", icon="cancel", sound=True)
+            show_message("Error", "Please enter the host and port")
             return
 
         self.api = SatisfactoryAPI(host=host, port=port)
@@ -163,34 +172,45 @@ class SatisfactoryApiInterface:
         try:
             self.api.health_check()
         except requests.exceptions.ConnectionError:
-            CTkMessagebox(title="Error", message="Failed to connect to the server", icon="cancel", sound=True)
+            show_message("Error", "Failed to connect to the server")
             return
 
         if password:
-            try:
-                self.api.password_login(minimum_privilege_level=privilege, password=password)
-            except APIError as e:
-                CTkMessagebox(title="Error", message=str(e), icon="cancel", sound=True)
-                return
+            response = self.request(lambda: self.api.password_login(minimum_privilege_level=privilege,
+                                                                    password=password))
         else:
-            try:
-                self.api.passwordless_login(minimum_privilege_level=privilege)
-            except APIError as e:
-                CTkMessagebox(title="Error", message=str(e), icon="cancel", sound=True)
-                return
+            response = self.request(lambda: self.api.passwordless_login(minimum_privilege_level=privilege))
+        if response is None:
+            return
 
         response = self.api.verify_authentication_token()
 
         if response.success:
             self.show_server_data()
 
-    def get_server_data(self) -> dict or None:
+    def request(self, call, denied: str | None = None):
+        """
+        Call the server API, showing the error in a message box if the call fails.
+
+        :param call: A function that calls the API and returns its response
+        :param denied: The message to show instead of the error if the privilege level is too low
+        :return: The response, or None if the call failed
+        """
+        from satisfactory_api_client import APIError
+
         try:
-            return self.api.query_server_state().data['serverGameState']
+            return call()
         except APIError as e:
-            CTkMessagebox(title="Error", message=str(e), icon="cancel", sound=True)
+            if denied is not None and e.error_code == 'insufficient_scope':
+                show_message("Error", denied)
+            else:
+                show_message("Error", str(e.message))
             return None
 
+    def get_server_data(self) -> dict or None:
+        response = self.request(self.api.query_server_state)
+        return response.data['serverGameState'] if response is not None else None
+
 
     def remove_old_elements(self):
         """Remove old elements from the window."""
@@ -204,13 +224,10 @@ class SatisfactoryApiInterface:
         seconds = seconds % 60
         return f'{hours:02}:{minutes:02}:{seconds:02}'
 
-    def close(self):
-        """Close the application."""
-        self.app.destroy()
-        exit()
-
     def download_save_game(self):
         """Download the save game from the server."""
+        from appstore.views import DownloadSaveGameWindow
+
         # tkinter input dialog to get the save name
         possible_save_games = self.enumerate_latest_save_games()
 
@@ -218,17 +235,21 @@ class SatisfactoryApiInterface:
             return
 
         if not possible_save_games:
-            CTkMessagebox(title="Error", message="No save games found on the server", icon="cancel", sound=True)
+            show_message("Error", "No save games found on the server")
             return
 
         DownloadSaveGameWindow(possible_save_games, self.api)
 
     def show_server_settings(self):
+        from appstore.views import ServerSettingsWindow
+
         server_settings = self.get_server_settings()
+        if server_settings is None:
+            return
 
         server_settings = server_settings['serverOptions']
         if not server_settings:
-            CTkMessagebox(title="Error", message="Failed to get server settings", icon="cancel", sound=True)
+            show_message("Error", "Failed to get server settings")
             return
 
         ServerSettingsWindow(server_settings).attributes("-topmost", True)
@@ -236,15 +257,10 @@ class SatisfactoryApiInterface:
     def enumerate_latest_save_games(self) -> list | bool:
         """Enumerate all save games on the server and return a list of formatted save game strings."""
         list_save_games = []
-        try:
-            save_games = self.api.enumerate_sessions().data
-        except APIError as e:
-            if e.error_code == 'insufficient_scope':
-                CTkMessagebox(title="Error", message="You need to be an administrator to download save games", icon="cancel", sound=True)
-                return False
-            else:
-                CTkMessagebox(title="Error", message=str(e.message), icon="cancel", sound=True)
-                return False
+        response = self.request(self.api.enumerate_sessions, "You need to be an administrator to download save games")
+        if response is None:
+            return False
+        save_games = response.data
 
         for session in save_games['sessions']:
             # Loop through the first three saveHeaders
@@ -256,11 +272,8 @@ class SatisfactoryApiInterface:
 
     def get_server_settings(self):
         """Get the server settings."""
-        try:
-            return self.api.get_server_options().data
-        except APIError as e:
-            CTkMessagebox(title="Error", message=str(e.message), icon="cancel", sound=True)
-            return None
+        response = self.request(self.api.get_server_options)
+        return response.data if response is not None else None
 
     def run_command(self):
         """Run a command on the server."""
@@ -271,29 +284,15 @@ class SatisfactoryApiInterface:
         if not command:
             return
 
-        try:
-            response = self.api.run_command(command)
-            CTkMessagebox(title="Command Output", message=response.data['commandResult'], icon="info", sound=False)
-        except APIError as e:
-            if e.error_code == 'insufficient_scope':
-                CTkMessagebox(title="Error", message="You need to be an administrator to run commands", icon="cancel", sound=True)
-                return
-
-            CTkMessagebox(title="Error", message=str(e.message), icon="cancel", sound=True)
-            return None
+        response = self.request(lambda: self.api.run_command(command), "You need to be an administrator to run commands")
+        if response is not None:
+            show_message("Command Output", response.data['commandResult'], icon="info", sound=False)
 
     def shutdown_server(self):
         """Shutdown the server."""
-        try:
-            response = self.api.shutdown()
-            CTkMessagebox(title="Success", message=response.data['message'], icon="info", sound=True)
-        except APIError as e:
-            if e.error_code == 'insufficient_scope':
-                CTkMessagebox(title="Error", message="You need to be an administrator to shutdown the server", icon="cancel", sound=True)
-                return
-
-            CTkMessagebox(title="Error", message=str(e.message), icon="cancel", sound=True)
-            return None
+        response = self.request(self.api.shutdown, "You need to be an administrator to shutdown the server")
+        if response is not None:
+            show_message("Success", response.data['message'], icon="info")
 
 
 if __name__ == "__main__":
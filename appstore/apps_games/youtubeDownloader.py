@@ -3,32 +3,52 @@ import threading
 from tkinter import StringVar
 
 import customtkinter as ctk
-from CTkMessagebox import CTkMessagebox
 from customtkinter import CTkLabel, CTkProgressBar, CTkButton
 
-from pytube import YouTube
-from pytube.exceptions import RegexMatchError
-from pytube.innertube import _default_clients
-from pytube import cipher
+from appstore.base import BaseApp
+
 import re
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# by @KhurramRana on GitHub https://github.com/pytube/pytube/issues/1973#issuecomment-2232907131 (400 error fix)
-# Adjust client versions for YouTube API requests
-_default_clients["ANDROID"]["context"]["client"]["clientVersion"] = "19.08.35"
-_default_clients["IOS"]["context"]["client"]["clientVersion"] = "19.08.35"
-_default_clients["ANDROID_EMBED"]["context"]["client"]["clientVersion"] = "19.08.35"
-_default_clients["IOS_EMBED"]["context"]["client"]["clientVersion"] = "19.08.35"
-_default_clients["IOS_MUSIC"]["context"]["client"]["clientVersion"] = "6.41"
-_default_clients["ANDROID_MUSIC"] = _default_clients["ANDROID_CREATOR"]
+_pytube_loaded = False
+
+
+def load_pytube():
+    """
+    Import pytube and apply the client and cipher fixes on first use, so importing this module stays cheap.
+
+    :return: The pytube YouTube class
+    """
+    global _pytube_loaded
+    from pytube import YouTube
+
+    if not _pytube_loaded:
+        from pytube.innertube import _default_clients
+        from pytube import cipher
+
+        # by @KhurramRana on GitHub https://github.com/pytube/pytube/issues/1973#issuecomment-2232907131 (400 error fix)
+        # Adjust client versions for YouTube API requests
+        _default_clients["ANDROID"]["context"]["client"]["clientVersion"] = "19.08.35"
+        _default_clients["IOS"]["context"]["client"]["clientVersion"] = "19.08.35"
+        _default_clients["ANDROID_EMBED"]["context"]["client"]["clientVersion"] = "19.08.35"
+        _default_clients["IOS_EMBED"]["context"]["client"]["clientVersion"] = "19.08.35"
+        _default_clients["IOS_MUSIC"]["context"]["client"]["clientVersion"] = "6.41"
+        _default_clients["ANDROID_MUSIC"] = _default_clients["ANDROID_CREATOR"]
+
+        cipher.get_throttling_function_name = get_throttling_function_name
+        _pytube_loaded = True
+
+    return YouTube
 
 
 # by @KhurramRana on GitHub https://github.com/pytube/pytube/issues/1973#issuecomment-2232907131 (400 error fix)
 # Override the throttling function in pytube's cipher module
 def get_throttling_function_name(js: str) -> str:
+    from pytube.exceptions import RegexMatchError
+
     function_patterns = [
         r'a\.[a-zA-Z]\s*&&\s*\([a-z]\s*=\s*a\.get\("n"\)\)\s*&&\s*'
         r'\([a-z]\s*=\s*([a-zA-Z0-9$]+)(\[\d+\])?\([a-z]\)',
@@ -58,50 +78,44 @@ def get_throttling_function_name(js: str) -> str:
     )
 
 
-cipher.get_throttling_function_name = get_throttling_function_name
-
-
 # https://www.youtube.com/watch?v=NI9LXzo0UY0 (video used for making the app, largely the gui)
 # YouTube Downloader Application Class
-class YoutubeDownloader:
+class YoutubeDownloader(BaseApp):
+    title = "YouTube Downloader"
     url_var: StringVar
     progress_label: CTkLabel
     finished_label: CTkLabel
     progress_bar: CTkProgressBar
     download_button: CTkButton
 
-    def __init__(self):
-        self.root = ctk.CTk()
-        self.root.geometry("720x480")
-        self.root.title("YouTube Downloader")
+    def build(self):
+        """Build the downloader."""
         self.create_widgets()
-        self.root.protocol("WM_DELETE_WINDOW", self.close)
-        self.root.mainloop()
 
     def create_widgets(self):
         """Create and arrange the UI components using pack."""
-        title_label = ctk.CTkLabel(self.root, text="YouTube Downloader", font=("Arial", 24))
+        title_label = ctk.CTkLabel(self.app, text="YouTube Downloader", font=("Arial", 24))
         title_label.pack(pady=10)
 
-        url_label = ctk.CTkLabel(self.root, text="Voer een URL in van de YouTube video die je wilt downloaden",
+        url_label = ctk.CTkLabel(self.app, text="Voer een URL in van de YouTube video die je wilt downloaden",
                                       font=("Arial", 18))
         url_label.pack(pady=5)
 
-        self.url_entry = ctk.CTkEntry(self.root, font=("Arial", 18), width=350)
+        self.url_entry = ctk.CTkEntry(self.app, font=("Arial", 18), width=350)
         self.url_entry.pack(pady=5)
 
-        self.progress_label = ctk.CTkLabel(self.root, text="0%", font=("Arial", 18))
+        self.progress_label = ctk.CTkLabel(self.app, text="0%", font=("Arial", 18))
         self.progress_label.pack(pady=5)
 
-        self.progress_bar = ctk.CTkProgressBar(self.root, width=350, height=20)
+        self.progress_bar = ctk.CTkProgressBar(self.app, width=350, height=20)
         self.progress_bar.set(0)
         self.progress_bar.pack(pady=5)
 
-        self.download_button = ctk.CTkButton(self.root, text="Download", font=("Arial", 18),
+        self.download_button = ctk.CTkButton(self.app, text="Download", font=("Arial", 18),
                                              command=self.start_download)
         self.download_button.pack(pady=10)
 
-        self.finished_label = ctk.CTkLabel(self.root, text="", font=("Arial", 18))
+        self.finished_label = ctk.CTkLabel(self.app, text="", font=("Arial", 18))
         self.finished_label.pack(pady=10)
 
     def start_download(self):
@@ -125,6 +139,8 @@ class YoutubeDownloader:
 
         :return: True if the URL is valid, False otherwise
         """
+        from CTkMessagebox import CTkMessagebox
+
         if not url:
             CTkMessagebox(title="Invoerfout", message="Voer een geldige URL in", icon="cancel", sound=True)
             return False
@@ -141,6 +157,7 @@ class YoutubeDownloader:
         """
         self.finished_label.configure(text="Downloaden...", text_color="blue")
         try:
+            YouTube = load_pytube()
             yt = YouTube(url, on_progress_callback=self.on_progress)
             stream = yt.streams.get_highest_resolution()
             stream.download(output_path="data/youtubeDownloader/videos")
@@ -162,11 +179,6 @@ class YoutubeDownloader:
         self.progress_bar.set(progress / 100)
         self.progress_label.configure(text=f"{progress:.2f}%")
 
-    def close(self):
-        """Close the application."""
-        self.root.destroy()
-        exit()
-
 # Main function to run the application
 if __name__ == "__main__":
     YoutubeDownloader()
@@ -0,0 +1,88 @@
+"""The lifecycle shared by all the apps and games in the AppStore."""
+from typing import Callable
+
+import customtkinter
+
+from appstore import debug
+
+
+class BaseApp:
+    """
+    Base class of the apps and games. An app is mounted into a frame on a root window that it does not own, so the
+    AppStore can switch between apps on one Tk interpreter.
+
+    Constructing an app without a root runs it standalone in its own window until it is closed.
+
+    Attributes
+    ----------
+    title : str
+        The window title while the app is mounted
+    root : customtkinter.CTk
+        The window the app is mounted on
+    app : customtkinter.CTkFrame
+        The frame that holds all the widgets of the app
+    listeners : list
+        Functions called with the app after every mount
+    """
+    listeners: list[Callable[["BaseApp"], None]] = []
+    title: str = ""
+    root: customtkinter.CTk | None = None
+    app: customtkinter.CTkFrame | None = None
+    on_close: Callable[[], None] | None = None
+
+    def __init__(self, root: customtkinter.CTk | None = None, on_close: Callable[[], None] | None = None) -> None:
+        """
+        Mount the app on the given root window, or run it standalone when no root is given.
+
+        :param root: The shared root window, or None to create a window and run its mainloop
+        :param on_close: Called after the app closes itself
+        """
+        self.on_close = on_close
+        if root is not None:
+            self.mount(root)
+            return
+
+        root = customtkinter.CTk()
+        root.geometry("720x480")
+        root.protocol("WM_DELETE_WINDOW", self.close)
+        self.on_close = root.destroy
+        self.mount(root)
+        debug.watch(root)
+        root.mainloop()
+
+    def build(self) -> None:
+        """Create the widgets of the app inside ``self.app``. Called once, on the first mount."""
+        raise NotImplementedError
+
+    def mount(self, root: customtkinter.CTk) -> None:
+        """
+        Show the app on the root window, building its widgets on the first mount.
+
+        :param root: The window to show the app on
+        """
+        self.root = root
+        self.root.title(self.title)
+        if self.app is None:
+            self.app = customtkinter.CTkFrame(root, fg_color="transparent")
+            self.build()
+
+        self.app.pack(fill="both", expand=True)
+        for listener in BaseApp.listeners:
+            listener(self)
+
+    def unmount(self) -> None:
+        """Hide the app, keeping its widgets and state for the next mount."""
+        if self.app is not None:
+            self.app.pack_forget()
+
+    def destroy(self) -> None:
+        """Destroy the widgets of the app. The next mount builds them again."""
+        if self.app is not None:
+            self.app.destroy()
+            self.app = None
+
+    def close(self) -> None:
+        """Close the app and hand control back to its owner."""
+        self.unmount()
+        if self.on_close is not None:
+            self.on_close()
@@ -0,0 +1,212 @@
+"""The searchable app catalog on the home screen of the AppStore."""
+import hashlib
+import os
+import re
+from typing import Callable
+
+import customtkinter
+
+from appstore.registry import App
+from appstore.widgets import VirtualList
+
+
+class ThumbnailCache:
+    """
+    Icons scaled once to thumbnail size and kept on disk, so the home screen never scales an icon twice.
+
+    Apps without an icon get a generated tile with their initials. Pillow is only imported when a thumbnail has to
+    be created or loaded.
+
+    The cache key of every app depends on the modification time of its icon. Keys are computed when the catalog is
+    refreshed, so binding a tile while scrolling does not touch the filesystem.
+    """
+    directory: str
+    size: int
+    images: dict[str, customtkinter.CTkImage]
+    keys: dict[tuple[str, str], str]
+
+    def __init__(self, directory: str = "data/appstore/thumbnails", size: int = 64) -> None:
+        """
+        Initialize the cache.
+
+        :param directory: The directory the thumbnails are stored in
+        :param size: The width and height of a thumbnail in pixels
+        """
+        self.directory = directory
+        self.size = size
+        self.images = {}
+        self.keys = {}
+
+    def refresh(self, apps: list[App]) -> None:
+        """
+        Compute the cache keys of the apps in the catalog, picking up changed icons.
+
+        :param apps: The apps in the catalog
+        """
+        self.keys = {(app.name, app.icon): self.key(app) for app in apps}
+
+    def key(self, app: App) -> str:
+        """Return the cache key of the thumbnail of an app, which changes when its icon changes."""
+        if app.icon and os.path.exists(app.icon):
+            source = f"{app.icon}:{os.path.getmtime(app.icon)}:{self.size}"
+        else:
+            source = f"{app.name}:{self.size}"
+        return hashlib.sha1(source.encode()).hexdigest()
+
+    def get(self, app: App) -> customtkinter.CTkImage:
+        """
+        Return the thumbnail of an app, creating it on disk the first time.
+
+        :param app: The app
+        :return: The thumbnail image
+        """
+        key = self.keys.get((app.name, app.icon))
+        if key is None:
+            key = self.keys[(app.name, app.icon)] = self.key(app)
+        image = self.images.get(key)
+        if image is not None:
+            return image
+
+        from PIL import Image
+
+        path = os.path.join(self.directory, f"{key}.png")
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            self.create(app).save(path)
+
+        with Image.open(path) as thumbnail:
+            thumbnail.load()
+            image = customtkinter.CTkImage(light_image=thumbnail, dark_image=thumbnail, size=(self.size, self.size))
+
+        self.images[key] = image
+        return image
+
+    def create(self, app: App):
+        """Scale the icon of an app to thumbnail size, or draw a tile with its initials if it has no icon."""
+        from PIL import Image, ImageDraw, ImageOps
+
+        if app.icon and os.path.exists(app.icon):
+            with Image.open(app.icon) as icon:
+                return ImageOps.fit(icon.convert("RGBA"), (self.size, self.size), Image.LANCZOS)
+
+        hue = int(hashlib.sha1(app.name.encode()).hexdigest()[:2], 16)
+        tile = Image.new("RGB", (self.size, self.size), f"hsl({hue * 360 // 256}, 45%, 45%)")
+        initials = "".join(word[0] for word in app.name.split()[:2]).upper()
+        draw = ImageDraw.Draw(tile)
+        draw.text((self.size / 2, self.size / 2), initials, fill="white", anchor="mm", font_size=self.size // 3)
+        return tile
+
+
+class SearchIndex:
+    """In-memory prefix index over the names and descriptions of the apps."""
+    prefixes: dict[str, set[int]]
+    size: int
+
+    def __init__(self, apps: list[App]) -> None:
+        """
+        Build the index.
+
+        :param apps: The apps to index; search results are indices into this list
+        """
+        self.prefixes = {}
+        self.size = len(apps)
+        for index, app in enumerate(apps):
+            for token in self.tokenize(f"{app.name} {app.description}"):
+                for length in range(1, len(token) + 1):
+                    self.prefixes.setdefault(token[:length], set()).add(index)
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """Split text into lowercase words."""
+        return re.findall(r"\w+", text.lower())
+
+    def search(self, query: str) -> list[int]:
+        """
+        Find the apps that have a word starting with every word of the query.
+
+        :param query: The search query
+        :return: The indices of the matching apps, in their original order
+        """
+        tokens = self.tokenize(query)
+        if not tokens:
+            return list(range(self.size))
+
+        matches = set.intersection(*(self.prefixes.get(token, set()) for token in tokens))
+        return sorted(matches)
+
+
+class CatalogView(customtkinter.CTkFrame):
+    """The home screen catalog: a search field above a grid of app tiles of which only the visible rows exist."""
+    columns: int = 3
+    apps: list[App]
+    results: list[int]
+
+    def __init__(self, master, on_launch: Callable[[int], None], thumbnails: ThumbnailCache | None = None, **kwargs):
+        """
+        Initialize the catalog.
+
+        :param master: The parent widget
+        :param on_launch: Called with the index of the app in the catalog when its tile is clicked
+        :param thumbnails: The thumbnail cache to take the icons from
+        """
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.on_launch = on_launch
+        self.thumbnails = thumbnails or ThumbnailCache()
+        self.apps = []
+        self.results = []
+        self.index = SearchIndex([])
+        self.search_job = None
+
+        self.search_entry = customtkinter.CTkEntry(self, placeholder_text="Search apps", font=("Arial", 16), width=350)
+        self.search_entry.pack(pady=(0, 10))
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+
+        self.grid_view = VirtualList(self, row_height=110, build_row=self.build_row, bind_row=self.bind_row)
+        self.grid_view.pack(fill="both", expand=True, padx=10)
+
+    def set_apps(self, apps: list[App]) -> None:
+        """
+        Show a new list of apps, keeping the current search.
+
+        :param apps: The apps in the catalog
+        """
+        self.apps = apps
+        self.index = SearchIndex(apps)
+        self.thumbnails.refresh(apps)
+        self.search()
+
+    def schedule_search(self, event=None) -> None:
+        """Search shortly after the user stops typing."""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(150, self.search)
+
+    def search(self) -> None:
+        """Filter the catalog on the text in the search field."""
+        self.search_job = None
+        self.results = self.index.search(self.search_entry.get())
+        self.grid_view.top = 0
+        self.grid_view.set_count((len(self.results) + self.columns - 1) // self.columns)
+
+    def build_row(self, frame: customtkinter.CTkFrame) -> list[customtkinter.CTkButton]:
+        """Create the tiles of one grid row."""
+        tiles = []
+        for column in range(self.columns):
+            frame.grid_columnconfigure(column, weight=1, uniform="tile")
+            tile = customtkinter.CTkButton(frame, text="", compound="top", width=180, height=100)
+            tile.grid(row=0, column=column, padx=5, pady=5)
+            tiles.append(tile)
+        return tiles
+
+    def bind_row(self, tiles: list[customtkinter.CTkButton], row: int) -> None:
+        """Show the apps of a grid row in its tiles."""
+        for column, tile in enumerate(tiles):
+            position = row * self.columns + column
+            if position >= len(self.results):
+                tile.grid_remove()
+                continue
+
+            index = self.results[position]
+            app = self.apps[index]
+            tile.configure(text=app.name, image=self.thumbnails.get(app), command=lambda i=index: self.on_launch(i))
+            tile.grid()
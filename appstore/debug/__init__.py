@@ -0,0 +1,81 @@
+"""
+Opt-in diagnostics for the AppStore and its apps.
+
+The diagnostics are switched on with environment variables, so they also apply to the apps that run in worker
+processes:
+
+- ``APPSTORE_PROFILE``: directory to write the callback latency statistics of each process to on exit
+- ``APPSTORE_PROFILE_THRESHOLD_MS``: the duration above which a callback is flagged for blocking the event loop
+- ``APPSTORE_WATCHDOG_MS``: report stalls of the Tk event loop longer than this many milliseconds
+- ``APPSTORE_LEAKS``: directory to write the widget, memory and ``after`` callback growth of each process to on exit
+"""
+import atexit
+import os
+
+from appstore.debug.leaks import LeakTracker
+from appstore.debug.profiler import CallbackProfiler, ProfilerOverlay
+from appstore.debug.watchdog import StallWatchdog
+
+__all__ = ["CallbackProfiler", "LeakTracker", "ProfilerOverlay", "StallWatchdog", "enable_from_environment", "watch"]
+
+
+def enable_from_environment() -> CallbackProfiler | None:
+    """
+    Install the diagnostics that are switched on in the environment.
+
+    :return: The installed callback profiler, or None if profiling is off
+    """
+    leaks_directory = os.environ.get("APPSTORE_LEAKS")
+    if leaks_directory:
+        track_leaks(leaks_directory)
+
+    directory = os.environ.get("APPSTORE_PROFILE")
+    if not directory:
+        return None
+
+    profiler = CallbackProfiler(threshold_ms=float(os.environ.get("APPSTORE_PROFILE_THRESHOLD_MS", 100)))
+    profiler.install()
+    atexit.register(profiler.dump, os.path.join(directory, f"callbacks-{os.getpid()}.json"))
+    return profiler
+
+
+def watch(root) -> StallWatchdog | None:
+    """
+    Start watching the event loop of a window for stalls, if the watchdog is switched on in the environment.
+
+    :param root: The window whose event loop is watched
+    :return: The started watchdog, or None if the watchdog is off
+    """
+    threshold_ms = os.environ.get("APPSTORE_WATCHDOG_MS")
+    if not threshold_ms:
+        return None
+
+    watchdog = StallWatchdog(root, threshold_ms=float(threshold_ms))
+    watchdog.start()
+    return watchdog
+
+
+def track_leaks(directory: str) -> LeakTracker:
+    """
+    Sample the widgets, memory and ``after`` callbacks at every screen transition and app mount, with a tracemalloc
+    snapshot at app mounts only, and write the results to the directory on exit.
+
+    :param directory: The directory to write the results to
+    :return: The leak tracker
+    """
+    from appstore.base import BaseApp
+    from appstore.screens import ScreenManager
+
+    tracker = LeakTracker()
+
+    def screen_shown(manager: ScreenManager, name: str) -> None:
+        root = manager.container.winfo_toplevel()
+        tracker.sample(root, f"{root.title()}:{name}")
+
+    def app_mounted(app: BaseApp) -> None:
+        tracker.sample(app.root, f"{app.title}:mount", snapshot=True)
+
+    ScreenManager.listeners.append(screen_shown)
+    BaseApp.listeners.append(app_mounted)
+    atexit.register(tracker.dump, os.path.join(directory, f"leaks-{os.getpid()}.json"))
+    return tracker
@@ -0,0 +1,122 @@
+"""Diagnostics that detect widgets, memory and ``after`` callbacks that keep growing over repeated play."""
+import json
+import logging
+import os
+import tracemalloc
+
+logger = logging.getLogger("appstore.leaks")
+
+
+def count_widgets(root) -> dict[str, int]:
+    """
+    Count the live widgets per toplevel window.
+
+    :param root: The root window
+    :return: The number of widgets by toplevel path
+    """
+    counts = {}
+    pending = [root]
+    while pending:
+        widget = pending.pop()
+        toplevel = str(widget.winfo_toplevel())
+        counts[toplevel] = counts.get(toplevel, 0) + 1
+        pending.extend(widget.winfo_children())
+    return counts
+
+
+class LeakTracker:
+    """
+    Takes a sample at every screen transition: the live widget count per toplevel, the memory traced by
+    tracemalloc and the number of pending ``after`` callbacks.
+
+    Samples are grouped by transition, so the same screen is compared with itself. A metric that grew at every
+    one of the last ``window`` samples of a transition is reported as a leak.
+
+    A tracemalloc snapshot, which is much slower than the counts, is only taken when an app is mounted. The source
+    lines that grew most between two mounts of an app are included in the reports of all transitions of that app.
+    """
+    window: int
+    series: dict[tuple[str, str], list[int]]
+    reported: set[tuple[str, str]]
+
+    def __init__(self, window: int = 5, top_lines: int = 5) -> None:
+        """
+        Initialize the tracker and start tracemalloc.
+
+        :param window: The number of consecutive growing samples that counts as a leak
+        :param top_lines: The number of source lines with the largest memory growth to include in a leak report
+        """
+        self.window = window
+        self.top_lines = top_lines
+        self.series = {}
+        self.reported = set()
+        self.snapshots = {}
+        self.growth = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def sample(self, root, transition: str, snapshot: bool = False) -> None:
+        """
+        Take a sample after a screen transition.
+
+        :param root: The root window of the app
+        :param transition: The name of the transition, such as ``"Hang Man:game"``
+        :param snapshot: Whether to also take a tracemalloc snapshot, as on an app mount
+        """
+        metrics = {f"widgets:{toplevel}": count for toplevel, count in count_widgets(root).items()}
+        metrics["after_callbacks"] = len(root.tk.splitlist(root.tk.call("after", "info")))
+        metrics["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+
+        if snapshot:
+            self.take_snapshot(transition.partition(":")[0])
+
+        for metric, value in metrics.items():
+            values = self.series.setdefault((transition, metric), [])
+            values.append(value)
+            self.check(transition, metric, values)
+
+    def take_snapshot(self, app: str) -> None:
+        """Take a tracemalloc snapshot for an app and keep the lines that grew most since its previous one."""
+        snapshot = tracemalloc.take_snapshot()
+        previous = self.snapshots.get(app)
+        if previous is not None:
+            self.growth[app] = [str(stat) for stat in snapshot.compare_to(previous, "lineno")[:self.top_lines]]
+        self.snapshots[app] = snapshot
+
+    def check(self, transition: str, metric: str, values: list[int]) -> None:
+        """Log a warning the first time a metric of a transition grew over the whole window."""
+        recent = values[-self.window - 1:]
+        if len(recent) <= self.window or (transition, metric) in self.reported:
+            return
+
+        if all(later > earlier for earlier, later in zip(recent, recent[1:])):
+            self.reported.add((transition, metric))
+            logger.warning("%s grows at every %s: %s", metric, transition, recent)
+
+    def leaks(self) -> list[dict]:
+        """Return the metrics that grew at every sample of the last window."""
+        result = []
+        for (transition, metric), values in self.series.items():
+            recent = values[-self.window - 1:]
+            if len(recent) > self.window and all(later > earlier for earlier, later in zip(recent, recent[1:])):
+                result.append({"transition": transition, "metric": metric, "values": recent,
+                               "top_growth": self.growth.get(transition.partition(":")[0], [])})
+        return result
+
+    def dump(self, path: str) -> None:
+        """
+        Write the leaks and the sampled series to a JSON file.
+
+        :param path: The path of the file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "leaks": self.leaks(),
+            "series": [{"transition": transition, "metric": metric, "values": values}
+                       for (transition, metric), values in self.series.items()],
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, indent=4)
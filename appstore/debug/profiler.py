@@ -0,0 +1,232 @@
+"""Opt-in latency profiling of the Tk callbacks of the AppStore and its apps."""
+import bisect
+import dataclasses
+import functools
+import json
+import logging
+import os
+import time
+import tkinter
+from typing import Callable
+
+import customtkinter
+
+logger = logging.getLogger("appstore.profiler")
+
+# Upper bounds of the histogram buckets in milliseconds; the last bucket holds everything slower.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# customtkinter widgets that call a user supplied ``command``.
+COMMAND_WIDGETS = ("CTkButton", "CTkCheckBox", "CTkComboBox", "CTkOptionMenu", "CTkRadioButton",
+                   "CTkSegmentedButton", "CTkSlider", "CTkSwitch")
+
+
+@dataclasses.dataclass
+class HandlerStats:
+    """Latency statistics of one callback."""
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_calls: int = 0
+    histogram: list[int] = dataclasses.field(default_factory=lambda: [0] * (len(BUCKETS_MS) + 1))
+
+    def record(self, duration_ms: float, slow: bool) -> None:
+        """Add one call to the statistics."""
+        self.calls += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.slow_calls += slow
+        self.histogram[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+
+
+def handler_name(func: Callable) -> str:
+    """
+    Return a readable name for a callback. Lambdas get the line they were defined on.
+
+    :param func: The callback
+    :return: The name of the callback
+    """
+    func = getattr(func, "__func__", func)
+    name = f"{getattr(func, '__module__', '?')}.{getattr(func, '__qualname__', repr(func))}"
+    if getattr(func, "__name__", "") == "<lambda>":
+        name += f":{func.__code__.co_firstlineno}"
+    return name
+
+
+def is_internal(func: Callable) -> bool:
+    """
+    Return True for callbacks that are not timed when they are registered: the callbacks of customtkinter and of
+    the diagnostics themselves, and the closures ``after`` registers, because ``after`` times the function it
+    schedules instead.
+    """
+    if getattr(func, "__qualname__", "").startswith("Misc.after.<locals>"):
+        return True
+
+    owner = getattr(func, "__self__", None)
+    if owner is None:
+        return False
+
+    owner_class = owner if isinstance(owner, type) else type(owner)
+    return owner_class.__module__.startswith(("customtkinter", "appstore.debug"))
+
+
+class CallbackProfiler:
+    """
+    Times every widget command, ``protocol`` handler, binding and ``after`` callback by wrapping them when they are
+    registered with Tk, and keeps a latency histogram per handler.
+
+    Handlers that run longer than the threshold block the event loop; they are logged as a warning and counted as
+    slow calls.
+    """
+    threshold_ms: float
+    stats: dict[str, HandlerStats]
+
+    def __init__(self, threshold_ms: float = 100) -> None:
+        """
+        Initialize the profiler.
+
+        :param threshold_ms: The duration in milliseconds above which a handler is flagged for blocking the event loop
+        """
+        self.threshold_ms = threshold_ms
+        self.stats = {}
+        self.originals = {}
+
+    def wrap(self, func: Callable, name: str | None = None) -> Callable:
+        """
+        Wrap a callback so its calls are timed.
+
+        :param func: The callback
+        :param name: The name to record the calls under, derived from the callback by default
+        :return: The timed callback
+        """
+        if getattr(func, "__profiled__", False):
+            return func
+
+        name = name or handler_name(func)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - start) * 1000)
+
+        timed.__profiled__ = True
+        return timed
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Record one call of a handler."""
+        slow = duration_ms > self.threshold_ms
+        if slow:
+            logger.warning("%s blocked the event loop for %.0f ms", name, duration_ms)
+
+        self.stats.setdefault(name, HandlerStats()).record(duration_ms, slow)
+
+    def install(self) -> None:
+        """Start wrapping the callbacks that are registered from now on."""
+        if self.originals:
+            return
+
+        profiler = self
+        original_register = tkinter.Misc._register
+
+        def register(widget, func, subst=None, needcleanup=1):
+            if not is_internal(func):
+                func = profiler.wrap(func)
+            return original_register(widget, func, subst, needcleanup)
+
+        original_after = tkinter.Misc.after
+
+        def after(widget, ms, func=None, *args):
+            if func is not None and not is_internal(func):
+                func = profiler.wrap(func)
+            return original_after(widget, ms, func, *args)
+
+        self.originals[(tkinter.Misc, "_register")] = original_register
+        self.originals[(tkinter.Misc, "after")] = original_after
+        tkinter.Misc._register = register
+        tkinter.Misc.after = after
+
+        for class_name in COMMAND_WIDGETS:
+            widget_class = getattr(customtkinter, class_name, None)
+            if widget_class is not None:
+                self.patch_command(widget_class)
+
+    def patch_command(self, widget_class: type) -> None:
+        """Wrap the ``command`` passed to the constructor and ``configure`` of a customtkinter widget class."""
+        profiler = self
+        original_init = widget_class.__init__
+        original_configure = widget_class.configure
+
+        def __init__(widget, *args, **kwargs):
+            if kwargs.get("command") is not None:
+                kwargs["command"] = profiler.wrap(kwargs["command"])
+            original_init(widget, *args, **kwargs)
+
+        def configure(widget, *args, **kwargs):
+            if kwargs.get("command") is not None:
+                kwargs["command"] = profiler.wrap(kwargs["command"])
+            return original_configure(widget, *args, **kwargs)
+
+        self.originals[(widget_class, "__init__")] = original_init
+        self.originals[(widget_class, "configure")] = original_configure
+        widget_class.__init__ = __init__
+        widget_class.configure = configure
+
+    def uninstall(self) -> None:
+        """Stop wrapping new callbacks. Callbacks that are already wrapped keep being timed."""
+        for (owner, attribute), original in self.originals.items():
+            setattr(owner, attribute, original)
+        self.originals.clear()
+
+    def summary(self) -> list[tuple[str, HandlerStats]]:
+        """Return the handlers, the slowest first."""
+        return sorted(self.stats.items(), key=lambda item: item[1].max_ms, reverse=True)
+
+    def report(self, limit: int = 20) -> str:
+        """Return a text table of the slowest handlers."""
+        lines = [f"{'handler':<60} {'calls':>6} {'avg ms':>8} {'max ms':>8} {'slow':>5}"]
+        for name, stats in self.summary()[:limit]:
+            lines.append(f"{name[-60:]:<60} {stats.calls:>6} {stats.total_ms / stats.calls:>8.1f} "
+                         f"{stats.max_ms:>8.1f} {stats.slow_calls:>5}")
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        """
+        Write the statistics of all handlers to a JSON file.
+
+        :param path: The path of the file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "threshold_ms": self.threshold_ms,
+            "buckets_ms": list(BUCKETS_MS),
+            "handlers": {name: dataclasses.asdict(stats) for name, stats in self.summary()},
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, indent=4)
+
+
+class ProfilerOverlay(customtkinter.CTkToplevel):
+    """Debug window that shows the slowest handlers of a profiler, refreshed every second."""
+    def __init__(self, master, profiler: CallbackProfiler):
+        super().__init__(master)
+        self.profiler = profiler
+        self.title("Callback profiler")
+        self.geometry("720x320")
+        self.textbox = customtkinter.CTkTextbox(self, font=("Courier", 12), wrap="none")
+        self.textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the table and schedule the next refresh."""
+        if not self.winfo_exists():
+            return
+
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", self.profiler.report())
+        self.after(1000, self.refresh)
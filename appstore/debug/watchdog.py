@@ -0,0 +1,120 @@
+"""Watchdog that detects stalls of the Tk event loop and reports where the main thread was stuck."""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+import customtkinter
+
+logger = logging.getLogger("appstore.watchdog")
+
+
+class StallWatchdog:
+    """
+    Detects stalls of the Tk event loop from a background thread.
+
+    The event loop sends a heartbeat with ``after`` every interval. When the heartbeat is late by more than the
+    threshold, the watchdog captures the stack of the Tk thread and appends a stall report to an NDJSON file. When
+    the event loop recovers, a second record with the total duration of the stall is appended.
+    """
+    root: customtkinter.CTk
+    threshold_ms: float
+    interval_ms: int
+    report_path: str
+
+    def __init__(self, root: customtkinter.CTk, threshold_ms: float = 500, interval_ms: int = 100,
+                 report_path: str = "data/debug/stalls.ndjson") -> None:
+        """
+        Initialize the watchdog.
+
+        :param root: The window whose event loop is watched
+        :param threshold_ms: How late the heartbeat may be before it counts as a stall
+        :param interval_ms: The time between two heartbeats
+        :param report_path: The NDJSON file the stall reports are appended to
+        """
+        self.root = root
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.report_path = report_path
+        self.last_beat = time.monotonic()
+        self.stall_started: float | None = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="appstore-watchdog", daemon=True)
+        self.tk_thread_id = threading.get_ident()
+        self.beat_id = None
+
+    def start(self) -> None:
+        """Start the heartbeat and the watchdog thread. Must be called from the Tk thread."""
+        self.tk_thread_id = threading.get_ident()
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+        self.beat()
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the watchdog."""
+        self.stopped.set()
+        if self.beat_id is not None:
+            try:
+                self.root.after_cancel(self.beat_id)
+            except Exception:
+                pass
+            self.beat_id = None
+
+    def on_destroy(self, event) -> None:
+        """Stop watching when the window is destroyed."""
+        if event.widget is self.root:
+            self.stop()
+
+    def beat(self) -> None:
+        """Record a heartbeat of the event loop and schedule the next one."""
+        self.last_beat = time.monotonic()
+        if not self.stopped.is_set():
+            self.beat_id = self.root.after(self.interval_ms, self.beat)
+
+    def run(self) -> None:
+        """Check the heartbeat until the watchdog is stopped."""
+        while not self.stopped.wait(self.interval_ms / 1000):
+            late_ms = (time.monotonic() - self.last_beat) * 1000 - self.interval_ms
+            if late_ms > self.threshold_ms and self.stall_started is None:
+                self.stall_started = self.last_beat
+                self.report_stall(late_ms)
+            elif late_ms <= self.threshold_ms and self.stall_started is not None:
+                self.report_recovery((self.last_beat - self.stall_started) * 1000)
+                self.stall_started = None
+
+    def capture_stack(self) -> list[dict]:
+        """Return the current stack of the Tk thread, innermost frame last."""
+        frame = sys._current_frames().get(self.tk_thread_id)
+        if frame is None:
+            return []
+
+        return [{"file": entry.filename, "line": entry.lineno, "function": entry.name, "code": entry.line}
+                for entry in traceback.extract_stack(frame)]
+
+    def report_stall(self, late_ms: float) -> None:
+        """Write a report of a stall that is going on."""
+        stack = self.capture_stack()
+        where = f"{stack[-1]['function']} ({stack[-1]['file']}:{stack[-1]['line']})" if stack else "unknown"
+        logger.warning("Tk event loop stalled for %.0f ms in %s", late_ms, where)
+        self.write({"event": "stall", "stalled_ms": round(late_ms), "stack": stack})
+
+    def report_recovery(self, duration_ms: float) -> None:
+        """Write the total duration of a stall that ended."""
+        logger.warning("Tk event loop recovered after %.0f ms", duration_ms)
+        self.write({"event": "recovered", "duration_ms": round(duration_ms)})
+
+    def write(self, record: dict) -> None:
+        """Append a record to the report file."""
+        record = {"time": datetime.now().isoformat(timespec="milliseconds"), "pid": os.getpid(), **record}
+        try:
+            directory = os.path.dirname(self.report_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.report_path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.error("Could not write the stall report: %s", e)
@@ -0,0 +1,6 @@
+"""
+Game engines without a user interface.
+
+The engines hold the data and rules of the games, so they can be shared between games, tested and run in batches
+without Tk. Importing an engine does not import customtkinter.
+"""
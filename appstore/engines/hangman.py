@@ -0,0 +1,269 @@
+"""
+HangMan game engine and batch simulator, without any UI.
+
+``HangmanGame`` holds the state of one game: the guessed letters as a set and the masked word, which is updated in
+place at the positions of a correctly guessed letter, so a guess takes time proportional to the occurrences of the
+letter instead of the length of the word times the number of guesses.
+
+The simulator plays games with a guessing strategy. A word and the guessed letters are bitmasks over the letters of
+the word list and the rest of a-z, so a game is a loop over the guessed letters with one AND per guess. It records
+the number of wrong guesses each game needed to complete its word; a game is won if that number is below the maximum
+number of tries, so one batch gives the win rate for every maximum at once. ``calibrate_max_tries`` uses that to
+pick the maximum number of tries of a difficulty tier from the words in it. The game uses the results stored in
+``MAX_TRIES``, so it does not simulate while it runs; ``python -m appstore.engines.hangman`` shows whether they still
+match the word list.
+"""
+import argparse
+import functools
+import os
+import random
+import string
+import sys
+from collections import Counter
+from typing import Callable, Iterable
+
+from appstore.engines.wordbank import TIERS, WordBank, load_word_bank
+
+CORRECT = "correct"
+WRONG = "wrong"
+REPEATED = "repeated"
+
+# The win rate of the noisy strategy each tier is calibrated to, from easy to hard.
+TARGET_WIN_RATES = (0.9, 0.7, 0.5)
+# The maximum number of tries of each tier, from ``calibrate_max_tries`` on the current word list.
+MAX_TRIES = (18, 14, 12)
+
+
+class HangmanGame:
+    """The state of a game of HangMan."""
+    word: str
+    max_tries: int
+    guessed: set[str]
+    masked: list[str]
+    misses: int
+
+    def __init__(self, word: str, max_tries: int) -> None:
+        """
+        Start a game.
+
+        :param word: The word to guess
+        :param max_tries: The number of wrong guesses that loses the game
+        """
+        self.word = word
+        self.max_tries = max_tries
+        self.guessed = set()
+        self.masked = ["_"] * len(word)
+        self.misses = 0
+        self.positions: dict[str, list[int]] = {}
+        for position, letter in enumerate(word):
+            self.positions.setdefault(letter, []).append(position)
+        self.missing = len(self.positions)
+
+    def guess(self, letter: str) -> str:
+        """
+        Guess a letter.
+
+        :param letter: The letter, in any case
+        :return: ``CORRECT``, ``WRONG`` or ``REPEATED`` if the letter was guessed before
+        :raises ValueError: If the guess is not a single letter or the game is over
+        """
+        letter = letter.strip().lower()
+        if len(letter) != 1 or not letter.isalpha():
+            raise ValueError(f"Not a letter: {letter!r}")
+        if self.over:
+            raise ValueError("The game is over")
+        if letter in self.guessed:
+            return REPEATED
+
+        self.guessed.add(letter)
+        positions = self.positions.get(letter)
+        if positions is None:
+            self.misses += 1
+            return WRONG
+
+        for position in positions:
+            self.masked[position] = letter
+        self.missing -= 1
+        return CORRECT
+
+    @property
+    def masked_word(self) -> str:
+        """The word with an underscore for every letter that was not guessed, separated by spaces."""
+        return " ".join(self.masked)
+
+    @property
+    def won(self) -> bool:
+        return self.missing == 0
+
+    @property
+    def lost(self) -> bool:
+        return self.misses >= self.max_tries and not self.won
+
+    @property
+    def over(self) -> bool:
+        return self.won or self.lost
+
+    @property
+    def attempt(self) -> int:
+        """The number of the current try, counting from 1 and stopping at the maximum."""
+        return min(self.misses + 1, self.max_tries)
+
+
+# A strategy returns the order in which to guess the letters of the alphabet for one game, given the letters
+# ordered from most to least frequent in the word list and a random number generator.
+Strategy = Callable[[list[int], random.Random], Iterable[int]]
+
+
+def random_strategy(letters: list[int], rng: random.Random) -> list[int]:
+    """Guess the letters in a random order."""
+    order = letters.copy()
+    rng.shuffle(order)
+    return order
+
+
+def frequency_strategy(letters: list[int], rng: random.Random) -> list[int]:
+    """Guess the letters from the most to the least frequent in the word list."""
+    return letters
+
+
+def noisy_strategy(letters: list[int], rng: random.Random, noise: float = 4.0) -> list[int]:
+    """
+    Guess the letters roughly by frequency, like a player who knows the common letters but not their exact order:
+    the rank of every letter is moved by a normally distributed amount before sorting.
+    """
+    ranks = {letter: rank + rng.gauss(0.0, noise) for rank, letter in enumerate(letters)}
+    return sorted(letters, key=ranks.__getitem__)
+
+
+STRATEGIES: dict[str, Strategy] = {
+    "random": random_strategy,
+    "frequency": frequency_strategy,
+    "noisy": noisy_strategy,
+}
+
+
+class Simulator:
+    """Plays batches of games on a list of words."""
+    masks: list[int]
+    letters: list[int]
+
+    def __init__(self, words: list[str]) -> None:
+        """
+        Prepare the words for simulation.
+
+        :param words: The words the games are played with
+        """
+        frequencies = Counter(letter for word in words for letter in set(word))
+        # A player guesses from the whole alphabet, so the letters no word has are guessed too, as the least frequent.
+        alphabet = [letter for letter, _ in frequencies.most_common()]
+        alphabet.extend(letter for letter in string.ascii_lowercase if letter not in frequencies)
+        bits = {letter: 1 << index for index, letter in enumerate(alphabet)}
+        self.letters = [bits[letter] for letter in alphabet]
+        self.masks = [functools.reduce(int.__or__, (bits[letter] for letter in set(word))) for word in words]
+
+    @staticmethod
+    def misses_to_win(mask: int, order: Iterable[int]) -> int:
+        """
+        Return the number of wrong guesses made before a word is complete.
+
+        :param mask: The letters of the word
+        :param order: The letters to guess, in order
+        """
+        covered = 0
+        misses = 0
+        for letter in order:
+            if letter & mask:
+                covered |= letter
+                if covered == mask:
+                    break
+            else:
+                misses += 1
+        return misses
+
+    def run(self, strategy: Strategy, games: int, rng: random.Random | None = None) -> list[int]:
+        """
+        Play games with random words.
+
+        :param strategy: The guessing strategy
+        :param games: The number of games
+        :param rng: The random number generator to use
+        :return: The number of games that needed each number of wrong guesses to win, by number of wrong guesses
+        """
+        rng = rng or random.Random()
+        counts = [0] * (len(self.letters) + 1)
+        if strategy is frequency_strategy:
+            # The order does not depend on the game, so each word always needs the same number of wrong guesses.
+            misses = [self.misses_to_win(mask, self.letters) for mask in self.masks]
+            for _ in range(games):
+                counts[misses[rng.randrange(len(misses))]] += 1
+            return counts
+
+        for _ in range(games):
+            mask = self.masks[rng.randrange(len(self.masks))]
+            counts[self.misses_to_win(mask, strategy(self.letters, rng))] += 1
+        return counts
+
+
+def win_rate(counts: list[int], max_tries: int) -> float:
+    """
+    Return the fraction of simulated games won with a maximum number of tries.
+
+    :param counts: The result of ``Simulator.run``
+    :param max_tries: The number of wrong guesses that loses a game
+    """
+    games = sum(counts)
+    return sum(counts[:max_tries]) / games if games else 0.0
+
+
+def calibrate(counts: list[int], target: float) -> int:
+    """Return the smallest maximum number of tries with which at least the target fraction of games is won."""
+    for max_tries in range(1, len(counts) + 1):
+        if win_rate(counts, max_tries) >= target:
+            return max_tries
+    return len(counts)
+
+
+def tier_words(bank: WordBank, tier: int) -> list[str]:
+    """Return the words of a difficulty tier of a word bank."""
+    return [bank.word(index) for index in bank.tier_range(tier)]
+
+
+def calibrate_max_tries(bank: WordBank, tier: int, games: int = 5000) -> int:
+    """
+    Return the maximum number of tries of a difficulty tier of a word bank: the smallest number with which a player
+    using the noisy strategy wins ``TARGET_WIN_RATES[tier]`` of the games. The simulation is seeded, so the result
+    only changes with the word list.
+
+    :param bank: The word bank
+    :param tier: The tier, 0 being the easiest
+    :param games: The number of simulated games
+    """
+    simulator = Simulator(tier_words(bank, tier))
+    counts = simulator.run(noisy_strategy, games, random.Random(tier))
+    return calibrate(counts, TARGET_WIN_RATES[tier])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate HangMan games on the word bank")
+    parser.add_argument("--games", type=int, default=100_000, help="games per tier and strategy (default: 100000)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    args = parser.parse_args()
+
+    # The simulator runs from the root of the repository, on the word list of the game in the appstore directory.
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "hangMan")
+    bank = load_word_bank(os.path.join(data_dir, "words.txt"), os.path.join(data_dir, "words.bank"))
+    for tier in range(TIERS):
+        simulator = Simulator(tier_words(bank, tier))
+        calibrated = calibrate_max_tries(bank, tier)
+        print(f"tier {tier}, target win rate {TARGET_WIN_RATES[tier]:.0%}, max tries {MAX_TRIES[tier]}"
+              + ("" if calibrated == MAX_TRIES[tier] else f", calibrated {calibrated}: update MAX_TRIES"))
+        for name, strategy in STRATEGIES.items():
+            counts = simulator.run(strategy, args.games, random.Random(args.seed))
+            rates = ", ".join(f"{max_tries}: {win_rate(counts, max_tries):.0%}" for max_tries in (5, 10, 15, 20))
+            print(f"  {name:<10} calibrated max tries {calibrate(counts, TARGET_WIN_RATES[tier]):>2}  "
+                  f"win rate by max tries {rates}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
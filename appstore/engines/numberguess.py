@@ -0,0 +1,156 @@
+"""
+Getalgoeroe game rules and a Monte Carlo simulator of its difficulty levels, without any UI.
+
+After every wrong guess the player gets a hint whether the number is higher or lower. The simulator plays a batch of
+games at once with NumPy: every game is an element of arrays holding its number and the range the number can still be
+in according to the hints, and each round makes one guess in every unfinished game. It records the guess on which
+each game was won, so one batch gives the win probability for every number of attempts at once.
+
+NumPy is imported when a simulation runs, so the game itself does not load it.
+"""
+import argparse
+import dataclasses
+import sys
+import time
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import numpy
+
+HIGHER = "higher"
+LOWER = "lower"
+CORRECT = "correct"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Level:
+    """A difficulty level: the number is between 1 and ``max_number``, and can be guessed ``attempts`` times."""
+    max_number: int
+    attempts: int
+
+
+# The levels of the difficulties of Getalgoeroe, from easy to hard. With hints, a player halving the range by eye
+# (the noisy policy) wins about 100%, 86% and 56% of the games; ``python -m appstore.engines.numberguess``, run from
+# the root of the repository, prints the odds of every policy.
+LEVEL_NAMES = ("easy", "medium", "hard")
+LEVELS = (Level(10, 5), Level(25, 5), Level(50, 5))
+
+
+def hint(guess: int, number: int) -> str:
+    """
+    Return the hint for a guess.
+
+    :param guess: The guessed number
+    :param number: The number to guess
+    :return: ``HIGHER`` if the number is higher than the guess, ``LOWER`` if it is lower, otherwise ``CORRECT``
+    """
+    if guess < number:
+        return HIGHER
+    if guess > number:
+        return LOWER
+    return CORRECT
+
+
+# A policy returns a guess for every game, given the lowest and highest number each game can still be according to
+# its hints and a NumPy random generator.
+Policy = Callable[["numpy.ndarray", "numpy.ndarray", "numpy.random.Generator"], "numpy.ndarray"]
+
+
+def random_policy(low: "numpy.ndarray", high: "numpy.ndarray", rng: "numpy.random.Generator") -> "numpy.ndarray":
+    """Guess a random number that agrees with the hints."""
+    return rng.integers(low, high + 1)
+
+
+def binary_search_policy(low: "numpy.ndarray", high: "numpy.ndarray",
+                         rng: "numpy.random.Generator") -> "numpy.ndarray":
+    """Guess the middle of the numbers that agree with the hints, which is optimal."""
+    return (low + high) // 2
+
+
+def noisy_policy(low: "numpy.ndarray", high: "numpy.ndarray", rng: "numpy.random.Generator",
+                 noise: float = 0.3) -> "numpy.ndarray":
+    """
+    Guess near the middle of the numbers that agree with the hints, like a player who halves the range by eye: the
+    guess is off by a normally distributed amount, ``noise`` times half the width of the range.
+    """
+    import numpy
+
+    middle = (low + high) / 2
+    guess = numpy.rint(middle + rng.normal(0.0, 1.0, low.shape) * noise * (high - low + 1) / 2)
+    return numpy.clip(guess, low, high).astype(low.dtype)
+
+
+POLICIES: dict[str, Policy] = {
+    "random": random_policy,
+    "binary": binary_search_policy,
+    "noisy": noisy_policy,
+}
+
+
+def simulate(max_number: int, policy: Policy, games: int, seed: int | None = None,
+             batch_size: int = 1 << 20) -> "numpy.ndarray":
+    """
+    Play games with random numbers, in batches of at most ``batch_size`` games.
+
+    :param max_number: The highest number
+    :param policy: The guessing policy
+    :param games: The number of games
+    :param seed: The seed of the random generator
+    :param batch_size: The number of games played at once
+    :return: The number of games won on each guess, by guess number; element 0 is unused
+    """
+    import numpy
+
+    rng = numpy.random.default_rng(seed)
+    # A policy that follows the hints removes at least one number per wrong guess, so every game ends.
+    counts = numpy.zeros(max_number + 1, dtype=numpy.int64)
+    for start in range(0, games, batch_size):
+        size = min(batch_size, games - start)
+        number = rng.integers(1, max_number + 1, size)
+        low = numpy.ones(size, dtype=number.dtype)
+        high = numpy.full(size, max_number, dtype=number.dtype)
+        for guess_number in range(1, max_number + 1):
+            guess = policy(low, high, rng)
+            won = guess == number
+            counts[guess_number] += numpy.count_nonzero(won)
+
+            playing = ~won
+            number, low, high, guess = number[playing], low[playing], high[playing], guess[playing]
+            if not number.size:
+                break
+            higher = guess < number
+            low = numpy.where(higher, guess + 1, low)
+            high = numpy.where(higher, high, guess - 1)
+    return counts
+
+
+def win_probability(counts: "numpy.ndarray", attempts: int) -> float:
+    """
+    Return the fraction of simulated games won with a number of attempts.
+
+    :param counts: The result of ``simulate``
+    :param attempts: The number of guesses a player has
+    """
+    games = counts.sum()
+    return float(counts[:attempts + 1].sum() / games) if games else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate Getalgoeroe games for every difficulty and policy")
+    parser.add_argument("--games", type=int, default=1_000_000, help="games per level and policy (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    args = parser.parse_args()
+
+    print(f"{'difficulty':<10} {'range':>6} {'attempts':>8} {'policy':<8} {'win':>7} {'ms':>7}")
+    for name, level in zip(LEVEL_NAMES, LEVELS):
+        for policy_name, policy in POLICIES.items():
+            start = time.perf_counter()
+            counts = simulate(level.max_number, policy, args.games, args.seed)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{name:<10} {f'1-{level.max_number}':>6} {level.attempts:>8} {policy_name:<8} "
+                  f"{win_probability(counts, level.attempts):>7.2%} {elapsed:>7.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Word bank for HangMan: a dictionary of words graded by difficulty, stored in a compact binary file that is memory
+mapped instead of parsed.
+
+The bank is built once from a plain word list with one word per line and rebuilt when the word list changes. The
+file layout, all integers unsigned 32-bit little-endian:
+
+- header: the magic ``NWB1``, the number of words and the index of the first word after each difficulty tier
+- offsets: ``count + 1`` byte offsets of the words in the word data
+- word data: the UTF-8 encoded words, tier by tier
+
+Sampling a word of a tier picks a random index in the tier's index range and reads two offsets, so it takes the
+same time for a bank of a hundred words as for one of a million.
+"""
+import argparse
+import functools
+import math
+import mmap
+import os
+import random
+import struct
+import sys
+from collections import Counter
+
+MAGIC = b"NWB1"
+TIERS = 3
+HEADER = struct.Struct(f"<4sI{TIERS}I")
+OFFSET = struct.Struct("<I")
+
+
+def read_word_list(path: str) -> list[str]:
+    """
+    Read a word list with one word per line. Words are lowercased; duplicates and words with characters other than
+    letters are skipped.
+
+    :param path: The path of the word list
+    :return: The words, in the order of the list
+    """
+    words = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            word = line.strip().lower()
+            if len(word) >= 2 and word.isalpha():
+                words[word] = None
+    return list(words)
+
+
+def grade(words: list[str]) -> list[float]:
+    """
+    Score the difficulty of guessing each word: the number of distinct letters, which is the number of correct guesses
+    needed, plus the average surprisal in bits of those letters in the word list, which is higher for letters a
+    player is unlikely to try early.
+
+    :param words: The words
+    :return: The difficulty score of each word
+    """
+    frequencies = Counter(letter for word in words for letter in set(word))
+    total = sum(frequencies.values())
+    scores = []
+    for word in words:
+        letters = set(word)
+        surprisal = sum(-math.log2(frequencies[letter] / total) for letter in letters) / len(letters)
+        scores.append(len(letters) + surprisal)
+    return scores
+
+
+def build_word_bank(source_path: str, bank_path: str) -> int:
+    """
+    Build a word bank from a word list. The words are graded and split into tiers of equal size, from easy to hard.
+
+    :param source_path: The path of the word list
+    :param bank_path: The path to write the bank to
+    :return: The number of words in the bank
+    :raises ValueError: If the word list has fewer words than there are tiers
+    """
+    words = read_word_list(source_path)
+    if len(words) < TIERS:
+        raise ValueError(f"{source_path} has fewer than {TIERS} words")
+
+    scores = grade(words)
+    ranked = [word for _, word in sorted(zip(scores, words))]
+    tier_ends = [len(ranked) * (tier + 1) // TIERS for tier in range(TIERS)]
+
+    data = bytearray()
+    offsets = bytearray()
+    for word in ranked:
+        offsets += OFFSET.pack(len(data))
+        data += word.encode("utf-8")
+    offsets += OFFSET.pack(len(data))
+
+    os.makedirs(os.path.dirname(bank_path) or ".", exist_ok=True)
+    temp_path = f"{bank_path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(ranked), *tier_ends))
+        file.write(offsets)
+        file.write(data)
+    os.replace(temp_path, bank_path)
+    return len(ranked)
+
+
+class WordBank:
+    """A memory-mapped word bank."""
+    count: int
+    tier_ends: tuple[int, ...]
+
+    def __init__(self, path: str) -> None:
+        """
+        Map a word bank file.
+
+        :param path: The path of the bank
+        :raises ValueError: If the file is not a word bank
+        """
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is not a word bank")
+        magic, self.count, *tier_ends = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a word bank")
+
+        self.tier_ends = tuple(tier_ends)
+        self.words_start = HEADER.size + OFFSET.size * (self.count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def word(self, index: int) -> str:
+        """Return the word at an index of the bank."""
+        position = HEADER.size + OFFSET.size * index
+        start, end = struct.unpack_from("<II", self.data, position)
+        return self.data[self.words_start + start:self.words_start + end].decode("utf-8")
+
+    def tier_range(self, tier: int) -> range:
+        """Return the indices of the words of a difficulty tier, 0 being the easiest."""
+        return range(self.tier_ends[tier - 1] if tier else 0, self.tier_ends[tier])
+
+    def sample(self, tier: int, rng: random.Random | None = None) -> str:
+        """
+        Return a random word of a difficulty tier.
+
+        :param tier: The tier, 0 being the easiest
+        :param rng: The random number generator to use, or the ``random`` module
+        :return: The word
+        """
+        indices = self.tier_range(tier)
+        return self.word((rng or random).randrange(indices.start, indices.stop))
+
+
+@functools.lru_cache(maxsize=None)
+def load_word_bank(source_path: str = "data/hangMan/words.txt", bank_path: str = "data/hangMan/words.bank") -> WordBank:
+    """
+    Load the word bank, building it first if the word list is newer than the bank. The bank is loaded once per
+    process and shared by every game.
+
+    :param source_path: The path of the word list
+    :param bank_path: The path of the bank
+    :return: The word bank
+    """
+    if not os.path.exists(bank_path) or os.path.getmtime(bank_path) < os.path.getmtime(source_path):
+        build_word_bank(source_path, bank_path)
+    return WordBank(bank_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build a HangMan word bank from a word list")
+    parser.add_argument("source", help="the word list, one word per line")
+    parser.add_argument("bank", nargs="?", default="data/hangMan/words.bank", help="the bank file to write")
+    args = parser.parse_args()
+
+    count = build_word_bank(args.source, args.bank)
+    bank = WordBank(args.bank)
+    print(f"Built {args.bank} with {count} words")
+    for tier in range(TIERS):
+        indices = bank.tier_range(tier)
+        print(f"tier {tier}: {len(indices)} words, for example {', '.join(bank.sample(tier) for _ in range(5))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,85 +1,169 @@
-import dataclasses
+import argparse
 import os
-import re
-import importlib
-import customtkinter
 
+import customtkinter
 
-@dataclasses.dataclass
-class App:
-    """The App class."""
-    path: str
-    name: str
-    class_name: str
-    description: str
+from appstore import debug
+from appstore.base import BaseApp
+from appstore.catalog import CatalogView
+from appstore.registry import App, AppRegistry
+from appstore.workers import WorkerPool
 
 
 class AppStore:
     """The hub of all the apps and games in the AppStore."""
     app: customtkinter.CTk
-    apps_games: list[App] = []
-
-    def __init__(self) -> None:
-        """Initialize the AppStore class."""
+    registry: AppRegistry
+    apps_games: list[App]
+    home_frame: customtkinter.CTkFrame
+    main_frame: CatalogView | None = None
+    running: dict[str, BaseApp]
+    current: BaseApp | None = None
+    pool: WorkerPool | None = None
+    status_label: customtkinter.CTkLabel
+
+    def __init__(self, isolated: bool = True) -> None:
+        """
+        Initialize the AppStore class.
+
+        :param isolated: Launch apps in worker processes instead of mounting them on the AppStore window
+        """
         self.app = customtkinter.CTk()
         self.app.geometry("720x480")
         self.app.title("AppStore")
-        label = customtkinter.CTkLabel(self.app, text="AppStore", font=("Arial", 24))
+        self.app.protocol("WM_DELETE_WINDOW", self.close_window)
+        self.home_frame = customtkinter.CTkFrame(self.app, fg_color="transparent")
+        self.home_frame.pack(fill="both", expand=True)
+        label = customtkinter.CTkLabel(self.home_frame, text="AppStore", font=("Arial", 24))
         label.pack(pady=10)
+        self.status_label = customtkinter.CTkLabel(self.home_frame, text="", font=("Arial", 14))
+        self.status_label.pack(side="bottom", pady=5)
+        self.registry = AppRegistry()
+        self.running = {}
         self.show_home_screen()
+        self.app.after_idle(self.refresh_apps)
+        debug.watch(self.app)
+        if isolated:
+            self.pool = WorkerPool(preload=[app for app in self.apps_games if app.builtin],
+                                   on_exit=self.app_exited)
+            self.supervise_workers()
 
     def get_apps(self) -> None:
-        """Populate a list of apps in the AppStore."""
-        path = "apps_games/"
-        filter_out = ["__init__.py", "__pycache__"]
-        dir_list = os.listdir(path)
-
-        for item in filter_out:
-            if item in dir_list:
-                dir_list.remove(item)
-
-        for file_name in dir_list:
-            if file_name.endswith(".py"):
-                name = re.sub(r"\.py", "", file_name)
-                name_display = re.sub(r"(\w)([A-Z])", r"\1 \2", name).capitalize()
-                class_name = name[0].upper() + name[1:]
-                self.apps_games.append(App(path=f"appstore.apps_games.{name}", name=name_display, description="", class_name=class_name))
+        """Populate the list of apps in the AppStore from the cached registry."""
+        self.apps_games = self.registry.apps
+
+    def refresh_apps(self) -> None:
+        """Update the registry with changed app modules and redraw the home screen if anything changed."""
+        if self.registry.refresh():
+            self.show_home_screen()
 
     def show_home_screen(self) -> None:
         """Show the home screen of the AppStore with apps and games."""
         self.get_apps()
-        main_frame = customtkinter.CTkFrame(self.app)
-        main_frame.pack(pady=10)
-        buttons_per_row = 3
+        if self.main_frame is None:
+            self.main_frame = CatalogView(self.home_frame, on_launch=self.show_app)
+            self.main_frame.pack(pady=10, fill="both", expand=True)
 
-        for index, app in enumerate(self.apps_games):
-            button = customtkinter.CTkButton(main_frame, text=app.name, command=lambda i=index: self.show_app(i))
-
-            row = index // buttons_per_row
-            col = index % buttons_per_row
-            button.grid(row=row, column=col, padx=5, pady=5)
+        self.main_frame.set_apps(self.apps_games)
 
     def show_app(self, index: int) -> None:
-        """Show and launch the app in a separate customtkinter window."""
+        """
+        Launch the app. With a worker pool the app runs in its own process, otherwise it is mounted on the AppStore
+        window, reusing the running instance if the app was opened before.
+        """
         app = self.apps_games[index]
         print(f"Launching {app.name}")
+        if self.pool is not None:
+            self.pool.launch(app)
+            self.status_label.configure(text=f"Starting {app.name}...")
+            return
+
         try:
+            instance = self.running.get(app.path)
+            if instance is not None:
+                self.home_frame.pack_forget()
+                instance.mount(self.app)
+                self.current = instance
+                return
+
+            # Dynamically import the app module and mount the app class
+            app_class = app.load_class()
+            self.home_frame.pack_forget()
+            self.current = app_class(root=self.app, on_close=self.show_store)
+            self.running[app.path] = self.current
+        except AttributeError:
+            print(f"Error: Class {app.class_name} not found in {app.path}.")
+        except Exception as e:
+            print(f"Error launching {app.name}: {e}")
+            self.show_store()
 
-            # Dynamically import the app module and run the main function or class
-            print(app.path, app.class_name)
-            module = importlib.import_module(app.path)
-            if hasattr(module, app.class_name):
-                self.app.withdraw()
-                app_class = getattr(module, app.class_name)
-                app_class()  # Create an instance of the class
+    def show_store(self) -> None:
+        """Return from the mounted app to the home screen."""
+        if self.current is not None:
+            self.current.unmount()
+            self.current = None
 
-                exit()
+        self.app.title("AppStore")
+        self.home_frame.pack(fill="both", expand=True)
 
-            else:
-                print(f"Error: Class {app.class_name} not found in {app.path}.")
-        except Exception as e:
-            print(f"Error launching {app.name}: {e}")
+    def supervise_workers(self) -> None:
+        """Poll the worker pool for exit reports and dead workers while the AppStore runs."""
+        self.pool.poll()
+        self.app.after(200, self.supervise_workers)
+
+    def app_exited(self, name: str, code: int, error: str | None) -> None:
+        """
+        Show the exit status of an app that ran in a worker process.
+
+        :param name: The name of the app
+        :param code: The exit code of the app
+        :param error: The traceback if the app crashed, None otherwise
+        """
+        if error is not None:
+            print(f"Error in {name}:\n{error}")
+
+        if code == 0:
+            self.status_label.configure(text=f"{name} closed.")
+        else:
+            self.status_label.configure(text=f"{name} stopped with exit code {code}.")
+
+    def close_window(self) -> None:
+        """Close the mounted app, or quit the AppStore when the home screen is shown."""
+        if self.current is not None:
+            self.current.close()
+            return
+
+        if self.pool is not None:
+            self.pool.shutdown()
+        self.app.destroy()
 
 
 if __name__ == "__main__":
-    AppStore().app.mainloop()
+    parser = argparse.ArgumentParser(description="Nano Application Marketplace")
+    parser.add_argument("--in-process", action="store_true",
+                        help="mount apps on the AppStore window instead of running them in worker processes")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="time every Tk callback and write the statistics of each process to DIR on exit")
+    parser.add_argument("--profile-overlay", action="store_true",
+                        help="show the slowest callbacks of the AppStore process in a debug window")
+    parser.add_argument("--leaks", metavar="DIR",
+                        help="track widget, memory and after callback growth and write it to DIR on exit")
+    parser.add_argument("--watchdog", metavar="MS", type=int,
+                        help="report stalls of the event loop longer than MS milliseconds to data/debug/stalls.ndjson")
+    args = parser.parse_args()
+
+    if args.leaks:
+        os.environ["APPSTORE_LEAKS"] = args.leaks
+    if args.watchdog:
+        os.environ["APPSTORE_WATCHDOG_MS"] = str(args.watchdog)
+
+    if args.profile:
+        os.environ["APPSTORE_PROFILE"] = args.profile
+    elif args.profile_overlay:
+        os.environ["APPSTORE_PROFILE"] = "data/debug"
+
+    profiler = debug.enable_from_environment()
+    store = AppStore(isolated=not args.in_process)
+    if profiler is not None and args.profile_overlay:
+        debug.ProfilerOverlay(store.app, profiler)
+    store.app.mainloop()
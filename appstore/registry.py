@@ -0,0 +1,288 @@
+"""Persistent manifest registry of the apps and games in the AppStore."""
+import ast
+import dataclasses
+import importlib
+import importlib.metadata
+import json
+import os
+import re
+import sys
+
+ENTRY_POINT_GROUP = "nanoappstore.apps"
+CACHE_VERSION = 2
+BUILTIN_PACKAGE = "appstore.apps_games"
+
+
+@dataclasses.dataclass
+class App:
+    """The App class."""
+    path: str
+    name: str
+    class_name: str
+    description: str
+    icon: str = ""
+    mtime: float = 0.0
+    search_path: str = ""
+
+    @property
+    def builtin(self) -> bool:
+        """Whether the app is one of the modules in ``apps_games``, rather than a plugin or an entry point."""
+        return self.path.startswith(f"{BUILTIN_PACKAGE}.") and not self.search_path
+
+    def load_class(self) -> type:
+        """
+        Import the module of the app and return the app class.
+
+        :return: The app class
+        :raises AttributeError: If the module does not define the app class
+        """
+        if self.search_path and self.search_path not in sys.path:
+            sys.path.insert(0, self.search_path)
+
+        module = importlib.import_module(self.path)
+        return getattr(module, self.class_name)
+
+
+class AppRegistry:
+    """
+    Cache of app manifests, stored on disk so the home screen can be rendered without scanning or importing modules.
+
+    Apps come from three sources:
+
+    - the modules in ``apps_games``, keyed by file name. Only the modules whose modification time changed are parsed
+      again, and the class name is read from the module source instead of being guessed from the file name.
+    - plugin directories in ``plugins_dir`` with a ``plugin.json`` that declares the name, module, class, description
+      and icon of the app. The module is imported from the plugin directory when the app is launched.
+    - ``nanoappstore.apps`` entry points of installed distributions, written as ``module:Class``. The description is
+      the summary of the distribution. The entry points are only read again when a directory on ``sys.path``
+      changed, which is when a distribution was installed or removed.
+    """
+    apps_dir: str
+    plugins_dir: str
+    cache_path: str
+    entries: dict[str, App]
+    fingerprint: list
+
+    def __init__(self, apps_dir: str = "apps_games/", cache_path: str = "data/appstore/registry.json",
+                 plugins_dir: str = "plugins/") -> None:
+        """Initialize the registry and load the cached manifests."""
+        self.apps_dir = apps_dir
+        self.plugins_dir = plugins_dir
+        self.cache_path = cache_path
+        self.entries = {}
+        self.fingerprint = []
+        self.load()
+
+    @property
+    def apps(self) -> list[App]:
+        """Return the registered apps, sorted by display name."""
+        return sorted(self.entries.values(), key=lambda app: app.name.lower())
+
+    def load(self) -> None:
+        """Load the manifests from the cache file, ignoring a missing, corrupt or outdated cache."""
+        try:
+            with open(self.cache_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+
+        self.fingerprint = data.get("entry_point_fingerprint", [])
+        for key, manifest in data.get("entries", {}).items():
+            try:
+                self.entries[key] = App(**manifest)
+            except TypeError:
+                continue
+
+    def save(self) -> None:
+        """Write the manifests to the cache file."""
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        data = {
+            "version": CACHE_VERSION,
+            "entry_point_fingerprint": self.fingerprint,
+            "entries": {key: dataclasses.asdict(app) for key, app in self.entries.items()},
+        }
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file, indent=4)
+        os.replace(temp_path, self.cache_path)
+
+    def refresh(self) -> bool:
+        """
+        Rebuild the manifests of the apps that were added, changed or removed since the last refresh.
+
+        :return: True if the registry changed, False otherwise
+        """
+        changed = self.refresh_modules()
+        changed = self.refresh_plugins() or changed
+        changed = self.refresh_entry_points() or changed
+        if changed:
+            self.save()
+
+        return changed
+
+    def replace_source(self, prefix: str, found: dict[str, App | None]) -> bool:
+        """
+        Update the entries of one source.
+
+        :param prefix: The key prefix of the source
+        :param found: The manifests found by key; None keeps the cached manifest
+        :return: True if an entry was added, changed or removed
+        """
+        changed = False
+        for key, app in found.items():
+            if app is not None and self.entries.get(key) != app:
+                self.entries[key] = app
+                changed = True
+
+        for key in [key for key in self.entries if key.startswith(prefix) and key not in found]:
+            del self.entries[key]
+            changed = True
+
+        return changed
+
+    def refresh_modules(self) -> bool:
+        """Parse the app modules in ``apps_dir`` that changed."""
+        found = {}
+        for item in os.scandir(self.apps_dir):
+            if not item.name.endswith(".py") or item.name == "__init__.py":
+                continue
+
+            key = f"module:{item.name}"
+            mtime = item.stat().st_mtime
+            cached = self.entries.get(key)
+            if cached is not None and cached.mtime == mtime:
+                found[key] = None
+                continue
+
+            app = self.read_manifest(item.path, mtime)
+            if app is not None:
+                found[key] = app
+
+        return self.replace_source("module:", found)
+
+    def refresh_plugins(self) -> bool:
+        """Read the ``plugin.json`` manifests in ``plugins_dir`` that changed."""
+        found = {}
+        if not os.path.isdir(self.plugins_dir):
+            return self.replace_source("plugin:", found)
+
+        for item in os.scandir(self.plugins_dir):
+            manifest_path = os.path.join(item.path, "plugin.json")
+            if not item.is_dir() or not os.path.exists(manifest_path):
+                continue
+
+            key = f"plugin:{item.name}"
+            mtime = os.path.getmtime(manifest_path)
+            cached = self.entries.get(key)
+            if cached is not None and cached.mtime == mtime:
+                found[key] = None
+                continue
+
+            app = self.read_plugin_manifest(item.path, mtime)
+            if app is not None:
+                found[key] = app
+
+        return self.replace_source("plugin:", found)
+
+    def refresh_entry_points(self) -> bool:
+        """Read the entry points of the installed distributions, if a distribution was installed or removed."""
+        fingerprint = entry_point_fingerprint()
+        if fingerprint == self.fingerprint:
+            return False
+
+        self.fingerprint = fingerprint
+        found = {}
+        for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+            distribution = entry_point.dist
+            summary = distribution.metadata.get("Summary", "") if distribution is not None else ""
+            key = f"entry_point:{distribution.name if distribution is not None else ''}/{entry_point.name}"
+            found[key] = App(
+                path=entry_point.module,
+                name=entry_point.name,
+                class_name=entry_point.attr,
+                description=summary or "",
+            )
+
+        self.replace_source("entry_point:", found)
+        return True
+
+    def read_manifest(self, file_path: str, mtime: float) -> App | None:
+        """
+        Read the manifest of an app module from its source, without importing it.
+
+        The app class is the top-level class named after the module. A module may declare a ``DESCRIPTION`` string
+        constant that is shown in the store.
+
+        :param file_path: The path of the module file
+        :param mtime: The modification time of the module file
+        :return: The app manifest, or None if the module does not contain an app
+        """
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                tree = ast.parse(file.read(), filename=file_path)
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+        class_name = None
+        description = ""
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and node.name.lower() == name.lower():
+                class_name = node.name
+            elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+                if any(isinstance(target, ast.Name) and target.id == "DESCRIPTION" for target in node.targets):
+                    description = str(node.value.value)
+
+        if class_name is None:
+            return None
+
+        icon = f"data/{name}/icon.png"
+        return App(
+            path=f"{BUILTIN_PACKAGE}.{name}",
+            name=re.sub(r"(\w)([A-Z])", r"\1 \2", name).capitalize(),
+            class_name=class_name,
+            description=description,
+            icon=icon if os.path.exists(icon) else "",
+            mtime=mtime,
+        )
+
+    def read_plugin_manifest(self, plugin_dir: str, mtime: float) -> App | None:
+        """
+        Read the ``plugin.json`` manifest of a plugin directory.
+
+        :param plugin_dir: The path of the plugin directory
+        :param mtime: The modification time of the manifest
+        :return: The app manifest, or None if the manifest is invalid
+        """
+        try:
+            with open(os.path.join(plugin_dir, "plugin.json"), "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            module = manifest["module"]
+            class_name = manifest["class"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        icon = os.path.join(plugin_dir, manifest["icon"]) if manifest.get("icon") else ""
+        return App(
+            path=module,
+            name=manifest.get("name", os.path.basename(plugin_dir)),
+            class_name=class_name,
+            description=manifest.get("description", ""),
+            icon=icon,
+            mtime=mtime,
+            search_path=os.path.abspath(plugin_dir),
+        )
+
+
+def entry_point_fingerprint() -> list:
+    """Return the modification times of the directories on ``sys.path``, which change when distributions change."""
+    fingerprint = []
+    for path in sys.path:
+        try:
+            fingerprint.append([path, os.path.getmtime(path or ".")])
+        except OSError:
+            continue
+    return fingerprint
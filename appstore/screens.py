@@ -0,0 +1,111 @@
+"""Screens that are built once and switched by hiding and showing them."""
+from typing import Callable
+
+import customtkinter
+
+
+class Screen:
+    """
+    A screen of an app: a frame with named widgets.
+
+    Widgets are created once by the builder of the screen. Afterwards only their data is updated, and ``set_text``
+    skips the update when the text and options did not change.
+    """
+    frame: customtkinter.CTkFrame
+    widgets: dict[str, customtkinter.CTkBaseClass]
+
+    def __init__(self, master) -> None:
+        """Initialize an empty screen inside the master widget."""
+        self.frame = customtkinter.CTkFrame(master, fg_color="transparent")
+        self.widgets = {}
+        self.texts = {}
+
+    def add(self, name: str, widget):
+        """
+        Register a widget under a name so it can be updated later.
+
+        :param name: The name of the widget
+        :param widget: The widget
+        :return: The widget
+        """
+        self.widgets[name] = widget
+        return widget
+
+    def __getitem__(self, name: str):
+        """Return the widget registered under the name."""
+        return self.widgets[name]
+
+    def set_text(self, name: str, text: str, **options) -> None:
+        """
+        Update the text (and options such as ``text_color``) of a widget if they changed.
+
+        :param name: The name of the widget
+        :param text: The new text
+        """
+        state = (text, tuple(sorted(options.items())))
+        if self.texts.get(name) == state:
+            return
+
+        self.widgets[name].configure(text=text, **options)
+        self.texts[name] = state
+
+
+class ScreenManager:
+    """
+    Switches between the screens of an app. Each screen is built the first time it is shown and hidden, not
+    destroyed, when another screen is shown.
+
+    The functions in ``listeners`` are called with the manager and the screen name after every ``show``.
+    """
+    listeners: list[Callable[["ScreenManager", str], None]] = []
+    container: customtkinter.CTkFrame
+    builders: dict[str, Callable[[Screen], None]]
+    screens: dict[str, Screen]
+    current: str | None
+
+    def __init__(self, container) -> None:
+        """
+        Initialize the screen manager.
+
+        :param container: The widget the screens are shown in
+        """
+        self.container = container
+        self.builders = {}
+        self.screens = {}
+        self.current = None
+
+    def add(self, name: str, builder: Callable[[Screen], None]) -> None:
+        """
+        Register a screen.
+
+        :param name: The name of the screen
+        :param builder: Creates the widgets of the screen inside ``screen.frame``
+        """
+        self.builders[name] = builder
+
+    def get(self, name: str) -> Screen:
+        """Return the screen, building it if it was never shown."""
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = Screen(self.container)
+            self.builders[name](screen)
+            self.screens[name] = screen
+        return screen
+
+    def show(self, name: str) -> Screen:
+        """
+        Show the screen and hide the screen that was shown before.
+
+        :param name: The name of the screen
+        :return: The shown screen
+        """
+        screen = self.get(name)
+        if self.current != name:
+            if self.current is not None:
+                self.screens[self.current].frame.pack_forget()
+            screen.frame.pack(fill="both", expand=True)
+            self.current = name
+
+        for listener in ScreenManager.listeners:
+            listener(self, name)
+        return screen
@@ -0,0 +1,13 @@
+"""
+Storage engines for the data of the apps.
+
+Apps change single records through a storage object instead of rewriting their whole data file, so the cost of a
+change does not grow with the amount of stored data.
+"""
+from appstore.storage.diary import DateIndex, DiaryStorage, Entry, EntrySummary, SqliteDiaryStorage, open_storage
+from appstore.storage.writebehind import WriteBehindError, WriteBehindStorage
+
+__all__ = [
+    "DateIndex", "DiaryStorage", "Entry", "EntrySummary", "SqliteDiaryStorage", "WriteBehindError", "WriteBehindStorage",
+    "open_storage",
+]
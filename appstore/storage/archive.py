@@ -0,0 +1,209 @@
+"""Streaming export and import of diaries as NDJSON archives."""
+import dataclasses
+import gzip
+import io
+import itertools
+import json
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime
+from typing import Callable, IO, Iterator
+
+from appstore.storage.diary import Entry, SqliteDiaryStorage, valid_entry_id
+
+# Called with the amount of work done and the total: entries for an export, bytes of the archive for an import.
+Progress = Callable[[int, int], None]
+
+
+@dataclasses.dataclass()
+class ImportResult:
+    imported: int = 0
+    skipped: int = 0
+    invalid: int = 0
+
+
+def entry_record(entry: Entry) -> dict:
+    """Return the JSON record of an entry in an archive."""
+    return {"id": entry.id, "date": entry.date.isoformat(), "title": entry.title, "content": entry.content,
+            "updated": entry.updated}
+
+
+def open_archive(raw: IO, path: str) -> IO:
+    """Wrap an archive file opened in binary mode as text, decompressing it if the file name ends with ``.gz``."""
+    if path.endswith(".gz"):
+        raw = gzip.GzipFile(fileobj=raw, mode=raw.mode)
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def export_entries(storage: SqliteDiaryStorage, user_name: str, path: str, progress: Progress | None = None,
+                   every: int = 500) -> int:
+    """
+    Write the entries of a user to an archive with one JSON object per line, reading them with a cursor so only one
+    entry is in memory at a time.
+
+    :param storage: The storage to export from
+    :param user_name: The user to export the entries of
+    :param path: The path of the archive; a ``.gz`` suffix compresses it
+    :param progress: Called after every ``every`` entries
+    :param every: The number of entries between progress reports
+    :return: The number of exported entries
+    """
+    total = storage.count_entries(user_name)
+    count = 0
+    with open(path, "wb") as raw, open_archive(raw, path) as file:
+        for entry in storage.iter_entries(user_name):
+            file.write(json.dumps(entry_record(entry), ensure_ascii=False))
+            file.write("\n")
+            count += 1
+            if progress is not None and count % every == 0:
+                progress(count, total)
+
+    if progress is not None:
+        progress(count, count)
+    return count
+
+
+def read_records(file: IO, raw: IO, user_name: str) -> Iterator[tuple[dict, int]]:
+    """
+    Read the entry records of an archive, with the position in the file after each record. A line that is not valid
+    JSON is returned as None.
+
+    NDJSON archives are read line by line. A file that starts with ``[`` is read as the old ``diary.json`` format: the
+    users in the array are decoded one at a time, and only the entries in the ``Diary`` list of the user whose
+    ``Username`` is ``user_name`` are returned, so the entries of other users never leak into the diary.
+
+    :param file: The archive, opened as text
+    :param raw: The underlying file, to report the position in
+    :param user_name: The user to read the entries of from an old ``diary.json``
+    """
+    first = file.read(1)
+    while first.isspace():
+        first = file.read(1)
+
+    if first == "[":
+        for user in iter_json_array(file):
+            if isinstance(user, dict) and user.get("Username") == user_name:
+                for item in user.get("Diary", []):
+                    yield item, raw.tell()
+        return
+
+    for line in itertools.chain([first + file.readline()], file):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record, raw.tell()
+
+
+def iter_json_array(file: IO, chunk_size: int = 65536) -> Iterator:
+    """
+    Decode the items of a JSON array one at a time, after its opening ``[`` was read. Only one item and one chunk of
+    the file are in memory at a time.
+
+    :param file: The file, positioned after the opening bracket
+    :param chunk_size: The number of characters to read at a time
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                raise
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        # A number at the end of the buffer may continue in the next chunk.
+        if end == len(buffer) and not eof:
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield item
+        buffer = buffer[end:]
+
+
+def parse_record(record: dict) -> Entry:
+    """
+    Create an entry from an exported record or an entry of the old ``diary.json`` format. A record without an id in
+    the format of ``ENTRY_ID`` gets a new id.
+
+    :raises KeyError: If a field is missing
+    :raises ValueError: If the date is invalid
+    """
+    if "Date" in record:
+        return Entry(datetime.strptime(record["Date"], "%d-%m-%Y").date(), record["Title"], record["Content"])
+
+    entry = Entry(date.fromisoformat(record["date"]), record["title"], record["content"])
+    if valid_entry_id(record.get("id")):
+        entry.id = record["id"]
+    if record.get("updated"):
+        entry.updated = float(record["updated"])
+    return entry
+
+
+def import_entries(storage: SqliteDiaryStorage, user_name: str, path: str, progress: Progress | None = None,
+                   batch_size: int = 500) -> ImportResult:
+    """
+    Add the entries of an archive to the entries of a user, streaming the archive and committing in batches.
+
+    An entry is skipped if the user has an entry with the same id, or with the same date, title and content, so
+    importing an archive twice, or an archive of the old format, adds nothing the second time.
+
+    :param storage: The storage to import into
+    :param user_name: The user to add the entries to
+    :param path: The path of an NDJSON archive, optionally gzip compressed, or of an old ``diary.json`` file, of
+        which only the entries of ``user_name`` are imported
+    :param progress: Called after every batch, with the position in the archive file
+    :param batch_size: The number of records per transaction
+    :return: The number of imported, skipped and invalid records
+    """
+    result = ImportResult()
+    size = os.path.getsize(path)
+    count = 0
+    position = 0
+    with open(path, "rb") as raw, open_archive(raw, path) as file:
+        records = read_records(file, raw, user_name)
+        while True:
+            with storage.connection:
+                for record, position in records:
+                    count += 1
+                    try:
+                        entry = parse_record(record)
+                    except (KeyError, TypeError, ValueError):
+                        result.invalid += 1
+                    else:
+                        if storage.contains(user_name, entry):
+                            result.skipped += 1
+                        else:
+                            try:
+                                storage.insert(user_name, entry)
+                            except sqlite3.IntegrityError:
+                                # The id belongs to an entry of another user, as when copying a diary to a new user.
+                                entry.id = uuid.uuid4().hex
+                                storage.insert(user_name, entry)
+                            result.imported += 1
+
+                    if count % batch_size == 0:
+                        break
+                else:
+                    break
+
+            if progress is not None:
+                progress(position, size)
+
+    if progress is not None:
+        progress(size, size)
+    return result
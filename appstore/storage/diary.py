@@ -0,0 +1,500 @@
+"""Storage of the diary entries."""
+import abc
+import array
+import bisect
+import dataclasses
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+import uuid
+from datetime import date, datetime
+from typing import Callable, Iterator
+
+from appstore.storage.search import tokenize
+
+logger = logging.getLogger("appstore.storage.diary")
+
+
+# The format of entry ids: the uuid4 hex of new entries, and ids of at most 64 letters, digits, dashes and
+# underscores from archives. Ids are used as file names when syncing, so nothing else is accepted.
+ENTRY_ID = re.compile(r"[0-9A-Za-z_-]{1,64}")
+
+
+def valid_entry_id(entry_id: object) -> bool:
+    """Return whether a value is an entry id in the format of ``ENTRY_ID``."""
+    return isinstance(entry_id, str) and ENTRY_ID.fullmatch(entry_id) is not None
+
+
+@dataclasses.dataclass(slots=True)
+class Entry:
+    """A diary entry. The storage keeps its date as an ordinal and converts it to a ``date`` when loading."""
+    date: date
+    title: str
+    content: str
+    id: str = dataclasses.field(default_factory=lambda: uuid.uuid4().hex)
+    updated: float = dataclasses.field(default_factory=time.time)
+
+
+@dataclasses.dataclass(slots=True)
+class EntrySummary:
+    """The date and title of an entry, shown in lists without loading the content."""
+    date: date
+    title: str
+    id: str
+
+
+def entry_hash(entry: Entry) -> str:
+    """Return a hash of the date, title and content of an entry, which changes when the entry is edited."""
+    data = json.dumps([entry.date.toordinal(), entry.title, entry.content], ensure_ascii=False)
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+class DateIndex:
+    """
+    The date ordinals and ids of the entries of a user in (date, id) order, for range queries with bisect.
+
+    The ordinals are kept in an array of machine integers next to a list of the ids, instead of one tuple per entry.
+    The position of an entry is also its position in the paged summaries of ``load_summaries``, which use the same
+    order.
+    """
+    ordinals: array.array
+    ids: list[str]
+
+    def __init__(self, ordinals: array.array | None = None, ids: list[str] | None = None) -> None:
+        """
+        Initialize the index.
+
+        :param ordinals: The date ordinals, sorted
+        :param ids: The ids of the entries, in the same order as the ordinals
+        """
+        self.ordinals = ordinals if ordinals is not None else array.array("l")
+        self.ids = ids if ids is not None else []
+
+    @classmethod
+    def from_keys(cls, keys) -> "DateIndex":
+        """Create an index from sorted (date ordinal, id) pairs."""
+        index = cls()
+        for ordinal, entry_id in keys:
+            index.ordinals.append(ordinal)
+            index.ids.append(entry_id)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, ordinal: int, entry_id: str) -> int:
+        """Return the position the (date ordinal, id) key has or would have in the index."""
+        low = bisect.bisect_left(self.ordinals, ordinal)
+        high = bisect.bisect_right(self.ordinals, ordinal, low)
+        return bisect.bisect_left(self.ids, entry_id, low, high)
+
+    def add(self, entry_date: date, entry_id: str) -> int:
+        """Add the key of an entry and return its position."""
+        ordinal = entry_date.toordinal()
+        position = self.find(ordinal, entry_id)
+        self.ordinals.insert(position, ordinal)
+        self.ids.insert(position, entry_id)
+        return position
+
+    def remove(self, entry_date: date, entry_id: str) -> None:
+        """Remove the key of an entry, if it is in the index."""
+        ordinal = entry_date.toordinal()
+        position = self.find(ordinal, entry_id)
+        if position < len(self.ids) and self.ids[position] == entry_id and self.ordinals[position] == ordinal:
+            del self.ordinals[position]
+            del self.ids[position]
+
+    def position(self, entry_date: date) -> int:
+        """Return the position of the first entry on or after a date."""
+        return bisect.bisect_left(self.ordinals, entry_date.toordinal())
+
+    def range(self, start: date, end: date) -> range:
+        """
+        Return the positions of the entries between two dates.
+
+        :param start: The first date, inclusive
+        :param end: The last date, inclusive
+        :return: The positions
+        """
+        return range(self.position(start), bisect.bisect_right(self.ordinals, end.toordinal()))
+
+    def ids_between(self, start: date, end: date) -> list[str]:
+        """Return the ids of the entries between two dates, inclusive, in date order."""
+        positions = self.range(start, end)
+        return self.ids[positions.start:positions.stop]
+
+
+class DiaryStorage(abc.ABC):
+    """
+    Interface of a diary storage engine. Every method works on one entry or one user, so the cost of a change does
+    not depend on the size of the other diaries.
+    """
+
+    @abc.abstractmethod
+    def get_password_hash(self, user_name: str) -> str | None:
+        """Return the password hash of a user, or None if the user does not exist."""
+
+    @abc.abstractmethod
+    def add_user(self, user_name: str, password_hash: str) -> None:
+        """Store a new user, or replace the password hash of an existing user."""
+
+    @abc.abstractmethod
+    def load_entries(self, user_name: str) -> list[Entry]:
+        """Return all entries of a user, ordered by date."""
+
+    @abc.abstractmethod
+    def count_entries(self, user_name: str) -> int:
+        """Return the number of entries of a user."""
+
+    @abc.abstractmethod
+    def load_summaries(self, user_name: str, offset: int, limit: int) -> list[EntrySummary]:
+        """
+        Return a page of the summaries of the entries of a user, ordered by date.
+
+        :param user_name: The user
+        :param offset: The position of the first summary in the date order
+        :param limit: The maximum number of summaries
+        :return: The summaries
+        """
+
+    @abc.abstractmethod
+    def load_dates(self, user_name: str) -> DateIndex:
+        """Return the date index of the entries of a user."""
+
+    @abc.abstractmethod
+    def load_range(self, user_name: str, start: date, end: date) -> list[EntrySummary]:
+        """Return the summaries of the entries of a user between two dates, inclusive, in date order."""
+
+    @abc.abstractmethod
+    def get_entry(self, user_name: str, entry_id: str) -> Entry | None:
+        """Return an entry of a user with its content, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def add_entry(self, user_name: str, entry: Entry) -> None:
+        """Store a new entry of a user."""
+
+    @abc.abstractmethod
+    def update_entry(self, user_name: str, entry: Entry) -> None:
+        """Replace the stored entry with the same id."""
+
+    @abc.abstractmethod
+    def delete_entry(self, user_name: str, entry_id: str) -> None:
+        """Delete an entry of a user."""
+
+    @abc.abstractmethod
+    def search(self, user_name: str, query: str, limit: int = 100) -> list[Entry]:
+        """
+        Find the entries of a user with a word in the title or content that starts with every word of the query.
+
+        :param user_name: The user to search the entries of
+        :param query: The search query
+        :param limit: The maximum number of entries to return
+        :return: The matching entries, newest first
+        """
+
+    def flush(self) -> None:
+        """Wait until all changes are written."""
+
+    def close(self) -> None:
+        """Release the resources of the storage."""
+
+
+def add_postings(storage: "SqliteDiaryStorage") -> None:
+    """Create the full-text index and index the existing entries."""
+    storage.connection.execute("""
+        CREATE TABLE postings (
+            username TEXT NOT NULL,
+            token TEXT NOT NULL,
+            entry_id TEXT NOT NULL,
+            PRIMARY KEY (username, token, entry_id)
+        ) WITHOUT ROWID
+    """)
+    storage.connection.execute("CREATE INDEX postings_entry ON postings (entry_id)")
+    rows = storage.connection.execute("SELECT username, date, title, content, id, updated FROM entries").fetchall()
+    for row in rows:
+        storage.index_entry(row[0], Entry(date.fromordinal(row[1]), *row[2:]))
+
+
+def add_hashes(storage: "SqliteDiaryStorage") -> None:
+    """Add the content hash of every entry, used to find the entries that changed since a sync."""
+    storage.connection.execute("ALTER TABLE entries ADD COLUMN hash TEXT NOT NULL DEFAULT ''")
+    storage.connection.execute("""
+        CREATE TABLE sync_state (
+            folder TEXT NOT NULL,
+            username TEXT NOT NULL,
+            entry_id TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (folder, username, entry_id)
+        ) WITHOUT ROWID
+    """)
+    rows = storage.connection.execute("SELECT date, title, content, id, updated FROM entries").fetchall()
+    storage.connection.executemany("UPDATE entries SET hash = ? WHERE id = ?",
+                                   [(entry_hash(Entry(date.fromordinal(row[0]), *row[1:])), row[3]) for row in rows])
+
+
+# Each migration upgrades the schema by one version; the current version is kept in PRAGMA user_version. A migration
+# is an SQL script or a function that is called with the storage.
+MIGRATIONS: list[str | Callable[["SqliteDiaryStorage"], None]] = [
+    """
+    CREATE TABLE entries (
+        id TEXT PRIMARY KEY,
+        username TEXT NOT NULL,
+        date INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        updated REAL NOT NULL
+    );
+    CREATE INDEX entries_user_date ON entries (username, date);
+    CREATE TABLE meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE users (
+        username TEXT PRIMARY KEY,
+        password_hash TEXT NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    add_postings,
+    """
+    CREATE INDEX entries_user_date_id ON entries (username, date, id);
+    DROP INDEX entries_user_date;
+    """,
+    add_hashes,
+]
+
+
+class SqliteDiaryStorage(DiaryStorage):
+    """
+    Diary storage in an SQLite database. Dates are stored as ordinals, and the database runs in WAL mode, so adding,
+    editing or deleting an entry appends one small change to the write-ahead log.
+
+    The ``postings`` table is an inverted index from the stems of the words in the title and content of an entry to
+    the entry. It is updated in the same transaction as the entry, and queried with a range scan per query word.
+    """
+    path: str
+    connection: sqlite3.Connection
+
+    def __init__(self, path: str = "data/diary/diary.db") -> None:
+        """
+        Open the database and upgrade its schema.
+
+        :param path: The path of the database file
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.migrate()
+
+    def migrate(self) -> None:
+        """
+        Run the schema migrations the database has not had yet. Each migration and the update of the schema version
+        run in one explicit transaction, so an interrupted migration is rolled back entirely and runs again.
+        """
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            try:
+                if callable(migration):
+                    # sqlite3 only opens a transaction by itself before DML, not before CREATE or ALTER.
+                    self.connection.execute("BEGIN")
+                    migration(self)
+                    self.connection.execute(f"PRAGMA user_version={number}")
+                    self.connection.commit()
+                else:
+                    # executescript commits first, so the transaction is part of the script.
+                    self.connection.executescript(f"BEGIN;\n{migration}\nPRAGMA user_version={number};\nCOMMIT;")
+            except BaseException:
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                raise
+
+    def get_meta(self, key: str) -> str | None:
+        """Return a value from the meta table."""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Store a value in the meta table."""
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_password_hash(self, user_name: str) -> str | None:
+        row = self.connection.execute("SELECT password_hash FROM users WHERE username = ?", (user_name,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, user_name: str, password_hash: str) -> None:
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO users (username, password_hash) VALUES (?, ?)",
+                                    (user_name, password_hash))
+
+    def load_entries(self, user_name: str) -> list[Entry]:
+        rows = self.connection.execute(
+            "SELECT date, title, content, id, updated FROM entries WHERE username = ? ORDER BY date", (user_name,))
+        return [Entry(date.fromordinal(row[0]), *row[1:]) for row in rows]
+
+    def iter_entries(self, user_name: str) -> Iterator[Entry]:
+        """Return the entries of a user in date order, reading them from the database while iterating."""
+        rows = self.connection.execute(
+            "SELECT date, title, content, id, updated FROM entries WHERE username = ? ORDER BY date, id", (user_name,))
+        for row in rows:
+            yield Entry(date.fromordinal(row[0]), *row[1:])
+
+    def contains(self, user_name: str, entry: Entry) -> bool:
+        """Return whether the user has an entry with the same id, or with the same date, title and content."""
+        row = self.connection.execute(
+            "SELECT 1 FROM entries WHERE username = ? AND (id = ? OR (date = ? AND title = ? AND content = ?)) LIMIT 1",
+            (user_name, entry.id, entry.date.toordinal(), entry.title, entry.content)).fetchone()
+        return row is not None
+
+    def count_entries(self, user_name: str) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM entries WHERE username = ?", (user_name,)).fetchone()[0]
+
+    def load_summaries(self, user_name: str, offset: int, limit: int) -> list[EntrySummary]:
+        rows = self.connection.execute(
+            "SELECT date, title, id FROM entries WHERE username = ? ORDER BY date, id LIMIT ? OFFSET ?",
+            (user_name, limit, offset))
+        return [EntrySummary(date.fromordinal(row[0]), row[1], row[2]) for row in rows]
+
+    def load_dates(self, user_name: str) -> DateIndex:
+        rows = self.connection.execute(
+            "SELECT date, id FROM entries WHERE username = ? ORDER BY date, id", (user_name,))
+        return DateIndex.from_keys(rows)
+
+    def load_range(self, user_name: str, start: date, end: date) -> list[EntrySummary]:
+        rows = self.connection.execute(
+            "SELECT date, title, id FROM entries WHERE username = ? AND date BETWEEN ? AND ? ORDER BY date, id",
+            (user_name, start.toordinal(), end.toordinal()))
+        return [EntrySummary(date.fromordinal(row[0]), row[1], row[2]) for row in rows]
+
+    def get_summaries(self, user_name: str, entry_ids: list[str]) -> dict[str, EntrySummary]:
+        """Return the summaries of the entries of a user with the given ids, by id."""
+        placeholders = ", ".join("?" * len(entry_ids))
+        rows = self.connection.execute(
+            f"SELECT date, title, id FROM entries WHERE username = ? AND id IN ({placeholders})",
+            (user_name, *entry_ids))
+        return {row[2]: EntrySummary(date.fromordinal(row[0]), row[1], row[2]) for row in rows}
+
+    def get_entry(self, user_name: str, entry_id: str) -> Entry | None:
+        row = self.connection.execute(
+            "SELECT date, title, content, id, updated FROM entries WHERE id = ? AND username = ?",
+            (entry_id, user_name)).fetchone()
+        return Entry(date.fromordinal(row[0]), *row[1:]) if row else None
+
+    def add_entry(self, user_name: str, entry: Entry) -> None:
+        with self.connection:
+            self.insert(user_name, entry)
+
+    def insert(self, user_name: str, entry: Entry) -> None:
+        """Insert and index an entry without committing."""
+        self.connection.execute(
+            "INSERT INTO entries (id, username, date, title, content, updated, hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entry.id, user_name, entry.date.toordinal(), entry.title, entry.content, entry.updated,
+             entry_hash(entry)))
+        self.index_entry(user_name, entry)
+
+    def index_entry(self, user_name: str, entry: Entry) -> None:
+        """Replace the postings of an entry without committing."""
+        self.connection.execute("DELETE FROM postings WHERE entry_id = ?", (entry.id,))
+        tokens = set(tokenize(f"{entry.title} {entry.content}"))
+        self.connection.executemany("INSERT INTO postings (username, token, entry_id) VALUES (?, ?, ?)",
+                                    [(user_name, token, entry.id) for token in tokens])
+
+    def update_entry(self, user_name: str, entry: Entry) -> None:
+        with self.connection:
+            self.change(user_name, entry)
+
+    def change(self, user_name: str, entry: Entry) -> None:
+        """Update and index an entry without committing."""
+        cursor = self.connection.execute(
+            "UPDATE entries SET date = ?, title = ?, content = ?, updated = ?, hash = ? WHERE id = ? AND username = ?",
+            (entry.date.toordinal(), entry.title, entry.content, entry.updated, entry_hash(entry), entry.id, user_name))
+        if cursor.rowcount:
+            self.index_entry(user_name, entry)
+
+    def delete_entry(self, user_name: str, entry_id: str) -> None:
+        with self.connection:
+            self.remove(user_name, entry_id)
+
+    def remove(self, user_name: str, entry_id: str) -> None:
+        """Delete an entry and its postings without committing."""
+        cursor = self.connection.execute("DELETE FROM entries WHERE id = ? AND username = ?", (entry_id, user_name))
+        if cursor.rowcount:
+            self.connection.execute("DELETE FROM postings WHERE entry_id = ?", (entry_id,))
+
+    def search(self, user_name: str, query: str, limit: int = 100) -> list[Entry]:
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        # One range scan over the primary key per word; the last character sorts after every other character.
+        matches = " INTERSECT ".join(
+            ["SELECT entry_id FROM postings WHERE username = ? AND token >= ? AND token < ?"] * len(tokens))
+        parameters = [value for token in tokens for value in (user_name, token, f"{token}\U0010ffff")]
+        rows = self.connection.execute(
+            f"SELECT date, title, content, id, updated FROM entries WHERE id IN ({matches}) "
+            f"ORDER BY date DESC LIMIT ?", (*parameters, limit))
+        return [Entry(date.fromordinal(row[0]), *row[1:]) for row in rows]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def migrate_json(storage: SqliteDiaryStorage, json_path: str = "data/diary/diary.json") -> int:
+    """
+    Copy the users and entries of the old JSON diary file into the storage, once. The JSON file itself is left
+    unchanged.
+
+    :param storage: The storage to copy the users and entries into
+    :param json_path: The path of the JSON diary file
+    :return: The number of entries that were copied
+    """
+    copy_entries = storage.get_meta("migrated_json") is None
+    copy_users = storage.get_meta("migrated_json_users") is None
+    if not copy_entries and not copy_users:
+        return 0
+
+    try:
+        with open(json_path, "r") as file:
+            users = json.load(file)
+    except FileNotFoundError:
+        users = []
+
+    copied = 0
+    migrated = datetime.now().isoformat()
+    with storage.connection:
+        for user in users:
+            if copy_users and "Username" in user and "PasswordHash" in user:
+                storage.connection.execute("INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, ?)",
+                                           (user["Username"], user["PasswordHash"]))
+
+            for item in user.get("Diary", []) if copy_entries else []:
+                try:
+                    entry_date = datetime.strptime(item["Date"], "%d-%m-%Y").date()
+                    entry = Entry(date=entry_date, title=item["Title"], content=item["Content"])
+                    storage.insert(user["Username"], entry)
+                    copied += 1
+                except (KeyError, ValueError) as e:
+                    logger.warning("Skipped an entry of %s that could not be migrated: %s", user.get("Username"), e)
+
+        storage.connection.executemany("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                                       [("migrated_json", migrated), ("migrated_json_users", migrated)])
+
+    return copied
+
+
+def open_storage(path: str = "data/diary/diary.db", json_path: str = "data/diary/diary.json") -> SqliteDiaryStorage:
+    """
+    Open the diary storage, migrating the users and entries of the old JSON diary file on first use.
+
+    :param path: The path of the database file
+    :param json_path: The path of the JSON diary file
+    :return: The storage
+    """
+    storage = SqliteDiaryStorage(path)
+    migrate_json(storage, json_path)
+    return storage
@@ -0,0 +1,177 @@
+"""
+Leaderboard and statistics of the HangMan scores, kept up to date one score at a time.
+
+The totals per player and per difficulty and the ranking of the best players are updated when a score is saved, and
+written to ``leaderboard.json`` next to the score log every ``checkpoint_every`` scores, together with the position
+in the log they include. Loading the leaderboard reads the checkpoint and only the scores saved after it. The whole
+log is read only the first time, or when the checkpoint is missing or its position was merged away.
+
+Other processes may save scores to the same log. Saving a score reads every score after the position of the
+leaderboard, its own and theirs, so the totals and the position in a checkpoint always agree.
+
+Players are ranked by the number of games they won; of two players with as many wins, the one who reached that
+number first ranks higher. A score never lowers the rank of its player, so the top list stays exact when only the
+player of a new score is compared with it.
+"""
+import dataclasses
+import json
+import os
+
+from appstore.storage.scores import ScoreLog, ScoreRecord
+
+LEADERBOARD_VERSION = 1
+
+
+@dataclasses.dataclass(slots=True)
+class Totals:
+    """The totals of a set of games. ``last_win`` is the time of the latest won game, in seconds since the epoch."""
+    games: int = 0
+    wins: int = 0
+    tries: int = 0
+    last_win: int = 0
+
+    def add(self, record: ScoreRecord) -> None:
+        self.games += 1
+        self.tries += record.tries
+        if record.guessed:
+            self.wins += 1
+            self.last_win = max(self.last_win, record.played)
+
+    @property
+    def win_rate(self) -> float:
+        """The fraction of the games that was won."""
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def average_tries(self) -> float:
+        return self.tries / self.games if self.games else 0.0
+
+
+class Leaderboard:
+    """The leaderboard and statistics of a score log."""
+    log: ScoreLog
+    path: str
+    size: int
+    checkpoint_every: int
+    players: dict[str, Totals]
+    difficulties: dict[str, Totals]
+    top: list[str]
+    position: tuple[int, int]
+
+    def __init__(self, log: ScoreLog, path: str | None = None, size: int = 10, checkpoint_every: int = 100) -> None:
+        """
+        Load the leaderboard of a score log from its checkpoint and the scores saved after it.
+
+        :param log: The score log
+        :param path: The path of the checkpoint, by default ``leaderboard.json`` in the directory of the log
+        :param size: The number of players in the top list
+        :param checkpoint_every: The number of saved scores between checkpoints
+        """
+        self.log = log
+        self.path = path or os.path.join(log.directory, "leaderboard.json")
+        self.size = size
+        self.checkpoint_every = checkpoint_every
+        self.unsaved = 0
+        if not self.load():
+            self.rebuild()
+            self.save()
+
+    def load(self) -> bool:
+        """
+        Read the checkpoint and add the scores saved after it.
+
+        :return: False if there is no usable checkpoint
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+            if checkpoint.get("version") != LEADERBOARD_VERSION:
+                return False
+            result = self.log.read_from(checkpoint["sequence"], checkpoint["offset"])
+            if result is None:
+                return False
+            self.players = {name: Totals(*totals) for name, totals in checkpoint["players"].items()}
+            self.difficulties = {name: Totals(*totals) for name, totals in checkpoint["difficulties"].items()}
+            self.top = [name for name in checkpoint["top"] if name in self.players]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+        records, self.position = result
+        for record in records:
+            self.add(record)
+            self.unsaved += 1
+        return True
+
+    def rebuild(self) -> None:
+        """Compute the leaderboard from every score in the log."""
+        self.players = {}
+        self.difficulties = {}
+        self.top = []
+        records, self.position = self.log.read_from()
+        for record in records:
+            self.add(record)
+
+    def save(self) -> None:
+        """Write the checkpoint by replacing it."""
+        sequence, offset = self.position
+        checkpoint = {
+            "version": LEADERBOARD_VERSION,
+            "sequence": sequence,
+            "offset": offset,
+            "players": {name: dataclasses.astuple(totals) for name, totals in self.players.items()},
+            "difficulties": {name: dataclasses.astuple(totals) for name, totals in self.difficulties.items()},
+            "top": self.top,
+        }
+        # Another process may write its checkpoint at the same time.
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.unsaved = 0
+
+    def save_score(self, record: ScoreRecord) -> None:
+        """
+        Save a score to the log and add it to the leaderboard.
+
+        :param record: The score
+        """
+        self.log.append(record)
+        self.catch_up()
+
+    def catch_up(self) -> None:
+        """Add the scores saved after the position of the leaderboard, by this process or another one."""
+        result = self.log.read_from(*self.position)
+        if result is None:
+            self.rebuild()
+            self.save()
+            return
+
+        records, self.position = result
+        for record in records:
+            self.add(record)
+            self.unsaved += 1
+        if self.unsaved >= self.checkpoint_every:
+            self.save()
+
+    def rank_key(self, name: str) -> tuple[int, int]:
+        totals = self.players[name]
+        return totals.wins, -totals.last_win
+
+    def add(self, record: ScoreRecord) -> None:
+        """Add a score to the totals and the top list."""
+        self.players.setdefault(record.user_name, Totals()).add(record)
+        if record.difficulty:
+            self.difficulties.setdefault(record.difficulty, Totals()).add(record)
+
+        name = record.user_name
+        if name in self.top:
+            self.top.remove(name)
+        elif len(self.top) >= self.size and self.rank_key(name) <= self.rank_key(self.top[-1]):
+            return
+        self.top.append(name)
+        self.top.sort(key=self.rank_key, reverse=True)
+        del self.top[self.size:]
+
+    def top_players(self) -> list[tuple[str, Totals]]:
+        """Return the best players and their totals, best first."""
+        return [(name, self.players[name]) for name in self.top]
@@ -0,0 +1,342 @@
+"""
+Storage of the HangMan scores.
+
+Scores are kept in a log of NDJSON segments in ``data/hangMan/scores``, one finished game per line. Saving a score
+appends one line to the newest segment, which takes the same time after a million games as after the first. When the
+newest segment reaches its size limit a new one is started, and every time ``FAN_IN`` segments of the same level
+exist, not counting the level 0 segment that was sealed last, they are merged into one gzip compressed segment of the next level, so a score is rewritten at most a
+logarithmic number of times and the number of files stays small.
+
+Segment files are named ``<level>-<first>-<last>.ndjson``, with a ``.gz`` suffix above level 0, where ``first`` and
+``last`` are the sequence numbers of the level 0 segments it holds the scores of. Reading the segments by sequence
+returns the scores in the order they were saved, and the parts of a merge that was interrupted after writing the
+merged segment are recognised by their sequence range and removed.
+
+Several processes may use the log at once, such as two HangMan windows in separate workers. Every operation takes an
+exclusive lock on ``<directory>.lock`` and reads the segments from disk under it, so no process appends to a segment
+that another one has sealed or merged.
+"""
+import contextlib
+import dataclasses
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+from typing import Iterator
+
+FAN_IN = 8
+SEGMENT_NAME = re.compile(r"^(\d+)-(\d+)-(\d+)\.ndjson(\.gz)?$")
+
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+
+def parse_date_time(text: str) -> int:
+    """
+    Parse a date in the ``dd-mm-yyyy hh:mm:ss`` format of ``scores.json`` to seconds since the epoch, by slicing
+    instead of with the much slower ``strptime``.
+
+    :raises ValueError: If the date is invalid
+    """
+    if len(text) != 19 or text[2] != "-" or text[5] != "-" or text[10] != " " or text[13] != ":" or text[16] != ":":
+        raise ValueError(f"Invalid date: {text!r}")
+    played = datetime(int(text[6:10]), int(text[3:5]), int(text[0:2]), int(text[11:13]), int(text[14:16]),
+                      int(text[17:19]))
+    return int(played.timestamp())
+
+
+@dataclasses.dataclass(slots=True)
+class ScoreRecord:
+    """
+    A finished game. ``played`` is the time the game ended, in seconds since the epoch, and ``difficulty`` is empty
+    for games saved before the difficulty was recorded.
+    """
+    user_name: str
+    guessed: bool
+    tries: int
+    played: int = dataclasses.field(default_factory=lambda: int(time.time()))
+    difficulty: str = ""
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ScoreRecord":
+        """
+        Create a record from a score in ``scores.json``, parsing its date once.
+
+        :raises KeyError: If a field is missing
+        :raises ValueError: If the date is invalid
+        """
+        played = data["dateTime"]
+        if isinstance(played, str):
+            played = parse_date_time(played)
+        return cls(str(data["userName"]), bool(data["guessed"]), int(data["timesGuessed"]), int(played),
+                   str(data.get("difficulty", "")))
+
+    def to_json(self) -> dict:
+        """Return the score as it is stored in ``scores.json``."""
+        score = {
+            "userName": self.user_name,
+            "guessed": self.guessed,
+            "timesGuessed": self.tries,
+            "dateTime": datetime.fromtimestamp(self.played).strftime(DATE_FORMAT),
+        }
+        if self.difficulty:
+            score["difficulty"] = self.difficulty
+        return score
+
+    @classmethod
+    def from_row(cls, row: list) -> "ScoreRecord":
+        """
+        Create a record from a line of the score log.
+
+        :raises TypeError: If the line is not a list
+        :raises ValueError: If a field is missing or invalid
+        """
+        user_name, guessed, tries, played, *rest = row
+        return cls(str(user_name), bool(guessed), int(tries), int(played), str(rest[0]) if rest else "")
+
+    def to_row(self) -> list:
+        """Return the score as a line of the score log."""
+        row = [self.user_name, self.guessed, self.tries, self.played]
+        if self.difficulty:
+            row.append(self.difficulty)
+        return row
+
+
+def load_scores(path: str = "data/hangMan/scores.json") -> list[ScoreRecord]:
+    """
+    Read the scores in ``scores.json`` into records, skipping invalid scores.
+
+    :param path: The path of the scores file
+    :return: The records, in the order they were saved
+    """
+    try:
+        with open(path, "r") as file:
+            scores = json.load(file)
+    except FileNotFoundError:
+        return []
+
+    records = []
+    for score in scores:
+        try:
+            records.append(ScoreRecord.from_json(score))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return records
+
+
+@dataclasses.dataclass(slots=True)
+class Segment:
+    first: int
+    last: int
+    level: int
+    path: str
+
+
+@contextlib.contextmanager
+def locked(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a lock file, shared between processes, waiting until it is free.
+
+    :param path: The path of the lock file, which is created if it does not exist
+    """
+    with open(path, "a+b") as file:
+        if os.name == "nt":
+            import msvcrt
+
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 seconds.
+                    continue
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class ScoreLog:
+    """An append-only log of HangMan scores."""
+    directory: str
+    lock_path: str
+    segment_bytes: int
+
+    def __init__(self, directory: str = "data/hangMan/scores", legacy_path: str = "data/hangMan/scores.json",
+                 segment_bytes: int = 1 << 20) -> None:
+        """
+        Open the score log, creating it from the scores in ``scores.json`` the first time.
+
+        :param directory: The directory of the segments
+        :param legacy_path: The path of the old scores file, which is left as it is
+        :param segment_bytes: The size at which a new segment is started
+        """
+        self.directory = directory
+        self.lock_path = f"{directory}.lock"
+        self.segment_bytes = segment_bytes
+        os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+        with locked(self.lock_path):
+            if not os.path.isdir(directory):
+                self.migrate(legacy_path)
+            self.remove_merged(self.segments())
+
+    def migrate(self, legacy_path: str) -> None:
+        """
+        Create the log from the old scores file. The log is written to a temporary directory that is renamed when it
+        is complete, so the migration runs again if it is interrupted.
+
+        :param legacy_path: The path of the old scores file
+        """
+        temp_directory = f"{self.directory}.tmp"
+        shutil.rmtree(temp_directory, ignore_errors=True)
+        os.makedirs(temp_directory)
+        records = load_scores(legacy_path)
+        if records:
+            self.write_segment(os.path.join(temp_directory, "1-00000000-00000000.ndjson.gz"), records)
+        os.replace(temp_directory, self.directory)
+
+    def segments(self) -> list[Segment]:
+        """Return the segments of the log, oldest first."""
+        segments = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_NAME.match(name)
+            if match:
+                segments.append(Segment(int(match[2]), int(match[3]), int(match[1]),
+                                        os.path.join(self.directory, name)))
+        # A merged segment comes before the segments it holds the scores of.
+        return sorted(segments, key=lambda segment: (segment.first, -segment.last))
+
+    @staticmethod
+    def remove_merged(segments: list[Segment]) -> list[Segment]:
+        """
+        Remove the segments that are part of a merged segment, left behind by an interrupted compaction.
+
+        :param segments: The segments of the log, oldest first
+        :return: The remaining segments
+        """
+        remaining = []
+        for segment in segments:
+            if remaining and segment.last <= remaining[-1].last:
+                os.remove(segment.path)
+            else:
+                remaining.append(segment)
+        return remaining
+
+    def new_segment(self, sequence: int) -> Segment:
+        """Return a new, empty segment of level 0."""
+        return Segment(sequence, sequence, 0, os.path.join(self.directory, f"0-{sequence:08d}-{sequence:08d}.ndjson"))
+
+    def active(self, segments: list[Segment]) -> Segment:
+        """Return the segment new scores are appended to: the newest segment of level 0, or a new one."""
+        if segments and segments[-1].level == 0:
+            return segments[-1]
+        return self.new_segment(segments[-1].last + 1 if segments else 0)
+
+    def append(self, record: ScoreRecord) -> None:
+        """
+        Save a score by appending it to the newest segment, starting a new segment when that one is full.
+
+        :param record: The score
+        """
+        line = json.dumps(record.to_row(), ensure_ascii=False, separators=(",", ":")) + "\n"
+        with locked(self.lock_path):
+            segments = self.segments()
+            active = self.active(segments)
+            if os.path.exists(active.path) and os.path.getsize(active.path) >= self.segment_bytes:
+                active = self.new_segment(active.last + 1)
+                self.compact()
+
+            with open(active.path, "a+b") as file:
+                # End a line that was cut off by a crash, so the score starts on a new line.
+                if file.tell():
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        line = "\n" + line
+                file.write(line.encode("utf-8"))
+
+    def compact(self) -> None:
+        """Merge every ``FAN_IN`` segments of a level into one segment of the next level. Called under the lock."""
+        level = 0
+        while True:
+            segments = [segment for segment in self.segments() if segment.level == level]
+            if level == 0:
+                # Keep the segment that was sealed last, so a reader whose position is in it can still continue.
+                segments = segments[:-1]
+            if len(segments) < FAN_IN:
+                return
+            merged = segments[:FAN_IN]
+            path = os.path.join(self.directory, f"{level + 1}-{merged[0].first:08d}-{merged[-1].last:08d}.ndjson.gz")
+            self.write_segment(path, (record for segment in merged for record in self.read_segment(segment.path)))
+            for segment in merged:
+                os.remove(segment.path)
+            level += 1
+
+    @staticmethod
+    def write_segment(path: str, records) -> None:
+        """Write a compressed segment by replacing it."""
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record.to_row(), ensure_ascii=False, separators=(",", ":")))
+                file.write("\n")
+        os.replace(temp_path, path)
+
+    def end(self, segments: list[Segment]) -> tuple[int, int]:
+        """
+        Return the position after the last saved score: the sequence of the newest segment and its size, or the start
+        of the next segment if the newest one is full, as that is where the next score is saved.
+        """
+        active = self.active(segments)
+        size = os.path.getsize(active.path) if os.path.exists(active.path) else 0
+        if size >= self.segment_bytes:
+            return active.last + 1, 0
+        return active.first, size
+
+    def read_from(self, sequence: int = 0, offset: int = 0) -> tuple[list[ScoreRecord], tuple[int, int]] | None:
+        """
+        Read the scores saved after a position, by default every score.
+
+        :param sequence: The sequence of the segment of the position
+        :param offset: The offset in that segment
+        :return: The scores and the position after them, or None if the segment was merged since and the position no
+            longer exists
+        """
+        with locked(self.lock_path):
+            segments = self.segments()
+            if any(segment.level and segment.first <= sequence <= segment.last and (offset or segment.first < sequence)
+                   for segment in segments):
+                return None
+            records = [record for segment in segments if segment.first >= sequence
+                       for record in self.read_segment(segment.path, offset if segment.first == sequence else 0)]
+            return records, self.end(segments)
+
+    @staticmethod
+    def read_segment(path: str, offset: int = 0) -> Iterator[ScoreRecord]:
+        """Read the scores of a segment from an offset, skipping invalid lines."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    yield ScoreRecord.from_row(json.loads(line))
+                except (TypeError, ValueError):
+                    continue
+
+    def __iter__(self) -> Iterator[ScoreRecord]:
+        """Read every score, in the order they were saved."""
+        # Read the scores before returning them, so the lock is not held by a caller that is still iterating.
+        with locked(self.lock_path):
+            records = [record for segment in self.segments() for record in self.read_segment(segment.path)]
+        return iter(records)
@@ -0,0 +1,59 @@
+"""Tokenisation of Dutch text for the full-text search indexes."""
+import re
+import unicodedata
+
+STOPWORDS = frozenset("""
+aan al als bij dan dat de deze die dit door een en er geen had heb hebben heeft het hij hem haar hun ik in is je
+kan maar me met mijn naar niet nog of om ons ook op over te tot uit van voor was we wat wel werd wie wij wordt worden
+ze zij zijn zo zou
+""".split())
+
+SUFFIXES = ("tjes", "tje", "jes", "je", "heden", "en", "s", "e")
+
+
+def fold(text: str) -> str:
+    """Lowercase text and remove diacritics, so "Café" and "cafe" or "ideeën" and "ideeen" match."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(word: str) -> str:
+    """
+    Reduce a Dutch word to a stem with a light suffix stripper.
+
+    Diminutives, plurals (``-en``, and ``-s`` after l, n or r) and the inflected ``-e`` are removed, a doubled
+    final consonant is undoubled ("katten" -> "kat") and a final ``z`` or ``v`` becomes ``s`` or ``f``
+    ("huizen" -> "huis"). A stem is never shorter than three letters. The stems only have to be consistent, as
+    queries are stemmed the same way.
+
+    :param word: A folded word
+    :return: The stem of the word
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word[-2] not in "lnr":
+                continue
+            word = word[:-len(suffix)]
+            if suffix == "heden":
+                word += "heid"
+            break
+    else:
+        return word
+
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]
+    if word[-1] == "z":
+        word = word[:-1] + "s"
+    elif word[-1] == "v":
+        word = word[:-1] + "f"
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into the stems of its words, without stopwords.
+
+    :param text: The text
+    :return: The stems, in order of appearance and with duplicates
+    """
+    return [stem(word) for word in re.findall(r"\w+", fold(text)) if word not in STOPWORDS]
@@ -0,0 +1,346 @@
+"""
+Incremental sync of diaries with a folder, such as a USB drive or a network mount.
+
+The folder keeps a journal of changes per user, and the database keeps the content hashes of the last sync in the
+``sync_state`` table and the position up to which the journal was read in the ``meta`` table. A sync reads the
+journal from that position and compares the local hashes with ``sync_state`` in SQL, so it only reads and writes the
+entries that changed on one side since the previous sync, however large the diary is.
+"""
+import dataclasses
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+from appstore.storage.archive import Progress, entry_record, parse_record
+from appstore.storage.diary import SqliteDiaryStorage, entry_hash, valid_entry_id
+
+JOURNAL_VERSION = 1
+# The number of bytes the journal may grow beyond twice its size after the last compaction.
+COMPACT_SLACK = 1 << 16
+
+
+@dataclasses.dataclass()
+class SyncResult:
+    pushed: int = 0
+    pulled: int = 0
+    deleted_local: int = 0
+    deleted_remote: int = 0
+    conflicts: int = 0
+
+
+class FolderReplica:
+    """
+    The copy of the diary of a user in a folder: one JSON file per entry in ``<folder>/<user>/entries`` and a journal,
+    ``journal.ndjson``, with a line per change holding the id, content hash and update time of an entry, or a null
+    hash for a deletion. The first line of the journal holds its version, its generation and its size after the last
+    compaction. Compacting the journal keeps one line per entry and starts a new generation, so a position in the
+    journal is only valid in the generation it was read in.
+
+    Entry files and compacted journals are written to a temporary file first and then renamed, so an interrupted sync
+    never leaves a half written file, and a line cut off by an interrupted append is ignored.
+
+    The folder is not trusted: the user directory must stay inside it, and an entry id is only turned into a file
+    name if it is in the format of local entry ids, so a crafted journal cannot read, write or delete other files.
+    """
+    directory: str
+    generation: str
+    compacted_size: int
+
+    def __init__(self, folder: str, user_name: str) -> None:
+        """
+        Read the header of the journal of the copy of a user's diary in a folder, creating the journal if needed.
+
+        :param folder: The folder to sync with
+        :param user_name: The user
+        :raises ValueError: If the user directory is outside the folder or the journal is invalid
+        """
+        root = os.path.realpath(folder)
+        self.directory = os.path.realpath(os.path.join(root, user_name))
+        if os.path.dirname(self.directory) != root:
+            raise ValueError(f"Invalid user name for a sync folder: {user_name!r}")
+
+        try:
+            with open(self.journal_path, "rb") as file:
+                header = json.loads(file.readline())
+            if header["version"] != JOURNAL_VERSION:
+                raise ValueError(f"Unsupported sync journal version in {self.directory}: {header['version']!r}")
+            self.generation = str(header["generation"])
+            self.compacted_size = int(header["size"])
+        except FileNotFoundError:
+            self.compact(self.read_manifest())
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"The sync journal in {self.directory} is invalid") from error
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.directory, "journal.ndjson")
+
+    @property
+    def manifest_path(self) -> str:
+        """The path of the manifest with the hash of every entry, which older versions kept instead of the journal."""
+        return os.path.join(self.directory, "manifest.json")
+
+    def entry_path(self, entry_id: str) -> str:
+        """
+        Return the path of the file of an entry.
+
+        :raises ValueError: If the id is not in the format of entry ids
+        """
+        if not valid_entry_id(entry_id):
+            raise ValueError(f"Invalid entry id: {entry_id!r}")
+        return os.path.join(self.directory, "entries", f"{entry_id}.json")
+
+    @staticmethod
+    def write_file(path: str, data: bytes) -> None:
+        """Write a file by replacing it."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def read_manifest(self) -> dict[str, tuple[str | None, float]]:
+        """Return the hash and update time of every entry in the manifest of an older version, if there is one."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            return {entry_id: (str(item["hash"]), float(item["updated"]))
+                    for entry_id, item in manifest["entries"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def read_changes(self, offset: int = 0) -> tuple[dict[str, tuple[str | None, float]], int]:
+        """
+        Read the journal from a position, by default from the start.
+
+        :param offset: The position returned by an earlier read in the same generation
+        :return: The latest hash, None for a deletion, and update time of every entry changed after the position, and
+            the position after the last complete line
+        :raises ValueError: If the journal has an invalid entry id
+        """
+        changes = {}
+        with open(self.journal_path, "rb") as file:
+            header = file.readline()
+            offset = max(offset, len(header))
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    change = json.loads(line)
+                    entry_id, content_hash, updated = change["id"], change["hash"], float(change["updated"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if not valid_entry_id(entry_id):
+                    raise ValueError(f"The sync journal in {self.directory} has an invalid entry id: {entry_id!r}")
+                changes[entry_id] = (content_hash, updated)
+        return changes, offset
+
+    def append(self, entry_id: str, content_hash: str | None, updated: float) -> None:
+        """Append a change to the journal."""
+        line = json.dumps({"id": entry_id, "hash": content_hash, "updated": updated}, separators=(",", ":")) + "\n"
+        with open(self.journal_path, "a+b") as file:
+            # End a line that was cut off by an interrupted sync, so the change starts on a new line.
+            if file.tell():
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    line = "\n" + line
+            file.write(line.encode("utf-8"))
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Whether the journal has grown to more than twice its size after the last compaction."""
+        return os.path.getsize(self.journal_path) > 2 * self.compacted_size + COMPACT_SLACK
+
+    def compact(self, entries: dict[str, tuple[str | None, float]]) -> None:
+        """
+        Replace the journal with one line per existing entry, in a new generation.
+
+        :param entries: The hash, None for a deleted entry, and update time of the entries by id
+        :raises ValueError: If an entry id is invalid
+        """
+        lines = []
+        for entry_id, (content_hash, updated) in entries.items():
+            if not valid_entry_id(entry_id):
+                raise ValueError(f"Invalid entry id: {entry_id!r}")
+            if content_hash is not None:
+                lines.append(json.dumps({"id": entry_id, "hash": content_hash, "updated": updated},
+                                        separators=(",", ":")) + "\n")
+        body = "".join(lines).encode("utf-8")
+        self.generation = uuid.uuid4().hex
+        self.compacted_size = len(body)
+        header = json.dumps({"version": JOURNAL_VERSION, "generation": self.generation, "size": len(body)})
+        self.write_file(self.journal_path, f"{header}\n".encode("utf-8") + body)
+        try:
+            os.remove(self.manifest_path)
+        except FileNotFoundError:
+            pass
+
+    def read(self, entry_id: str):
+        """Read an entry of the copy. The entry keeps the id of its file, whatever id the file contains."""
+        with open(self.entry_path(entry_id), "r", encoding="utf-8") as file:
+            entry = parse_record(json.load(file))
+        entry.id = entry_id
+        return entry
+
+    def write(self, entry) -> None:
+        """Write an entry to the copy."""
+        self.write_file(self.entry_path(entry.id), json.dumps(entry_record(entry), ensure_ascii=False).encode("utf-8"))
+        self.append(entry.id, entry_hash(entry), entry.updated)
+
+    def delete(self, entry_id: str) -> None:
+        """Delete an entry from the copy."""
+        try:
+            os.remove(self.entry_path(entry_id))
+        except FileNotFoundError:
+            pass
+        self.append(entry_id, None, time.time())
+
+
+def select_by_ids(storage: SqliteDiaryStorage, query: str, parameters: tuple, entry_ids: list[str]) -> list[tuple]:
+    """
+    Run a query for a list of ids in chunks that stay below the SQLite limit on the number of parameters.
+
+    :param query: The query, with ``{ids}`` where the placeholders of the ids go
+    :param parameters: The parameters before the ids
+    :param entry_ids: The ids
+    :return: The rows of every chunk
+    """
+    rows = []
+    for start in range(0, len(entry_ids), 500):
+        chunk = entry_ids[start:start + 500]
+        rows.extend(storage.connection.execute(query.format(ids=", ".join("?" * len(chunk))), (*parameters, *chunk)))
+    return rows
+
+
+def sync_folder(storage: SqliteDiaryStorage, user_name: str, folder: str,
+                progress: Progress | None = None) -> SyncResult:
+    """
+    Sync the diary of a user with its copy in a folder, in both directions.
+
+    The entries that changed on the folder side are read from the journal after the position of the last sync, and
+    the local entries whose hash differs from ``sync_state`` are found in SQL. Only those entries are read or written.
+    The whole journal is only read the first time, or after another device compacted it. An entry that changed on
+    both sides keeps the version that was updated last; an entry that was deleted on one side and changed on the other
+    is kept.
+
+    :param storage: The local storage
+    :param user_name: The user to sync the diary of
+    :param folder: The folder to sync with
+    :param progress: Called with the number of synced changes and the total number of changes
+    :return: The number of entries that were copied or deleted on each side, and of conflicts
+    """
+    folder_key = os.path.abspath(folder)
+    position_key = f"sync_position:{folder_key}:{user_name}"
+    replica = FolderReplica(folder, user_name)
+    try:
+        generation, offset = json.loads(storage.get_meta(position_key) or "null")
+    except (ValueError, TypeError):
+        generation, offset = None, 0
+
+    complete = generation != replica.generation
+    remote, end = replica.read_changes(0 if complete else offset)
+    if complete:
+        # Every entry the journal does not mention was deleted in the folder.
+        candidates = {row[0] for row in storage.connection.execute(
+            "SELECT id FROM entries WHERE username = ? "
+            "UNION SELECT entry_id FROM sync_state WHERE folder = ? AND username = ?",
+            (user_name, folder_key, user_name))}
+    else:
+        candidates = {row[0] for row in storage.connection.execute(
+            "SELECT id FROM entries WHERE username = ? AND hash IS NOT "
+            "(SELECT hash FROM sync_state WHERE folder = ? AND username = entries.username AND entry_id = entries.id) "
+            "UNION SELECT entry_id FROM sync_state WHERE folder = ? AND username = ? "
+            "AND entry_id NOT IN (SELECT id FROM entries WHERE username = ?)",
+            (user_name, folder_key, folder_key, user_name, user_name))}
+    candidates = sorted(candidates | remote.keys())
+
+    local = {row[0]: (row[1], row[2]) for row in select_by_ids(
+        storage, "SELECT id, hash, updated FROM entries WHERE username = ? AND id IN ({ids})", (user_name,),
+        candidates)}
+    base = {row[0]: row[1] for row in select_by_ids(
+        storage, "SELECT entry_id, hash FROM sync_state WHERE folder = ? AND username = ? AND entry_id IN ({ids})",
+        (folder_key, user_name), candidates)}
+
+    def local_hash(entry_id: str) -> str | None:
+        return local[entry_id][0] if entry_id in local else None
+
+    def remote_hash(entry_id: str) -> str | None:
+        if entry_id in remote:
+            return remote[entry_id][0]
+        # The journal after the position has every change in the folder since the last sync.
+        return None if complete else base.get(entry_id)
+
+    def set_state(entry_id: str, synced: str | None) -> None:
+        if synced is None:
+            storage.connection.execute(
+                "DELETE FROM sync_state WHERE folder = ? AND username = ? AND entry_id = ?",
+                (folder_key, user_name, entry_id))
+        else:
+            storage.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (folder, username, entry_id, hash) VALUES (?, ?, ?, ?)",
+                (folder_key, user_name, entry_id, synced))
+
+    changed = [entry_id for entry_id in candidates
+               if not local_hash(entry_id) == remote_hash(entry_id) == base.get(entry_id)]
+
+    result = SyncResult()
+    with storage.connection:
+        for number, entry_id in enumerate(changed, start=1):
+            mine, theirs, last = local_hash(entry_id), remote_hash(entry_id), base.get(entry_id)
+            if mine == theirs:
+                synced = mine
+            else:
+                if mine != last and theirs != last:
+                    result.conflicts += 1
+                    if mine is None or theirs is None:
+                        push = mine is not None
+                    else:
+                        push = local[entry_id][1] >= remote[entry_id][1]
+                else:
+                    push = mine != last
+
+                if push and mine is None:
+                    replica.delete(entry_id)
+                    result.deleted_remote += 1
+                elif push:
+                    replica.write(storage.get_entry(user_name, entry_id))
+                    result.pushed += 1
+                elif theirs is None:
+                    storage.remove(user_name, entry_id)
+                    result.deleted_local += 1
+                else:
+                    entry = replica.read(entry_id)
+                    if mine is None:
+                        try:
+                            storage.insert(user_name, entry)
+                        except sqlite3.IntegrityError:
+                            # The id belongs to an entry of another user, so the entry gets a new id on both sides.
+                            entry.id = uuid.uuid4().hex
+                            storage.insert(user_name, entry)
+                            replica.write(entry)
+                            replica.delete(entry_id)
+                            set_state(entry.id, theirs)
+                            theirs = None
+                    else:
+                        storage.change(user_name, entry)
+                    result.pulled += 1
+                synced = mine if push else theirs
+
+            set_state(entry_id, synced)
+            if progress is not None:
+                progress(number, len(changed))
+
+        if replica.needs_compaction:
+            replica.compact(replica.read_changes()[0])
+            end = os.path.getsize(replica.journal_path)
+        # The changes this sync appended are read again next time, and match sync_state.
+        storage.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                   (position_key, json.dumps([replica.generation, end])))
+
+    if progress is not None:
+        progress(len(changed), len(changed))
+    return result
@@ -0,0 +1,270 @@
+"""Write-behind persistence for the diary storage."""
+import atexit
+import dataclasses
+import logging
+import threading
+import time
+from datetime import date
+
+from appstore.storage.diary import DateIndex, DiaryStorage, Entry, EntrySummary, SqliteDiaryStorage
+from appstore.storage.search import tokenize
+
+logger = logging.getLogger("appstore.storage.writebehind")
+
+
+class WriteBehindError(RuntimeError):
+    """Raised by ``flush`` when pending changes could not be written."""
+
+
+@dataclasses.dataclass()
+class Change:
+    """A change to one entry that is not written yet. ``entry`` is None for a deletion."""
+    user_name: str
+    entry_id: str
+    entry: Entry | None
+    new: bool
+
+
+def merge(changes: dict[str, Change], change: Change) -> None:
+    """
+    Add a change to the unwritten changes, merging it with an unwritten change to the same entry. A change to an
+    entry that was never written inserts it, and deleting such an entry removes both changes.
+
+    :param changes: The unwritten changes by entry id
+    :param change: The newer change
+    """
+    previous = changes.get(change.entry_id)
+    if previous is not None and previous.new:
+        if change.entry is None:
+            # The entry was never written, so there is nothing to delete.
+            del changes[change.entry_id]
+            return
+        change.new = True
+    changes[change.entry_id] = change
+
+
+class WriteBehindStorage(DiaryStorage):
+    """
+    Diary storage that returns from a change immediately and writes it on a background thread.
+
+    Changes are kept by entry id, so several changes to one entry are written once. A change is written ``delay``
+    seconds after the first pending change, together with every other pending change, in one transaction of the
+    writer thread's own connection. SQLite locks the database for that transaction, and only the changed rows are
+    written, so two running instances never overwrite each other's entries.
+
+    Reads go to the wrapped storage and see the pending changes on top of it. ``flush`` blocks until every change is
+    written, and raises ``WriteBehindError`` when a write fails or the timeout passes. It is also called when the
+    storage is closed and when the process exits.
+    """
+    reader: SqliteDiaryStorage
+    delay: float
+    pending: dict[str, Change]
+    writing: dict[str, Change]
+
+    def __init__(self, reader: SqliteDiaryStorage, delay: float = 0.3) -> None:
+        """
+        Start the writer thread.
+
+        :param reader: The storage to read from; the writer thread opens its own connection to the same database
+        :param delay: The number of seconds to collect changes before writing them
+        """
+        self.reader = reader
+        self.delay = delay
+        self.pending = {}
+        self.writing = {}
+        self.condition = threading.Condition()
+        self.closed = False
+        self.flushing = 0
+        self.failures = 0
+        self.error: Exception | None = None
+        self.thread = threading.Thread(target=self.run, name="diary-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush_at_exit)
+
+    def queue(self, change: Change) -> None:
+        """Add a change to the pending changes, merging it with a pending change to the same entry."""
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("The storage is closed")
+
+            merge(self.pending, change)
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        """Write the pending changes until the storage is closed."""
+        writer = SqliteDiaryStorage(self.reader.path)
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending and self.closed:
+                    break
+
+                deadline = time.monotonic() + self.delay
+                while not self.closed and not self.flushing and time.monotonic() < deadline:
+                    self.condition.wait(deadline - time.monotonic())
+                self.writing, self.pending = self.pending, {}
+                changes = list(self.writing.values())
+
+            try:
+                with writer.connection:
+                    for change in changes:
+                        if change.entry is None:
+                            writer.remove(change.user_name, change.entry_id)
+                        elif change.new:
+                            writer.insert(change.user_name, change.entry)
+                        else:
+                            writer.change(change.user_name, change.entry)
+            except Exception as error:
+                with self.condition:
+                    # Changes queued during the write come after it, and may change an entry it was adding.
+                    unwritten = self.writing
+                    for change in self.pending.values():
+                        merge(unwritten, change)
+                    self.pending, self.writing = unwritten, {}
+                    self.failures += 1
+                    self.error = error
+                    self.condition.notify_all()
+                    if self.closed:
+                        logger.error("Writing %d diary changes failed, they are lost: %s", len(self.pending), error)
+                        break
+                    logger.exception("Writing %d diary changes failed, retrying", len(changes))
+                    self.condition.wait(1.0)
+                continue
+
+            with self.condition:
+                self.writing = {}
+                self.error = None
+                self.condition.notify_all()
+
+        writer.close()
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """
+        Write the pending changes now and wait until they are written.
+
+        :param timeout: The maximum number of seconds to wait
+        :raises WriteBehindError: If writing the changes failed or did not finish in time; the changes stay pending
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            failures = self.failures
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                while (self.pending or self.writing) and self.thread.is_alive():
+                    unwritten = len(self.pending) + len(self.writing)
+                    if self.failures > failures:
+                        raise WriteBehindError(f"{unwritten} diary changes could not be written") from self.error
+                    if time.monotonic() >= deadline:
+                        raise WriteBehindError(f"{unwritten} diary changes were not written within {timeout} s")
+                    self.condition.wait(min(0.1, deadline - time.monotonic()))
+            finally:
+                self.flushing -= 1
+
+    def flush_at_exit(self) -> None:
+        """Write the pending changes when the process exits, logging the changes that could not be written."""
+        try:
+            self.flush()
+        except WriteBehindError:
+            logger.exception("Diary changes were lost at exit")
+
+    def close(self) -> None:
+        """
+        Write the pending changes, stop the writer thread and close the storage. Closing twice does nothing.
+
+        :raises WriteBehindError: If the pending changes could not be written; the storage is closed anyway
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            self.thread.join()
+            self.reader.close()
+            atexit.unregister(self.flush_at_exit)
+
+    def overlay(self, user_name: str) -> dict[str, Entry | None]:
+        """Return the unwritten changes to the entries of a user by id, None for a deletion."""
+        with self.condition:
+            changes = {**self.writing, **self.pending}
+        return {entry_id: change.entry for entry_id, change in changes.items() if change.user_name == user_name}
+
+    def get_password_hash(self, user_name: str) -> str | None:
+        return self.reader.get_password_hash(user_name)
+
+    def add_user(self, user_name: str, password_hash: str) -> None:
+        self.reader.add_user(user_name, password_hash)
+
+    def load_entries(self, user_name: str) -> list[Entry]:
+        overlay = self.overlay(user_name)
+        entries = [entry for entry in self.reader.load_entries(user_name) if entry.id not in overlay]
+        entries.extend(entry for entry in overlay.values() if entry is not None)
+        return sorted(entries, key=lambda entry: (entry.date, entry.id))
+
+    def count_entries(self, user_name: str) -> int:
+        if not self.overlay(user_name):
+            return self.reader.count_entries(user_name)
+        return len(self.load_dates(user_name))
+
+    def load_dates(self, user_name: str) -> DateIndex:
+        overlay = self.overlay(user_name)
+        index = self.reader.load_dates(user_name)
+        if overlay:
+            keys = [key for key in zip(index.ordinals, index.ids) if key[1] not in overlay]
+            keys.extend((entry.date.toordinal(), entry.id) for entry in overlay.values() if entry is not None)
+            index = DateIndex.from_keys(sorted(keys))
+        return index
+
+    def load_summaries(self, user_name: str, offset: int, limit: int) -> list[EntrySummary]:
+        overlay = self.overlay(user_name)
+        if not overlay:
+            return self.reader.load_summaries(user_name, offset, limit)
+
+        entry_ids = self.load_dates(user_name).ids[offset:offset + limit]
+        stored = self.reader.get_summaries(user_name, [entry_id for entry_id in entry_ids if entry_id not in overlay])
+        summaries = []
+        for entry_id in entry_ids:
+            entry = overlay.get(entry_id)
+            summaries.append(EntrySummary(entry.date, entry.title, entry.id) if entry is not None else stored[entry_id])
+        return summaries
+
+    def load_range(self, user_name: str, start: date, end: date) -> list[EntrySummary]:
+        overlay = self.overlay(user_name)
+        summaries = [summary for summary in self.reader.load_range(user_name, start, end) if summary.id not in overlay]
+        summaries.extend(EntrySummary(entry.date, entry.title, entry.id) for entry in overlay.values()
+                         if entry is not None and start <= entry.date <= end)
+        return sorted(summaries, key=lambda summary: (summary.date, summary.id))
+
+    def get_entry(self, user_name: str, entry_id: str) -> Entry | None:
+        overlay = self.overlay(user_name)
+        if entry_id in overlay:
+            return overlay[entry_id]
+        return self.reader.get_entry(user_name, entry_id)
+
+    def add_entry(self, user_name: str, entry: Entry) -> None:
+        self.queue(Change(user_name, entry.id, entry, new=True))
+
+    def update_entry(self, user_name: str, entry: Entry) -> None:
+        self.queue(Change(user_name, entry.id, entry, new=False))
+
+    def delete_entry(self, user_name: str, entry_id: str) -> None:
+        self.queue(Change(user_name, entry_id, None, new=False))
+
+    def search(self, user_name: str, query: str, limit: int = 100) -> list[Entry]:
+        overlay = self.overlay(user_name)
+        results = [entry for entry in self.reader.search(user_name, query, limit + len(overlay))
+                   if entry.id not in overlay]
+
+        words = set(tokenize(query))
+        for entry in overlay.values():
+            if entry is None or not words:
+                continue
+            tokens = set(tokenize(f"{entry.title} {entry.content}"))
+            if all(any(token.startswith(word) for token in tokens) for word in words):
+                results.append(entry)
+
+        return sorted(results, key=lambda entry: entry.date, reverse=True)[:limit]
@@ -1,10 +1,12 @@
 import os
 import re
+from typing import TYPE_CHECKING
 
 import _tkinter
 import customtkinter
-from CTkMessagebox import CTkMessagebox
-from satisfactory_api_client import SatisfactoryAPI, APIError
+
+if TYPE_CHECKING:
+    from satisfactory_api_client import SatisfactoryAPI
 
 
 class ServerSettingsWindow(customtkinter.CTkToplevel):
@@ -39,7 +41,7 @@ class ServerSettingsWindow(customtkinter.CTkToplevel):
 
 class DownloadSaveGameWindow(customtkinter.CTkToplevel):
     """Window to download a save game."""
-    def __init__(self, possible_save_games: list, api: SatisfactoryAPI):
+    def __init__(self, possible_save_games: list, api: "SatisfactoryAPI"):
         super().__init__()
         self.api = api
         self.create_widgets(possible_save_games)
@@ -74,6 +76,9 @@ class DownloadSaveGameWindow(customtkinter.CTkToplevel):
         self.download_button.pack(pady=10)
 
     def download_save_game(self):
+        from satisfactory_api_client import APIError
+        from CTkMessagebox import CTkMessagebox
+
         save_game_name = self.save_game_combo.get()
 
         if not save_game_name:
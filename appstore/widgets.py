@@ -0,0 +1,119 @@
+"""Reusable widgets for the AppStore and its apps."""
+import math
+from typing import Any, Callable
+
+import customtkinter
+
+
+class VirtualList(customtkinter.CTkFrame):
+    """
+    A scrollable list that only creates widgets for the rows that fit in view.
+
+    A fixed pool of row widgets is created by ``build_row`` and recycled while scrolling: ``bind_row`` fills a row
+    widget with the data of the row at an index. The list itself never holds the data, only the number of rows.
+    """
+    row_height: int
+    count: int
+    top: int
+    rows: list[Any]
+
+    def __init__(self, master, row_height: int, build_row: Callable[[customtkinter.CTkFrame], Any],
+                 bind_row: Callable[[Any, int], None], **kwargs) -> None:
+        """
+        Initialize the list.
+
+        :param master: The parent widget
+        :param row_height: The height of a row in pixels, used to calculate how many rows fit
+        :param build_row: Creates the widgets of a row in the given frame and returns the row
+        :param bind_row: Shows the data of the row at an index in a row created by ``build_row``
+        """
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.build_row = build_row
+        self.bind_row = bind_row
+        self.count = 0
+        self.top = 0
+        self.rows = []
+        self.frames = []
+
+        self.body = customtkinter.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = customtkinter.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+
+    @property
+    def visible_rows(self) -> int:
+        """The number of row widgets in the pool."""
+        return len(self.rows)
+
+    def set_count(self, count: int) -> None:
+        """
+        Set the number of rows and redraw the rows in view.
+
+        :param count: The number of rows
+        """
+        self.count = count
+        self.scroll_to(self.top)
+
+    def refresh(self) -> None:
+        """Bind the rows in view to their data again, for example after the data changed."""
+        for offset, (frame, row) in enumerate(zip(self.frames, self.rows)):
+            index = self.top + offset
+            if index < self.count:
+                self.bind_row(row, index)
+                frame.grid()
+            else:
+                frame.grid_remove()
+
+        if self.count:
+            self.scrollbar.set(self.top / self.count, min(1.0, (self.top + self.visible_rows) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, top: int) -> None:
+        """
+        Scroll so the row at an index is the first row in view.
+
+        :param top: The index of the first row in view
+        """
+        self.top = max(0, min(top, self.count - self.visible_rows))
+        self.refresh()
+
+    def on_resize(self, event) -> None:
+        """Grow the pool of row widgets when more rows fit in view."""
+        needed = max(1, math.ceil(event.height / self.row_height))
+        while len(self.rows) < needed:
+            frame = customtkinter.CTkFrame(self.body, fg_color="transparent", height=self.row_height)
+            frame.grid(row=len(self.rows), column=0, sticky="ew")
+            self.body.grid_columnconfigure(0, weight=1)
+            self.rows.append(self.build_row(frame))
+            self.frames.append(frame)
+            self.bind_wheel(frame)
+        self.scroll_to(self.top)
+
+    def on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        """Scroll in response to the scrollbar."""
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self.count))
+        elif unit == "pages":
+            self.scroll_to(self.top + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.top + int(amount))
+
+    def on_wheel(self, event) -> None:
+        """Scroll in response to the mouse wheel."""
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 1)
+        else:
+            self.scroll_to(self.top + 1)
+
+    def bind_wheel(self, widget) -> None:
+        """Scroll the list with the mouse wheel over the widget and its children."""
+        widget.bind("<MouseWheel>", self.on_wheel, add="+")
+        widget.bind("<Button-4>", self.on_wheel, add="+")
+        widget.bind("<Button-5>", self.on_wheel, add="+")
+        for child in widget.winfo_children():
+            self.bind_wheel(child)
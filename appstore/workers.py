@@ -0,0 +1,199 @@
+"""Warm worker processes that run apps isolated from the AppStore process."""
+import dataclasses
+import importlib
+import multiprocessing
+import queue
+import traceback
+from multiprocessing.connection import Connection
+from typing import Callable
+
+from appstore.registry import App
+
+
+def run_worker(worker_id: int, tasks: Connection, results: multiprocessing.Queue, preload: list[App]) -> None:
+    """
+    Entry point of a worker process. Imports customtkinter and the app modules up front, then waits for one app to
+    launch and reports its exit status.
+
+    :param worker_id: The id of the worker in the pool
+    :param tasks: The end of the pipe the pool sends the launch request on
+    :param results: The queue status messages are sent back on
+    :param preload: The apps whose modules are imported while idle
+    """
+    import customtkinter  # noqa: F401 (warm up the import before an app is launched)
+    from appstore import debug
+
+    debug.enable_from_environment()
+
+    for app in preload:
+        try:
+            importlib.import_module(app.path)
+        except Exception:
+            pass
+
+    results.put(("ready", worker_id))
+    task = tasks.recv()
+    if task is None:
+        return
+
+    name = task.name
+    results.put(("started", worker_id, name))
+    try:
+        app_class = task.load_class()
+        app_class()
+    except SystemExit as e:
+        results.put(("exited", worker_id, name, e.code if isinstance(e.code, int) else 0, None))
+    except BaseException:
+        results.put(("exited", worker_id, name, 1, traceback.format_exc()))
+    else:
+        results.put(("exited", worker_id, name, 0, None))
+
+
+@dataclasses.dataclass
+class Worker:
+    """A worker process in the pool."""
+    worker_id: int
+    process: multiprocessing.Process
+    tasks: Connection
+    ready: bool = False
+    app_name: str | None = None
+    reported: bool = False
+
+
+class WorkerPool:
+    """
+    A small pool of warm worker processes. Each worker runs one app in its own process and is replaced after the app
+    closes, so a crash or ``exit()`` in an app cannot take down the AppStore.
+
+    The pool is supervised from the Tk thread by calling ``poll`` regularly: it reads the status messages of the
+    workers, reports exits through ``on_exit`` and restarts workers that died.
+
+    Workers are started with the ``spawn`` method, because forking a process that already runs a Tk interpreter is
+    not safe.
+    """
+    size: int
+    preload: list[App]
+    workers: dict[int, Worker]
+    pending: list[App]
+    on_exit: Callable[[str, int, str | None], None] | None
+
+    def __init__(self, size: int = 2, preload: list[App] | None = None,
+                 on_exit: Callable[[str, int, str | None], None] | None = None) -> None:
+        """
+        Initialize the pool and start the idle workers.
+
+        :param size: The number of idle workers to keep warm
+        :param preload: The apps whose modules the workers import while idle
+        :param on_exit: Called with the app name, exit code and traceback (or None) when an app exits
+        """
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.size = size
+        self.preload = preload or []
+        self.on_exit = on_exit
+        self.workers = {}
+        self.pending = []
+        self.next_id = 0
+        self.fill()
+
+    def start_worker(self) -> Worker:
+        """Start a new idle worker process."""
+        receiver, sender = self.context.Pipe(duplex=False)
+        worker_id = self.next_id
+        self.next_id += 1
+        process = self.context.Process(target=run_worker, args=(worker_id, receiver, self.results, self.preload),
+                                       name=f"appstore-worker-{worker_id}")
+        process.start()
+        receiver.close()
+        worker = Worker(worker_id=worker_id, process=process, tasks=sender)
+        self.workers[worker_id] = worker
+        return worker
+
+    def idle_workers(self) -> list[Worker]:
+        """Return the workers that are not running an app."""
+        return [worker for worker in self.workers.values() if worker.app_name is None]
+
+    def fill(self) -> None:
+        """Start workers until the pool has ``size`` idle workers."""
+        for _ in range(self.size - len(self.idle_workers())):
+            self.start_worker()
+
+    def launch(self, app: App) -> None:
+        """
+        Launch the app on a warm worker. If no worker is ready yet the launch waits until one is.
+
+        :param app: The app to launch
+        """
+        self.pending.append(app)
+        self.dispatch()
+        self.fill()
+
+    def dispatch(self) -> None:
+        """Hand the pending launches to the ready workers."""
+        for worker in self.idle_workers():
+            if not self.pending:
+                break
+
+            if worker.ready:
+                app = self.pending.pop(0)
+                worker.app_name = app.name
+                worker.tasks.send(app)
+
+    def poll(self) -> None:
+        """Process the status messages of the workers and replace the workers that exited."""
+        self.read_messages()
+        dead = [worker for worker in self.workers.values() if not worker.process.is_alive()]
+        if dead:
+            # A worker that just exited may have sent its last message after the first read
+            self.read_messages()
+
+        for worker in dead:
+            worker.process.join()
+            worker.tasks.close()
+            del self.workers[worker.worker_id]
+            if worker.app_name is not None and not worker.reported:
+                self.report(worker.app_name, worker.process.exitcode, None)
+
+        self.dispatch()
+        self.fill()
+
+    def read_messages(self) -> None:
+        """Read the status messages the workers sent since the last read."""
+        while True:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            worker = self.workers.get(message[1])
+            if worker is None:
+                continue
+
+            match message[0]:
+                case "ready":
+                    worker.ready = True
+                case "exited":
+                    _, _, name, code, error = message
+                    worker.reported = True
+                    self.report(name, code, error)
+
+    def report(self, name: str, code: int, error: str | None) -> None:
+        """Pass the exit status of an app to ``on_exit``."""
+        if self.on_exit is not None:
+            self.on_exit(name, code, error)
+
+    def shutdown(self) -> None:
+        """Stop the idle workers. Workers that run an app keep running until the app is closed."""
+        idle = self.idle_workers()
+        for worker in idle:
+            try:
+                worker.tasks.send(None)
+            except OSError:
+                pass
+
+        for worker in idle:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.tasks.close()
+            del self.workers[worker.worker_id]
@@ -0,0 +1,145 @@
+"""
+Memory and load-time benchmarks for the diary and score records.
+
+Each case loads the same records twice: the way they were loaded before the storage layer, and the way they are
+loaded now. The report shows the memory held by the loaded records and the time to load them:
+
+- ``entries``: the same SQLite rows loaded into the ``Entry`` dataclass as it was defined before, with an instance
+  ``__dict__``, against the slotted ``Entry``; both convert the stored date ordinal to a ``date``
+- ``date index``: one (date ordinal, id) tuple per entry in a list, against the array-backed ``DateIndex``
+- ``scores``: the score dicts of ``scores.json`` with their dates parsed by ``strptime`` when they are used, against
+  ``ScoreRecord`` objects with the date parsed once to epoch seconds
+
+Load times are the best of three runs without memory tracing; memory is measured in a separate, traced run.
+
+Usage::
+
+    python benchmarks/records.py                 # 100,000 records per case
+    python benchmarks/records.py --records 5000
+"""
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from appstore.storage.diary import DateIndex, Entry  # noqa: E402
+from appstore.storage.scores import ScoreRecord  # noqa: E402
+
+
+@dataclasses.dataclass()
+class LegacyEntry:
+    """The diary entry as it was defined before it was slotted, with the fields of the current entry."""
+    date: date
+    title: str
+    content: str
+    id: str
+    updated: float
+
+
+def measure(load, repeat: int = 3) -> tuple[float, int]:
+    """
+    Load records and measure them.
+
+    :param load: Returns the loaded records
+    :param repeat: The number of timed runs
+    :return: The best load time in milliseconds and the memory held by the records in bytes
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        records = load()
+        times.append((time.perf_counter() - start) * 1000)
+        del records
+
+    gc.collect()
+    tracemalloc.start()
+    records = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return min(times), size
+
+
+def entry_cases(count: int) -> dict[str, tuple]:
+    """Return the legacy and current loaders of diary entries."""
+    first = date(2000, 1, 1)
+    days = [first + timedelta(days=random.randrange(10000)) for _ in range(count)]
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE entries (id TEXT, date INTEGER, title TEXT, content TEXT, updated REAL)")
+    connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                           [(f"{number:032x}", day.toordinal(), f"Dag {number}", "Het was een goede dag", 0.0)
+                            for number, day in enumerate(days)])
+
+    def legacy():
+        rows = connection.execute("SELECT date, title, content, id, updated FROM entries")
+        return [LegacyEntry(date.fromordinal(row[0]), *row[1:]) for row in rows]
+
+    def current():
+        rows = connection.execute("SELECT date, title, content, id, updated FROM entries")
+        return [Entry(date.fromordinal(row[0]), *row[1:]) for row in rows]
+
+    def legacy_index():
+        rows = connection.execute("SELECT date, id FROM entries ORDER BY date, id")
+        return [(row[0], row[1]) for row in rows]
+
+    def current_index():
+        return DateIndex.from_keys(connection.execute("SELECT date, id FROM entries ORDER BY date, id"))
+
+    return {"entries": (legacy, current), "date index": (legacy_index, current_index)}
+
+
+def score_cases(count: int) -> dict[str, tuple]:
+    """Return the legacy and current loaders of scores."""
+    start = datetime(2024, 1, 1)
+    scores = [{"userName": random.choice(["tim", "anna", "sem", "noor"]), "guessed": random.random() < 0.5,
+               "timesGuessed": random.randint(1, 20),
+               "dateTime": (start + timedelta(minutes=number)).strftime("%d-%m-%Y %H:%M:%S")}
+              for number in range(count)]
+    text = json.dumps(scores)
+
+    def legacy():
+        scores = json.loads(text)
+        for score in scores:
+            datetime.strptime(score["dateTime"], "%d-%m-%Y %H:%M:%S")
+        return scores
+
+    def current():
+        return [ScoreRecord.from_json(score) for score in json.loads(text)]
+
+    return {"scores": (legacy, current)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record memory and load-time benchmarks")
+    parser.add_argument("--records", type=int, default=100_000, help="number of records per case (default: 100000)")
+    args = parser.parse_args()
+
+    random.seed(1)
+    cases = {**entry_cases(args.records), **score_cases(args.records)}
+    print(f"{'case':<12} {'version':<8} {'load ms':>10} {'bytes/record':>14}")
+    for name, (legacy, current) in cases.items():
+        results = []
+        for version, load in (("legacy", legacy), ("current", current)):
+            elapsed, size = measure(load)
+            results.append((elapsed, size))
+            print(f"{name:<12} {version:<8} {elapsed:>10.1f} {size / args.records:>14.1f}")
+
+        (legacy_ms, legacy_size), (current_ms, current_size) = results
+        print(f"{name:<12} {'factor':<8} {legacy_ms / current_ms:>10.2f} {legacy_size / current_size:>14.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
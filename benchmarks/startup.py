@@ -0,0 +1,234 @@
+"""
+Startup and launch-latency benchmarks for the AppStore.
+
+Every measurement runs in a fresh interpreter, from the ``appstore`` directory like ``python main.py`` does:
+
+- ``import:<module>``: the time to import the AppStore and each app module, in milliseconds
+- ``ttff:store``: the time from starting the import of the AppStore to its first rendered frame, in milliseconds
+- ``ttff:<app>``: the time from ``AppStore.show_app`` to the first rendered frame of the app, in milliseconds
+- ``rss:<case>``: the peak resident set size of the process that measured the frame, in kilobytes
+
+Frames need a display. Without one, the suite starts a virtual display with Xvfb when it is installed, and
+otherwise skips the frame measurements.
+
+Usage::
+
+    python benchmarks/startup.py                   # run and compare against benchmarks/baseline.json
+    python benchmarks/startup.py --save-baseline   # run and store the results as the new baseline
+
+Timings depend on the machine, so the baseline is not part of the repository: record one with ``--save-baseline``
+on the machine that runs the comparison, before making the change to measure. Comparing without a baseline fails.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPSTORE_DIR = os.path.join(ROOT, "appstore")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Executed in a fresh interpreter; prints one JSON object with the measurement.
+IMPORT_SNIPPET = """
+import importlib, json, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1000}}))
+"""
+
+FRAME_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from appstore.main import AppStore
+
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def wait_for(widget):
+    while not widget.winfo_ismapped():
+        widget.update()
+
+store = AppStore(isolated=False)
+wait_for(store.main_frame)
+store_ms = (time.perf_counter() - start) * 1000
+result = {{"store_ms": store_ms}}
+
+index = {index!r}
+if index is not None:
+    start = time.perf_counter()
+    store.show_app(index)
+    wait_for(store.current.app)
+    result["app_ms"] = (time.perf_counter() - start) * 1000
+
+result["rss_kb"] = peak_rss()
+store.app.destroy()
+print(json.dumps(result))
+"""
+
+
+def run_snippet(snippet: str, env: dict) -> dict:
+    """
+    Run a snippet in a fresh interpreter from the appstore directory.
+
+    :param snippet: The Python source to run
+    :param env: The environment of the interpreter
+    :return: The JSON object the snippet printed last
+    """
+    completed = subprocess.run([sys.executable, "-c", snippet], cwd=APPSTORE_DIR, env=env, capture_output=True,
+                               text=True, timeout=120)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "benchmark failed")
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def start_display(env: dict) -> subprocess.Popen | None:
+    """
+    Make sure the benchmarks have a display, starting Xvfb when there is none.
+
+    :param env: The environment of the benchmarks, updated with the display
+    :return: The Xvfb process, or None if no virtual display was started
+    """
+    if sys.platform != "linux" or env.get("DISPLAY"):
+        return None
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+
+    display = ":99"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x720x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    env["DISPLAY"] = display
+    return process
+
+
+def list_apps(env: dict) -> list[tuple[int, str, str]]:
+    """Return the index, name and import path of every app in the registry, without creating a window."""
+    snippet = """
+import json
+from appstore.registry import AppRegistry
+registry = AppRegistry()
+registry.refresh()
+print(json.dumps([[app.name, app.path] for app in registry.apps]))
+"""
+    return [(index, name, path) for index, (name, path) in enumerate(run_snippet(snippet, env))]
+
+
+def run_benchmarks(repeat: int, env: dict, frames: bool) -> dict[str, float]:
+    """
+    Run all the benchmarks.
+
+    :param repeat: How often each measurement is repeated; the median is reported
+    :param env: The environment of the benchmarks
+    :param frames: Whether a display is available for the frame measurements
+    :return: The results by metric name
+    """
+    results = {}
+    apps = list_apps(env)
+
+    for module in ["appstore.main"] + [path for _, _, path in apps]:
+        samples = [run_snippet(IMPORT_SNIPPET.format(module=module), env)["ms"] for _ in range(repeat)]
+        results[f"import:{module}"] = statistics.median(samples)
+
+    if not frames:
+        return results
+
+    samples = [run_snippet(FRAME_SNIPPET.format(index=None), env) for _ in range(repeat)]
+    results["ttff:store"] = statistics.median(sample["store_ms"] for sample in samples)
+    if samples[0]["rss_kb"] is not None:
+        results["rss:store"] = max(sample["rss_kb"] for sample in samples)
+
+    for index, name, _ in apps:
+        samples = [run_snippet(FRAME_SNIPPET.format(index=index), env) for _ in range(repeat)]
+        results[f"ttff:{name}"] = statistics.median(sample["app_ms"] for sample in samples)
+        if samples[0]["rss_kb"] is not None:
+            results[f"rss:{name}"] = max(sample["rss_kb"] for sample in samples)
+
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Print the results next to the baseline.
+
+    :param results: The results of this run
+    :param baseline: The stored baseline results
+    :param tolerance: The allowed relative increase over the baseline
+    :return: The metrics that regressed
+    """
+    regressions = []
+    print(f"{'metric':<50} {'result':>12} {'baseline':>12} {'change':>8}")
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        if base is None or base == 0:
+            print(f"{metric:<50} {value:>12.1f} {'-':>12} {'-':>8}")
+            continue
+
+        change = (value - base) / base
+        flag = ""
+        if change > tolerance:
+            regressions.append(metric)
+            flag = "  REGRESSION"
+        print(f"{metric:<50} {value:>12.1f} {base:>12.1f} {change:>+8.0%}{flag}")
+
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark suite from the command line."""
+    parser = argparse.ArgumentParser(description="AppStore startup and launch-latency benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per measurement (default: 5)")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative increase over the baseline (default: 0.2)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}. Record one first with:\n\n"
+              f"    python benchmarks/startup.py --save-baseline\n", file=sys.stderr)
+        return 2
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    xvfb = start_display(env)
+    frames = sys.platform != "linux" or bool(env.get("DISPLAY"))
+    if not frames:
+        print("No display and no Xvfb found: skipping the frame measurements.")
+
+    try:
+        results = run_benchmarks(args.repeat, env, frames)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed more than {args.tolerance:.0%}.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
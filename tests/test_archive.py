@@ -0,0 +1,26 @@
+import json
+
+from appstore.storage.archive import import_entries
+from appstore.storage.diary import SqliteDiaryStorage
+
+
+def test_import_legacy_diary_only_takes_the_entries_of_the_user(tmp_path):
+    legacy = [
+        {"Username": "tim", "PasswordHash": "", "Diary": [
+            {"Date": "09-09-2024", "Title": "Van tim", "Content": "Eerste dag"},
+        ]},
+        {"Username": "test", "PasswordHash": "", "Diary": [
+            {"Date": "10-09-2024", "Title": "Van test", "Content": "Geheim"},
+            {"Date": "11-09-2024", "Title": "Ook van test", "Content": "Ook geheim"},
+        ]},
+    ]
+    path = tmp_path / "diary.json"
+    path.write_text(json.dumps(legacy), encoding="utf-8")
+    storage = SqliteDiaryStorage(str(tmp_path / "diary.db"))
+
+    result = import_entries(storage, "tim", str(path))
+
+    assert result.imported == 1
+    assert [entry.title for entry in storage.load_entries("tim")] == ["Van tim"]
+    assert storage.load_entries("test") == []
+    storage.close()
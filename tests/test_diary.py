@@ -0,0 +1,102 @@
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from appstore.storage import diary
+from appstore.storage.diary import DateIndex, Entry, SqliteDiaryStorage, entry_hash, migrate_json, open_storage
+
+
+@pytest.mark.parametrize("version", range(1, len(diary.MIGRATIONS)))
+def test_an_older_schema_is_upgraded_without_losing_entries(tmp_path, monkeypatch, version):
+    path = str(tmp_path / "diary.db")
+    monkeypatch.setattr(diary, "MIGRATIONS", diary.MIGRATIONS[:version])
+    old = SqliteDiaryStorage(path)
+    entry = Entry(date(2024, 9, 9), "Fietsen", "De katten liepen door de tuinen", "oud", 1.5)
+    with old.connection:
+        old.connection.execute(
+            "INSERT INTO entries (id, username, date, title, content, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (entry.id, "tim", entry.date.toordinal(), entry.title, entry.content, entry.updated))
+        if version >= 3:
+            old.index_entry("tim", entry)
+    old.close()
+    monkeypatch.undo()
+
+    storage = SqliteDiaryStorage(path)
+
+    assert storage.connection.execute("PRAGMA user_version").fetchone()[0] == len(diary.MIGRATIONS)
+    assert storage.load_entries("tim") == [entry]
+    assert [found.id for found in storage.search("tim", "kat tuin")] == ["oud"]
+    assert storage.connection.execute("SELECT hash FROM entries").fetchone()[0] == entry_hash(entry)
+    storage.add_user("tim", "hash")
+    assert storage.get_password_hash("tim") == "hash"
+    storage.close()
+
+
+def test_a_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    def broken(storage):
+        storage.connection.execute("CREATE TABLE half (id TEXT)")
+        raise sqlite3.OperationalError("interrupted")
+
+    monkeypatch.setattr(diary, "MIGRATIONS", [*diary.MIGRATIONS, broken])
+    with pytest.raises(sqlite3.OperationalError):
+        SqliteDiaryStorage(str(tmp_path / "diary.db"))
+    monkeypatch.undo()
+
+    storage = SqliteDiaryStorage(str(tmp_path / "diary.db"))
+    assert storage.connection.execute("PRAGMA user_version").fetchone()[0] == len(diary.MIGRATIONS)
+    assert storage.connection.execute("SELECT name FROM sqlite_master WHERE name = 'half'").fetchone() is None
+    storage.close()
+
+
+def test_the_json_diary_is_copied_once(tmp_path):
+    legacy = [{"Username": "tim", "PasswordHash": "abc", "Diary": [
+        {"Date": "09-09-2024", "Title": "Eerste dag", "Content": "Hallo"},
+        {"Date": "31-02-2024", "Title": "Ongeldig", "Content": "Bestaat niet"},
+    ]}]
+    json_path = tmp_path / "diary.json"
+    json_path.write_text(json.dumps(legacy), encoding="utf-8")
+
+    storage = open_storage(str(tmp_path / "diary.db"), str(json_path))
+    assert migrate_json(storage, str(json_path)) == 0
+    storage.close()
+    storage = open_storage(str(tmp_path / "diary.db"), str(json_path))
+
+    assert [entry.title for entry in storage.load_entries("tim")] == ["Eerste dag"]
+    assert storage.get_password_hash("tim") == "abc"
+    storage.close()
+
+
+def test_the_date_index_finds_the_entries_in_a_date_range():
+    index = DateIndex()
+    for day, entry_id in [(5, "b"), (1, "a"), (5, "a"), (9, "c"), (12, "d")]:
+        index.add(date(2024, 3, day), entry_id)
+
+    assert index.ids == ["a", "a", "b", "c", "d"]
+    assert index.ids_between(date(2024, 3, 5), date(2024, 3, 9)) == ["a", "b", "c"]
+    assert index.ids_between(date(2024, 3, 6), date(2024, 3, 8)) == []
+    assert index.range(date(2024, 1, 1), date(2024, 12, 31)) == range(0, 5)
+    index.remove(date(2024, 3, 5), "a")
+    index.remove(date(2024, 3, 6), "b")
+    assert index.ids_between(date(2024, 3, 5), date(2024, 3, 5)) == ["b"]
+    assert index.position(date(2024, 3, 10)) == 3
+
+
+def test_search_matches_every_word_by_stem_and_prefix(tmp_path):
+    storage = SqliteDiaryStorage(str(tmp_path / "diary.db"))
+    garden = Entry(date(2024, 9, 9), "Tuin", "De katten speelden in de tuin", "tuin")
+    house = Entry(date(2024, 9, 10), "Thuis", "Een kat lag in huis", "huis")
+    cafe = Entry(date(2024, 9, 11), "Café", "Koffie met ideeën", "cafe")
+    for entry in (garden, house, cafe):
+        storage.add_entry("tim", entry)
+    storage.add_entry("test", Entry(date(2024, 9, 12), "Kat", "Andere kat", "ander"))
+
+    assert [entry.id for entry in storage.search("tim", "kat")] == ["huis", "tuin"]
+    assert [entry.id for entry in storage.search("tim", "katten tuin")] == ["tuin"]
+    assert [entry.id for entry in storage.search("tim", "huizen")] == ["huis"]
+    assert [entry.id for entry in storage.search("tim", "tui")] == ["tuin"]
+    assert [entry.id for entry in storage.search("tim", "cafe ideeen")] == ["cafe"]
+    assert storage.search("tim", "kat koffie") == []
+    assert storage.search("tim", "de een") == []
+    storage.close()
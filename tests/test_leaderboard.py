@@ -0,0 +1,54 @@
+from appstore.storage.leaderboard import Leaderboard
+from appstore.storage.scores import ScoreLog, ScoreRecord
+
+
+def open_log(tmp_path) -> ScoreLog:
+    return ScoreLog(str(tmp_path / "scores"), str(tmp_path / "scores.json"), segment_bytes=200)
+
+
+def record(number: int) -> ScoreRecord:
+    return ScoreRecord(f"speler{number % 7}", number % 3 != 0, number % 12 + 1, played=1_700_000_000 + number,
+                       difficulty="easy")
+
+
+def test_saving_across_compactions_never_rebuilds(tmp_path, monkeypatch):
+    leaderboard = Leaderboard(open_log(tmp_path), checkpoint_every=10)
+    rebuilds = []
+    monkeypatch.setattr(Leaderboard, "rebuild", lambda self: rebuilds.append(self))
+
+    for number in range(2000):
+        leaderboard.save_score(record(number))
+
+    assert rebuilds == []
+    assert any(segment.level == 2 for segment in leaderboard.log.segments())
+    assert sum(totals.games for totals in leaderboard.players.values()) == 2000
+
+
+def test_leaderboards_of_two_processes_catch_up_without_rebuilding(tmp_path, monkeypatch):
+    first = Leaderboard(open_log(tmp_path), checkpoint_every=10)
+    second = Leaderboard(open_log(tmp_path), checkpoint_every=7)
+    rebuilds = []
+    monkeypatch.setattr(Leaderboard, "rebuild", lambda self: rebuilds.append(self))
+
+    for number in range(1000):
+        (first if number % 2 else second).save_score(record(number))
+    first.catch_up()
+    second.catch_up()
+
+    assert rebuilds == []
+    monkeypatch.undo()
+    fresh = Leaderboard(open_log(tmp_path), path=str(tmp_path / "fresh.json"))
+    assert first.players == second.players == fresh.players
+    assert first.top == second.top == fresh.top
+
+
+def test_loading_reads_the_checkpoint_and_the_scores_after_it(tmp_path):
+    leaderboard = Leaderboard(open_log(tmp_path), checkpoint_every=10)
+    for number in range(95):
+        leaderboard.save_score(record(number))
+
+    loaded = Leaderboard(open_log(tmp_path))
+
+    assert loaded.unsaved == 5
+    assert loaded.players == leaderboard.players
+    assert loaded.top_players() == leaderboard.top_players()
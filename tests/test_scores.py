@@ -0,0 +1,72 @@
+import json
+import os
+
+from appstore.storage.scores import FAN_IN, ScoreLog, ScoreRecord
+
+
+def open_log(tmp_path, segment_bytes: int = 200) -> ScoreLog:
+    return ScoreLog(str(tmp_path / "scores"), str(tmp_path / "scores.json"), segment_bytes=segment_bytes)
+
+
+def record(number: int) -> ScoreRecord:
+    return ScoreRecord(f"speler{number}", number % 2 == 0, number % 12 + 1, played=1_700_000_000 + number)
+
+
+def test_scores_are_read_back_across_a_new_segment(tmp_path):
+    log = open_log(tmp_path)
+    for number in range(10):
+        log.append(record(number))
+
+    assert [segment.level for segment in log.segments()] == [0, 0]
+    assert list(open_log(tmp_path)) == [record(number) for number in range(10)]
+
+
+def test_compaction_keeps_the_order_and_number_of_scores(tmp_path):
+    log = open_log(tmp_path)
+    for number in range(1000):
+        log.append(record(number))
+
+    levels = [segment.level for segment in log.segments()]
+    assert max(levels) == 2 and levels.count(0) <= FAN_IN + 1
+    assert list(log) == [record(number) for number in range(1000)]
+
+
+def test_an_interrupted_merge_is_cleaned_up_when_the_log_is_opened(tmp_path):
+    log = open_log(tmp_path)
+    for number in range(100):
+        log.append(record(number))
+    parts = [segment for segment in log.segments() if segment.level == 0][:FAN_IN]
+    merged = os.path.join(log.directory, f"1-{parts[0].first:08d}-{parts[-1].last:08d}.ndjson.gz")
+    # The merged segment was written, but the merge stopped before removing its parts.
+    log.write_segment(merged, (score for part in parts for score in log.read_segment(part.path)))
+
+    reopened = open_log(tmp_path)
+
+    assert not any(os.path.exists(part.path) for part in parts)
+    assert list(reopened) == [record(number) for number in range(100)]
+
+
+def test_the_legacy_scores_file_is_migrated_once(tmp_path):
+    legacy = [record(number).to_json() for number in range(5)]
+    legacy.append({"userName": "kapot", "guessed": True})
+    (tmp_path / "scores.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    log = open_log(tmp_path)
+    log.append(record(5))
+
+    assert list(open_log(tmp_path)) == [record(number) for number in range(6)]
+    assert json.loads((tmp_path / "scores.json").read_text(encoding="utf-8")) == legacy
+
+
+def test_reading_from_a_position_returns_only_the_later_scores(tmp_path):
+    log = open_log(tmp_path)
+    for number in range(20):
+        log.append(record(number))
+    _, position = log.read_from()
+    for number in range(20, 25):
+        log.append(record(number))
+
+    records, end = log.read_from(*position)
+
+    assert records == [record(number) for number in range(20, 25)]
+    assert log.read_from(*end) == ([], end)
@@ -0,0 +1,93 @@
+import os
+from datetime import date
+
+from appstore.storage.diary import Entry, SqliteDiaryStorage
+from appstore.storage.sync import FolderReplica, sync_folder
+
+
+def open_storage(tmp_path, name: str) -> SqliteDiaryStorage:
+    return SqliteDiaryStorage(str(tmp_path / f"{name}.db"))
+
+
+def contents(storage: SqliteDiaryStorage, user_name: str = "tim") -> dict[str, str]:
+    return {entry.id: entry.content for entry in storage.load_entries(user_name)}
+
+
+def test_changes_are_synced_in_both_directions(tmp_path):
+    folder = str(tmp_path / "usb")
+    laptop, desktop = open_storage(tmp_path, "laptop"), open_storage(tmp_path, "desktop")
+    entry = Entry(date(2024, 9, 9), "Eerste dag", "Op de laptop")
+    laptop.add_entry("tim", entry)
+
+    assert sync_folder(laptop, "tim", folder).pushed == 1
+    assert sync_folder(desktop, "tim", folder).pulled == 1
+    desktop.update_entry("tim", Entry(entry.date, entry.title, "Op de desktop", entry.id))
+    sync_folder(desktop, "tim", folder)
+    sync_folder(laptop, "tim", folder)
+    assert contents(laptop) == contents(desktop) == {entry.id: "Op de desktop"}
+
+    laptop.delete_entry("tim", entry.id)
+    assert sync_folder(laptop, "tim", folder).deleted_remote == 1
+    assert sync_folder(desktop, "tim", folder).deleted_local == 1
+    assert contents(desktop) == {}
+
+
+def test_a_sync_only_reads_and_writes_the_changed_entries(tmp_path, monkeypatch):
+    folder = str(tmp_path / "usb")
+    laptop, desktop = open_storage(tmp_path, "laptop"), open_storage(tmp_path, "desktop")
+    entries = [Entry(date(2024, 1, 1 + number % 28), f"Dag {number}", "Tekst") for number in range(300)]
+    for entry in entries:
+        laptop.add_entry("tim", entry)
+    sync_folder(laptop, "tim", folder)
+    sync_folder(desktop, "tim", folder)
+
+    edited = entries[42]
+    laptop.update_entry("tim", Entry(edited.date, edited.title, "Aangepast", edited.id))
+    reads, writes = [], []
+    monkeypatch.setattr(FolderReplica, "read", lambda self, entry_id, read=FolderReplica.read: (
+        reads.append(entry_id), read(self, entry_id))[1])
+    monkeypatch.setattr(FolderReplica, "write", lambda self, entry, write=FolderReplica.write: (
+        writes.append(entry.id), write(self, entry))[1])
+
+    assert sync_folder(laptop, "tim", folder).pushed == 1
+    assert sync_folder(desktop, "tim", folder).pulled == 1
+    assert sync_folder(desktop, "tim", folder).pulled == 0
+    assert reads == writes == [edited.id]
+    assert contents(desktop)[edited.id] == "Aangepast"
+
+
+def test_a_compacted_journal_is_read_again_from_the_start(tmp_path, monkeypatch):
+    monkeypatch.setattr("appstore.storage.sync.COMPACT_SLACK", 0)
+    folder = str(tmp_path / "usb")
+    laptop, desktop = open_storage(tmp_path, "laptop"), open_storage(tmp_path, "desktop")
+    entry = Entry(date(2024, 9, 9), "Eerste dag", "Versie 0")
+    laptop.add_entry("tim", entry)
+    sync_folder(laptop, "tim", folder)
+    sync_folder(desktop, "tim", folder)
+    generation = FolderReplica(folder, "tim").generation
+
+    for version in range(1, 6):
+        laptop.update_entry("tim", Entry(entry.date, entry.title, f"Versie {version}", entry.id))
+        sync_folder(laptop, "tim", folder)
+
+    assert FolderReplica(folder, "tim").generation != generation
+    assert sync_folder(desktop, "tim", folder).pulled == 1
+    assert contents(desktop) == {entry.id: "Versie 5"}
+
+
+def test_a_pulled_entry_with_the_id_of_another_user_gets_a_new_id(tmp_path):
+    folder = str(tmp_path / "usb")
+    laptop, desktop = open_storage(tmp_path, "laptop"), open_storage(tmp_path, "desktop")
+    entry = Entry(date(2024, 9, 9), "Eerste dag", "Van tim")
+    laptop.add_entry("tim", entry)
+    desktop.add_entry("test", Entry(date(2024, 9, 10), "Andere dag", "Van test", entry.id))
+    sync_folder(laptop, "tim", folder)
+
+    assert sync_folder(desktop, "tim", folder).pulled == 1
+
+    [pulled] = desktop.load_entries("tim")
+    assert pulled.id != entry.id and pulled.content == "Van tim"
+    assert contents(desktop, "test") == {entry.id: "Van test"}
+    sync_folder(laptop, "tim", folder)
+    assert contents(laptop) == {pulled.id: "Van tim"}
+    assert not os.path.exists(os.path.join(folder, "tim", "entries", f"{entry.id}.json"))
@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from appstore.storage.diary import Entry, SqliteDiaryStorage
+from appstore.storage.writebehind import WriteBehindStorage
+
+
+def test_edit_of_a_new_entry_is_kept_when_writing_the_entry_fails(tmp_path, monkeypatch):
+    writing = threading.Event()
+    release = threading.Event()
+    insert = SqliteDiaryStorage.insert
+    calls = []
+
+    def insert_failing_once(self, user_name, entry):
+        calls.append(entry.id)
+        if len(calls) == 1:
+            writing.set()
+            release.wait(5)
+            raise sqlite3.OperationalError("database is locked")
+        insert(self, user_name, entry)
+
+    monkeypatch.setattr(SqliteDiaryStorage, "insert", insert_failing_once)
+    storage = WriteBehindStorage(SqliteDiaryStorage(str(tmp_path / "diary.db")), delay=0)
+    entry = Entry(date(2024, 9, 9), "Eerste dag", "Nieuw")
+    storage.add_entry("tim", entry)
+    assert writing.wait(5)
+    storage.update_entry("tim", Entry(entry.date, "Eerste dag", "Aangepast", entry.id))
+    release.set()
+    deadline = time.monotonic() + 5
+    while not storage.failures and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    storage.flush()
+
+    assert [(stored.id, stored.content) for stored in storage.reader.load_entries("tim")] == [(entry.id, "Aangepast")]
+    storage.close()
+
+
+def test_deleting_a_new_entry_whose_write_failed_writes_nothing(tmp_path, monkeypatch):
+    writing = threading.Event()
+    release = threading.Event()
+
+    def insert_failing(self, user_name, entry):
+        writing.set()
+        release.wait(5)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(SqliteDiaryStorage, "insert", insert_failing)
+    storage = WriteBehindStorage(SqliteDiaryStorage(str(tmp_path / "diary.db")), delay=0)
+    entry = Entry(date(2024, 9, 9), "Eerste dag", "Nieuw")
+    storage.add_entry("tim", entry)
+    assert writing.wait(5)
+    storage.delete_entry("tim", entry.id)
+    release.set()
+    deadline = time.monotonic() + 5
+    while not storage.failures and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    storage.flush()
+
+    assert storage.pending == {} and storage.load_entries("tim") == []
+    storage.close()